@@ -0,0 +1,42 @@
+"""Create price sketch rollups
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('price_sketches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('property_type', sa.String(), nullable=False),
+        sa.Column('metric', sa.String(), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, default=0),
+        sa.Column('sketch', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, default=datetime.utcnow),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_price_sketches_id'), 'price_sketches', ['id'], unique=False)
+    op.create_index(
+        'ix_price_sketches_segment',
+        'price_sketches',
+        ['property_type', 'metric', 'period_start'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_price_sketches_segment', table_name='price_sketches')
+    op.drop_index(op.f('ix_price_sketches_id'), table_name='price_sketches')
+    op.drop_table('price_sketches')
@@ -0,0 +1,45 @@
+"""Create hedonic price index segments
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('price_index_segments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('property_type', sa.String(), nullable=False),
+        sa.Column('district', sa.String(), nullable=False),
+        sa.Column('observations', sa.Integer(), nullable=False, default=0),
+        sa.Column('periods', sa.JSON(), nullable=False),
+        sa.Column('xtx', sa.JSON(), nullable=False),
+        sa.Column('xty', sa.JSON(), nullable=False),
+        sa.Column('index_values', sa.JSON(), nullable=True),
+        sa.Column('last_property_id', sa.Integer(), nullable=False, default=0),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, default=datetime.utcnow),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_price_index_segments_id'), 'price_index_segments', ['id'], unique=False)
+    op.create_index(
+        'ix_price_index_segments_segment',
+        'price_index_segments',
+        ['property_type', 'district'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_price_index_segments_segment', table_name='price_index_segments')
+    op.drop_index(op.f('ix_price_index_segments_id'), table_name='price_index_segments')
+    op.drop_table('price_index_segments')
@@ -0,0 +1,98 @@
+"""Add property coordinates, geohash and price tiles
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+import geohash  # backend/ is on sys.path via alembic/env.py
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+PROPERTY_GEOHASH_PRECISION = 9
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('latitude', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('longitude', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('geohash', sa.String(), nullable=True))
+
+    # Backfill derived coordinates in chunks
+    connection = op.get_bind()
+    properties = sa.table('properties',
+        sa.column('id', sa.Integer()),
+        sa.column('location', sa.JSON()),
+        sa.column('latitude', sa.Float()),
+        sa.column('longitude', sa.Float()),
+        sa.column('geohash', sa.String())
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(properties.c.id, properties.c.location)
+            .where(properties.c.id > last_id)
+            .order_by(properties.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        for row_id, location in rows:
+            if location and location.get('lat') is not None and location.get('lng') is not None:
+                connection.execute(
+                    properties.update()
+                    .where(properties.c.id == row_id)
+                    .values(
+                        latitude=location['lat'],
+                        longitude=location['lng'],
+                        geohash=geohash.encode(location['lat'], location['lng'], PROPERTY_GEOHASH_PRECISION)
+                    )
+                )
+        last_id = rows[-1][0]
+
+    # text_pattern_ops lets PostgreSQL use the index for prefix (LIKE 'abc%') scans
+    op.create_index(
+        op.f('ix_properties_geohash'),
+        'properties',
+        ['geohash'],
+        unique=False,
+        postgresql_ops={'geohash': 'text_pattern_ops'}
+    )
+
+    # Tiles are filled by heatmap_service.rebuild_tiles() after the upgrade
+    op.create_table('price_tiles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('precision', sa.Integer(), nullable=False),
+        sa.Column('geohash', sa.String(), nullable=False),
+        sa.Column('center_lat', sa.Float(), nullable=False),
+        sa.Column('center_lng', sa.Float(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False, default=0),
+        sa.Column('sum_price_per_sqm', sa.Float(), nullable=False, default=0.0),
+        sa.Column('sketch', sa.JSON(), nullable=False),
+        sa.Column('sketch_stale', sa.Boolean(), nullable=False, default=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, default=datetime.utcnow),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_price_tiles_id'), 'price_tiles', ['id'], unique=False)
+    op.create_index('ix_price_tiles_cell', 'price_tiles', ['precision', 'geohash'], unique=True)
+    op.create_index('ix_price_tiles_center', 'price_tiles', ['precision', 'center_lat', 'center_lng'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_price_tiles_center', table_name='price_tiles')
+    op.drop_index('ix_price_tiles_cell', table_name='price_tiles')
+    op.drop_index(op.f('ix_price_tiles_id'), table_name='price_tiles')
+    op.drop_table('price_tiles')
+
+    op.drop_index(op.f('ix_properties_geohash'), table_name='properties')
+    op.drop_column('properties', 'geohash')
+    op.drop_column('properties', 'longitude')
+    op.drop_column('properties', 'latitude')
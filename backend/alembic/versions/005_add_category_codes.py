@@ -0,0 +1,55 @@
+"""Add SMALLINT category codes to properties
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from categories import PROPERTY_TYPES, CONDITIONS, RENOVATION_STATUSES  # backend/ is on sys.path via alembic/env.py
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+CATEGORY_COLUMNS = (
+    ('property_type', 'property_type_code', PROPERTY_TYPES),
+    ('condition', 'condition_code', CONDITIONS),
+    ('renovation_status', 'renovation_code', RENOVATION_STATUSES),
+)
+
+
+def upgrade() -> None:
+    for _, code_column, _ in CATEGORY_COLUMNS:
+        op.add_column('properties', sa.Column(code_column, sa.SmallInteger(), nullable=True))
+
+    # Backfill codes and canonicalize legacy aliases in one set-based pass per column
+    properties = sa.table('properties',
+        *[sa.column(name, sa.String()) for name, _, _ in CATEGORY_COLUMNS],
+        *[sa.column(code, sa.SmallInteger()) for _, code, _ in CATEGORY_COLUMNS]
+    )
+    for column, code_column, registry in CATEGORY_COLUMNS:
+        source = sa.func.lower(sa.func.trim(properties.c[column]))
+        mapping = registry.aliases()
+        op.execute(
+            properties.update().values({
+                code_column: sa.case(mapping, value=source, else_=None),
+                column: sa.case(
+                    {alias: registry.label(code) for alias, code in mapping.items()},
+                    value=source,
+                    else_=properties.c[column]
+                )
+            })
+        )
+
+    op.create_index(op.f('ix_properties_property_type_code'), 'properties', ['property_type_code'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_properties_property_type_code'), table_name='properties')
+    for _, code_column, _ in reversed(CATEGORY_COLUMNS):
+        op.drop_column('properties', code_column)
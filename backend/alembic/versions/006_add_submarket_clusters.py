@@ -0,0 +1,44 @@
+"""Add submarket clusters
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('cluster_id', sa.SmallInteger(), nullable=True))
+    op.create_index(op.f('ix_properties_cluster_id'), 'properties', ['cluster_id'], unique=False)
+
+    op.create_table('submarket_models',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('k', sa.Integer(), nullable=False),
+        sa.Column('feature_means', sa.JSON(), nullable=False),
+        sa.Column('feature_scales', sa.JSON(), nullable=False),
+        sa.Column('centroids', sa.JSON(), nullable=False),
+        sa.Column('cluster_sizes', sa.JSON(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False, default=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, default=datetime.utcnow),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_submarket_models_id'), 'submarket_models', ['id'], unique=False)
+    op.create_index(op.f('ix_submarket_models_is_active'), 'submarket_models', ['is_active'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_submarket_models_is_active'), table_name='submarket_models')
+    op.drop_index(op.f('ix_submarket_models_id'), table_name='submarket_models')
+    op.drop_table('submarket_models')
+
+    op.drop_index(op.f('ix_properties_cluster_id'), table_name='properties')
+    op.drop_column('properties', 'cluster_id')
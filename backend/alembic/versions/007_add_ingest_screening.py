@@ -0,0 +1,56 @@
+"""Add ingest-time anomaly screening
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('properties', sa.Column('anomaly_score', sa.Float(), nullable=True))
+    op.add_column('properties', sa.Column('is_anomaly', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column('properties', sa.Column('is_quarantined', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.create_index(op.f('ix_properties_is_anomaly'), 'properties', ['is_anomaly'], unique=False)
+    op.create_index(op.f('ix_properties_is_quarantined'), 'properties', ['is_quarantined'], unique=False)
+
+    op.create_table('screening_segments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('property_type', sa.String(), nullable=False),
+        sa.Column('district', sa.String(), nullable=False),
+        sa.Column('observations', sa.Integer(), nullable=False, default=0),
+        sa.Column('median', sa.Float(), nullable=True),
+        sa.Column('mad', sa.Float(), nullable=True),
+        sa.Column('warmup', sa.JSON(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, default=datetime.utcnow),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_screening_segments_id'), 'screening_segments', ['id'], unique=False)
+    op.create_index(
+        'ix_screening_segments_segment',
+        'screening_segments',
+        ['property_type', 'district'],
+        unique=True
+    )
+    # Segment statistics are filled by screening_service.rescreen() after the upgrade
+
+
+def downgrade() -> None:
+    op.drop_index('ix_screening_segments_segment', table_name='screening_segments')
+    op.drop_index(op.f('ix_screening_segments_id'), table_name='screening_segments')
+    op.drop_table('screening_segments')
+
+    op.drop_index(op.f('ix_properties_is_quarantined'), table_name='properties')
+    op.drop_index(op.f('ix_properties_is_anomaly'), table_name='properties')
+    op.drop_column('properties', 'is_quarantined')
+    op.drop_column('properties', 'is_anomaly')
+    op.drop_column('properties', 'anomaly_score')
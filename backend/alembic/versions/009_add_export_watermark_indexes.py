@@ -0,0 +1,39 @@
+"""Add watermark indexes for incremental bulk exports
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination cannot step over NULL watermarks
+    op.execute(
+        "UPDATE properties SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+        "WHERE updated_at IS NULL"
+    )
+    op.execute(
+        "UPDATE valuation_history SET valuation_date = CURRENT_TIMESTAMP "
+        "WHERE valuation_date IS NULL"
+    )
+    op.create_index('ix_properties_updated_at_id', 'properties', ['updated_at', 'id'], unique=False)
+    op.create_index(
+        'ix_valuation_history_valuation_date_id',
+        'valuation_history',
+        ['valuation_date', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_valuation_history_valuation_date_id', table_name='valuation_history')
+    op.drop_index('ix_properties_updated_at_id', table_name='properties')
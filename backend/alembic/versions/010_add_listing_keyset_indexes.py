@@ -0,0 +1,31 @@
+"""Add composite indexes for keyset pagination of listings
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The valuation history listing walks ix_valuation_history_valuation_date_id (009)
+    op.create_index('ix_properties_property_type_id', 'properties', ['property_type', 'id'], unique=False)
+    op.create_index(
+        'ix_adjustment_coefficients_is_active_id',
+        'adjustment_coefficients',
+        ['is_active', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_adjustment_coefficients_is_active_id', table_name='adjustment_coefficients')
+    op.drop_index('ix_properties_property_type_id', table_name='properties')
@@ -0,0 +1,33 @@
+"""Add composite indexes for property listing filters
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('ix_properties_price', ['price']),
+    ('ix_properties_property_type_price', ['property_type', 'price']),
+    ('ix_properties_property_type_area', ['property_type', 'area']),
+    ('ix_properties_latitude_longitude', ['latitude', 'longitude']),
+    ('ix_properties_created_at_id', ['created_at', 'id']),
+)
+
+
+def upgrade() -> None:
+    for name, columns in INDEXES:
+        op.create_index(name, 'properties', columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='properties')
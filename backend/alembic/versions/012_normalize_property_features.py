@@ -0,0 +1,132 @@
+"""Move property features from the JSON column into property_features
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+# Properties copied per round trip in either direction
+BACKFILL_CHUNK_SIZE = 1000
+
+properties = sa.table('properties',
+    sa.column('id', sa.Integer()),
+    sa.column('features', sa.JSON()),
+    sa.column('created_at', sa.DateTime()),
+    sa.column('updated_at', sa.DateTime())
+)
+property_features = sa.table('property_features',
+    sa.column('id', sa.Integer()),
+    sa.column('property_id', sa.Integer()),
+    sa.column('name', sa.String()),
+    sa.column('value', sa.Float()),
+    sa.column('unit', sa.String()),
+    sa.column('description', sa.String()),
+    sa.column('created_at', sa.DateTime()),
+    sa.column('updated_at', sa.DateTime())
+)
+
+
+def _feature_rows(property_id, features, created_at, updated_at):
+    for feature in features or ():
+        if not isinstance(feature, dict) or not feature.get('name'):
+            continue
+        try:
+            value = float(feature.get('value'))
+        except (TypeError, ValueError):
+            continue
+        yield {
+            'property_id': property_id,
+            'name': feature['name'],
+            'value': value,
+            'unit': feature.get('unit'),
+            'description': feature.get('description'),
+            'created_at': created_at or datetime.utcnow(),
+            'updated_at': updated_at or created_at or datetime.utcnow()
+        }
+
+
+def _property_id_chunks(bind, query):
+    """
+    Keyset walk over property ids, BACKFILL_CHUNK_SIZE rows at a time
+    """
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            query.where(properties.c.id > last_id).order_by(properties.c.id).limit(BACKFILL_CHUNK_SIZE)
+        ).fetchall()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    op.create_index('ix_property_features_property_id', 'property_features', ['property_id'], unique=False)
+    op.create_index('ix_property_features_name_value', 'property_features', ['name', 'value'], unique=False)
+    op.drop_index(op.f('ix_property_features_name'), table_name='property_features')
+    if bind.dialect.name == 'postgresql':
+        op.drop_constraint('property_features_property_id_fkey', 'property_features', type_='foreignkey')
+        op.create_foreign_key(
+            'property_features_property_id_fkey', 'property_features', 'properties',
+            ['property_id'], ['id'], ondelete='CASCADE'
+        )
+
+    # Backfill in chunks; properties that already have rows are left alone
+    already_normalized = sa.exists().where(property_features.c.property_id == properties.c.id)
+    query = sa.select(
+        properties.c.id, properties.c.features, properties.c.created_at, properties.c.updated_at
+    ).where(properties.c.features.isnot(None)).where(~already_normalized)
+    for rows in _property_id_chunks(bind, query):
+        values = [feature for row in rows for feature in _feature_rows(*row)]
+        if values:
+            bind.execute(property_features.insert(), values)
+
+    with op.batch_alter_table('properties') as batch_op:
+        batch_op.drop_column('features')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    with op.batch_alter_table('properties') as batch_op:
+        batch_op.add_column(sa.Column('features', sa.JSON(), nullable=True))
+
+    for rows in _property_id_chunks(bind, sa.select(properties.c.id)):
+        ids = [row[0] for row in rows]
+        features = {property_id: [] for property_id in ids}
+        for property_id, name, value, unit, description in bind.execute(
+            sa.select(
+                property_features.c.property_id, property_features.c.name, property_features.c.value,
+                property_features.c.unit, property_features.c.description
+            ).where(property_features.c.property_id.in_(ids))
+            .order_by(property_features.c.property_id, property_features.c.id)
+        ):
+            features[property_id].append({'name': name, 'value': value, 'unit': unit, 'description': description})
+        bind.execute(
+            properties.update().where(properties.c.id == sa.bindparam('target_id'))
+            .values(features=sa.bindparam('new_features')),
+            [{'target_id': property_id, 'new_features': items} for property_id, items in features.items()]
+        )
+    op.execute(property_features.delete())
+
+    if bind.dialect.name == 'postgresql':
+        op.drop_constraint('property_features_property_id_fkey', 'property_features', type_='foreignkey')
+        op.create_foreign_key(
+            'property_features_property_id_fkey', 'property_features', 'properties',
+            ['property_id'], ['id']
+        )
+    op.create_index(op.f('ix_property_features_name'), 'property_features', ['name'], unique=False)
+    op.drop_index('ix_property_features_name_value', table_name='property_features')
+    op.drop_index('ix_property_features_property_id', table_name='property_features')
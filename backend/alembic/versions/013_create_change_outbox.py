@@ -0,0 +1,41 @@
+"""Create the change outbox and subscriber checkpoints
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # AUTOINCREMENT on SQLite: ids are feed offsets and must not be reused
+    op.create_table('outbox_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('aggregate', sa.String(), nullable=False),
+        sa.Column('aggregate_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, default=datetime.utcnow),
+        sa.PrimaryKeyConstraint('id'),
+        sqlite_autoincrement=True
+    )
+    op.create_table('outbox_checkpoints',
+        sa.Column('subscriber', sa.String(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False, default=0),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('subscriber')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('outbox_checkpoints')
+    op.drop_table('outbox_events')
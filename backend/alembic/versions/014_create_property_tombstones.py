@@ -0,0 +1,36 @@
+"""Create property tombstones for delta sync
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Changed rows are walked on ix_properties_updated_at_id (009)
+    op.create_table('property_tombstones',
+        sa.Column('property_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False, default=datetime.utcnow),
+        sa.PrimaryKeyConstraint('property_id')
+    )
+    op.create_index(
+        'ix_property_tombstones_deleted_at_property_id',
+        'property_tombstones',
+        ['deleted_at', 'property_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_property_tombstones_deleted_at_property_id', table_name='property_tombstones')
+    op.drop_table('property_tombstones')
@@ -0,0 +1,43 @@
+"""Create maintenance jobs
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('maintenance_jobs',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False, default='pending'),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, default=datetime.utcnow),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_maintenance_jobs_user_id'), 'maintenance_jobs', ['user_id'], unique=False)
+    op.create_index(op.f('ix_maintenance_jobs_kind'), 'maintenance_jobs', ['kind'], unique=False)
+    op.create_index(op.f('ix_maintenance_jobs_status'), 'maintenance_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_maintenance_jobs_status'), table_name='maintenance_jobs')
+    op.drop_index(op.f('ix_maintenance_jobs_kind'), table_name='maintenance_jobs')
+    op.drop_index(op.f('ix_maintenance_jobs_user_id'), table_name='maintenance_jobs')
+    op.drop_table('maintenance_jobs')
@@ -2,11 +2,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from typing import Optional
 import models
 import schemas
-from database import get_db
+from database import get_db, get_async_db
 from services.user_service import user_service
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -26,11 +27,11 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
         )
 
 @router.post("/login", response_model=dict)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     Login user and return access token
     """
-    user = user_service.authenticate_user(
+    user = await user_service.authenticate_user_async(
         db=db,
         email=form_data.username,  # OAuth2PasswordRequestForm uses 'username' field
         password=form_data.password
@@ -50,7 +51,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         )
     
     # Update last login
-    user_service.update_last_login(db=db, user_id=user.id)
+    await user_service.update_last_login_async(db=db, user=user)
     
     # Create access token
     access_token_expires = timedelta(minutes=30)
@@ -0,0 +1,106 @@
+# backend/benchmarks/async_throughput.py
+"""
+Throughput of the property listing on the sync and async request paths.
+
+The sync path is what a `def` endpoint does: the handler runs in Starlette's
+worker thread pool (40 threads) with a sync Session. The async path awaits
+an AsyncSession on the event loop. Both run the same listing query, many
+requests at a time, against DATABASE_URL:
+
+    DATABASE_URL=postgresql://... python benchmarks/async_throughput.py --seed 5000
+    python benchmarks/async_throughput.py --concurrency 10 100 500 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import insert
+from starlette.concurrency import run_in_threadpool
+import models
+from database import AsyncSessionLocal, SessionLocal, async_engine, engine
+from services.property_service import property_service
+
+
+def seed(count: int) -> None:
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        rows = []
+        for i in range(count):
+            lat, lng = 43.20 + (i % 100) * 0.001, 76.85 + (i // 100 % 100) * 0.001
+            rows.append({
+                "address": f"Benchmark {i}",
+                "property_type": "apartment",
+                "area": 50.0 + i % 80,
+                "floor_level": 1 + i % 12,
+                "total_floors": 12,
+                "condition": "good",
+                "renovation_status": "original",
+                "location": {"lat": lat, "lng": lng},
+                "latitude": lat,
+                "longitude": lng,
+                "price": 25000000.0 + (i % 200) * 250000
+            })
+        db.execute(insert(models.Property), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+def list_sync(limit: int) -> int:
+    db = SessionLocal()
+    try:
+        return len(property_service.get_properties(db, limit=limit, min_price=30000000))
+    finally:
+        db.close()
+
+
+async def list_async(limit: int) -> int:
+    async with AsyncSessionLocal() as db:
+        return len(await property_service.get_properties_async(db, limit=limit, min_price=30000000))
+
+
+async def run(handler, concurrency: int, requests: int) -> float:
+    """
+    Requests per second with `concurrency` requests in flight
+    """
+    remaining = iter(range(requests))
+
+    async def client():
+        for _ in remaining:
+            await handler()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(args) -> None:
+    paths = {
+        "sync (threadpool)": lambda: run_in_threadpool(list_sync, args.limit),
+        "async": lambda: list_async(args.limit)
+    }
+    print(f"{'concurrency':>11}  " + "  ".join(f"{name:>18}" for name in paths))
+    for concurrency in args.concurrency:
+        rates = []
+        for handler in paths.values():
+            await run(handler, min(concurrency, 10), min(args.requests, 100))  # warm up
+            rates.append(await run(handler, concurrency, args.requests))
+        print(f"{concurrency:>11}  " + "  ".join(f"{rate:>14.0f} r/s" for rate in rates))
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0, help="insert this many properties first")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    if args.seed:
+        seed(args.seed)
+    asyncio.run(main(args))
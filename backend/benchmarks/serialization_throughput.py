@@ -0,0 +1,142 @@
+# backend/benchmarks/serialization_throughput.py
+"""
+Rows per second of GET /api/properties/ and GET /api/valuation/history pages.
+
+The "validated" path is what FastAPI does for an endpoint returning ORM
+objects: load entities, validate them against the response_model, run
+jsonable_encoder and render with the json module. The "fast" path is what
+the endpoints do now: read plain rows, build the response models with
+model_construct() and render them with orjson. Both include the query:
+
+    DATABASE_URL=sqlite:////tmp/bench.db python benchmarks/serialization_throughput.py --seed 5000
+    python benchmarks/serialization_throughput.py --limit 1000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import insert
+import models
+import schemas
+from database import AsyncSessionLocal, SessionLocal, async_engine, engine
+from services.property_service import property_service
+from services.serialization import models_response
+from services.valuation_service import valuation_service
+
+
+def seed(count: int) -> None:
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        rows = []
+        for i in range(count):
+            lat, lng = 43.20 + (i % 100) * 0.001, 76.85 + (i // 100 % 100) * 0.001
+            rows.append({
+                "address": f"Benchmark {i}",
+                "property_type": "apartment",
+                "area": 50.0 + i % 80,
+                "floor_level": 1 + i % 12,
+                "total_floors": 12,
+                "condition": "good",
+                "renovation_status": "original",
+                "location": {"lat": lat, "lng": lng},
+                "latitude": lat,
+                "longitude": lng,
+                "price": 25000000.0 + (i % 200) * 250000,
+                "created_at": now,
+                "updated_at": now
+            })
+        ids = db.execute(
+            insert(models.Property).returning(models.Property.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        db.execute(insert(models.PropertyFeature), [
+            {"property_id": property_id, "name": name, "value": value, "unit": "count", "created_at": now, "updated_at": now}
+            for property_id in ids
+            for name, value in (("parking", 1), ("balcony", 2))
+        ])
+        db.execute(insert(models.ValuationHistory), [{
+            "property_id": property_id,
+            "valuation_date": now - timedelta(minutes=i),
+            "valuation_type": "subject",
+            "original_price": 30000000.0,
+            "adjusted_price": 31500000.0,
+            "adjustments": {"area": 0.03, "floor": -0.01, "condition": 0.02},
+            "comparable_properties": ids[max(i - 3, 0):i] or [property_id],
+            "created_by": "benchmark",
+            "notes": None
+        } for i, property_id in enumerate(ids)])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def validated(load, schema, limit: int) -> int:
+    """
+    ORM entities through response_model validation and jsonable_encoder
+    """
+    field = create_response_field(name="Response", type_=List[schema])
+    async with AsyncSessionLocal() as db:
+        items = await load(db, limit=limit)
+        content = await serialize_response(field=field, response_content=items, is_coroutine=True)
+        JSONResponse(content)
+    return len(items)
+
+
+async def fast(load, limit: int) -> int:
+    """
+    Rows built into response models and rendered with orjson
+    """
+    async with AsyncSessionLocal() as db:
+        items = await load(db, limit=limit)
+        models_response(items)
+    return len(items)
+
+
+async def rate(handler, repeat: int) -> float:
+    await handler()  # warm up
+    rows = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        rows += await handler()
+    return rows / (time.perf_counter() - started)
+
+
+async def main(args) -> None:
+    endpoints = {
+        "GET /api/properties/": (
+            lambda: validated(property_service.get_properties_async, schemas.Property, args.limit),
+            lambda: fast(property_service.get_property_rows_async, args.limit)
+        ),
+        "GET /api/valuation/history": (
+            lambda: validated(valuation_service.get_valuation_history_async, schemas.ValuationHistory, args.limit),
+            lambda: fast(valuation_service.get_valuation_history_rows_async, args.limit)
+        )
+    }
+    print(f"page size {args.limit}, {args.repeat} pages per path")
+    print(f"{'endpoint':<28}{'validated':>16}{'fast':>16}{'speedup':>10}")
+    for name, (slow_path, fast_path) in endpoints.items():
+        slow_rate = await rate(slow_path, args.repeat)
+        fast_rate = await rate(fast_path, args.repeat)
+        print(f"{name:<28}{slow_rate:>10.0f} rows/s{fast_rate:>10.0f} rows/s{fast_rate / slow_rate:>9.1f}x")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0, help="insert this many properties (with history) first")
+    parser.add_argument("--limit", type=int, default=1000, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if args.seed:
+        seed(args.seed)
+    asyncio.run(main(args))
@@ -0,0 +1,192 @@
+# backend/categories.py
+from enum import IntEnum
+from typing import Dict, Iterable, Optional, Type
+import numpy as np
+
+
+class PropertyType(IntEnum):
+    APARTMENT = 1
+    HOUSE = 2
+    COMMERCIAL = 3
+    LAND = 4
+
+
+class Condition(IntEnum):
+    EXCELLENT = 1
+    GOOD = 2
+    FAIR = 3
+    POOR = 4
+
+
+class RenovationStatus(IntEnum):
+    RECENTLY_RENOVATED = 1
+    PARTIALLY_RENOVATED = 2
+    ORIGINAL = 3
+    NEEDS_RENOVATION = 4
+
+
+class CategoryRegistry:
+    """
+    Canonical values of a categorical property attribute.
+
+    Each member has a small-integer code (stored in SMALLINT columns), a
+    canonical API string, optional aliases accepted on input, and a score
+    used by the valuation engine. Members are declared best-first, so the
+    code order doubles as a quality rank for similarity scoring.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        enum: Type[IntEnum],
+        canonical: Dict[IntEnum, str],
+        aliases: Optional[Dict[str, IntEnum]] = None,
+        scores: Optional[Dict[IntEnum, float]] = None,
+        default_score: float = 0.0
+    ):
+        self.name = name
+        self.enum = enum
+        self._names = {int(member): value for member, value in canonical.items()}
+        self._codes = {value.lower(): int(member) for member, value in canonical.items()}
+        for alias, member in (aliases or {}).items():
+            self._codes[alias.lower()] = int(member)
+        self._scores = {int(member): score for member, score in (scores or {}).items()}
+        self.default_score = default_score
+
+        size = max(self._names) + 1
+        self._score_table = np.full(size, default_score, dtype=float)
+        for code, score in self._scores.items():
+            self._score_table[code] = score
+
+    @property
+    def values(self) -> Iterable[str]:
+        return list(self._names.values())
+
+    def aliases(self) -> Dict[str, int]:
+        """
+        Every accepted spelling (lowercase) mapped to its code
+        """
+        return dict(self._codes)
+
+    def code(self, value: Optional[str]) -> Optional[int]:
+        """
+        Code of a canonical value or alias; None for unknown values
+        """
+        if value is None:
+            return None
+        return self._codes.get(str(value).strip().lower())
+
+    def label(self, code: Optional[int]) -> Optional[str]:
+        """
+        Canonical string of a code
+        """
+        return self._names.get(code) if code is not None else None
+
+    def normalize(self, value: str) -> str:
+        """
+        Canonical string of a value or alias; raises ValueError when unknown
+        """
+        code = self.code(value)
+        if code is None:
+            allowed = ", ".join(self.values)
+            raise ValueError(f"Unknown {self.name} '{value}'. Allowed values: {allowed}")
+        return self._names[code]
+
+    def score(self, value: Optional[str], default: Optional[float] = None) -> float:
+        """
+        Valuation score of a value, `default` (or the registry default) when unknown
+        """
+        code = self.code(value)
+        if code is None or code not in self._scores:
+            return self.default_score if default is None else default
+        return self._scores[code]
+
+    def rank(self, code: Optional[int]) -> float:
+        """
+        Quality rank (0 = best) of a code; unknown codes rank in the middle
+        """
+        if code is None or code not in self._names:
+            return (len(self._names) - 1) / 2
+        return float(code - 1)
+
+    def rank_array(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Vectorized rank of an array of codes (NaN for unknown -> middle rank)
+        """
+        codes = np.asarray(codes, dtype=float)
+        ranks = codes - 1
+        middle = (len(self._names) - 1) / 2
+        unknown = np.isnan(codes) | (codes < 1) | (codes > len(self._names))
+        ranks[unknown] = middle
+        return ranks
+
+    def score_array(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Vectorized valuation score of an array of codes
+        """
+        codes = np.asarray(codes, dtype=float)
+        valid = ~np.isnan(codes) & (codes >= 0) & (codes < len(self._score_table))
+        scores = np.full(codes.shape, self.default_score, dtype=float)
+        scores[valid] = self._score_table[codes[valid].astype(int)]
+        return scores
+
+
+PROPERTY_TYPES = CategoryRegistry(
+    "property_type",
+    PropertyType,
+    canonical={
+        PropertyType.APARTMENT: "apartment",
+        PropertyType.HOUSE: "house",
+        PropertyType.COMMERCIAL: "commercial",
+        PropertyType.LAND: "land"
+    },
+    aliases={
+        "flat": PropertyType.APARTMENT
+    }
+)
+
+CONDITIONS = CategoryRegistry(
+    "condition",
+    Condition,
+    canonical={
+        Condition.EXCELLENT: "excellent",
+        Condition.GOOD: "good",
+        Condition.FAIR: "fair",
+        Condition.POOR: "poor"
+    },
+    scores={
+        Condition.EXCELLENT: 1.0,
+        Condition.GOOD: 0.9,
+        Condition.FAIR: 0.8,
+        Condition.POOR: 0.7
+    },
+    default_score=0.8
+)
+
+RENOVATION_STATUSES = CategoryRegistry(
+    "renovation_status",
+    RenovationStatus,
+    canonical={
+        RenovationStatus.RECENTLY_RENOVATED: "recentlyRenovated",
+        RenovationStatus.PARTIALLY_RENOVATED: "partiallyRenovated",
+        RenovationStatus.ORIGINAL: "original",
+        RenovationStatus.NEEDS_RENOVATION: "needsRenovation"
+    },
+    # Legacy vocabularies (analytics and valuation/models.py)
+    aliases={
+        "new": RenovationStatus.RECENTLY_RENOVATED,
+        "renovated": RenovationStatus.RECENTLY_RENOVATED,
+        "partial": RenovationStatus.PARTIALLY_RENOVATED,
+        "none": RenovationStatus.ORIGINAL,
+        "recently_renovated": RenovationStatus.RECENTLY_RENOVATED,
+        "partially_renovated": RenovationStatus.PARTIALLY_RENOVATED,
+        "needs_renovation": RenovationStatus.NEEDS_RENOVATION
+    },
+    scores={
+        RenovationStatus.RECENTLY_RENOVATED: 1.0,
+        RenovationStatus.PARTIALLY_RENOVATED: 0.8,
+        RenovationStatus.ORIGINAL: 0.6,
+        RenovationStatus.NEEDS_RENOVATION: 0.4
+    },
+    default_score=0.6
+)
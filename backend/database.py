@@ -1,21 +1,286 @@
-from sqlalchemy import create_engine
+from sqlalchemy import bindparam, create_engine, event, exc, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Any, Callable, Dict, List, Type, Union
+import logging
+import threading
+import time
+import weakref
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+# Async driver for each sync database URL scheme
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite"
+}
+
+def async_database_url(url: str) -> str:
+    """
+    The same database addressed through its async driver
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+class PoolStats:
+    """
+    Checkout counters of one pool. On the timed pools (server databases)
+    wait is measured around each checkout, so it covers queueing for a free
+    connection as well as opening a new one.
+    """
+
+    def __init__(self, timed: bool):
+        self._lock = threading.Lock()
+        self.timed = timed
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait: float = 0.0) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: Any) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": None,
+                "max_wait_ms": None
+            }
+            if self.timed:
+                stats["avg_wait_ms"] = 1000 * self.total_wait / self.checkouts if self.checkouts else 0.0
+                stats["max_wait_ms"] = 1000 * self.max_wait
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0)
+            )
+        return stats
+
+
+class _TimedPool:
+    """
+    Pool mixin timing every checkout into `stats`
+    """
+    stats: PoolStats
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting into the same stats
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+# Counters per engine; they outlive pools replaced by engine.dispose()
+_pool_stats: "weakref.WeakKeyDictionary[Engine, PoolStats]" = weakref.WeakKeyDictionary()
+
+
+def _engine_options(url: str, async_: bool) -> Dict[str, Any]:
+    if make_url(url).get_backend_name() == "sqlite":
+        # Local file or memory: SQLAlchemy picks the pool class, and an
+        # in-memory database must keep its single connection
+        return {}
+    return {
+        "poolclass": TimedAsyncQueuePool if async_ else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+
+
+def create_db_engine(
+    url: str = settings.DATABASE_URL,
+    async_: bool = False,
+    **overrides
+) -> Union[Engine, AsyncEngine]:
+    """
+    The single place engines are created: pool size, overflow, timeout,
+    recycle and pre-ping come from settings (`overrides` wins), and pool
+    usage is counted for pool_stats()
+    """
+    options = {**_engine_options(url, async_), **overrides}
+    if async_:
+        engine = create_async_engine(async_database_url(url), **options)
+        sync_engine = engine.sync_engine
+    else:
+        engine = sync_engine = create_engine(url, **options)
+
+    pool = sync_engine.pool
+    stats = _pool_stats[sync_engine] = PoolStats(timed=isinstance(pool, _TimedPool))
+    if stats.timed:
+        pool.stats = stats
+    else:
+        event.listen(pool, "checkout", lambda *args: stats.record_checkout())
+    event.listen(pool, "connect", lambda *args: stats.record_connect())
+    return engine
+
+
+def pool_stats(engine: Union[Engine, AsyncEngine]) -> Dict[str, Any]:
+    """
+    Current pool state and checkout counters of an engine made by
+    create_db_engine()
+    """
+    sync_engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+    return _pool_stats[sync_engine].snapshot(sync_engine.pool)
+
+
+def prewarm(engine: Engine, count: int = settings.DB_POOL_PREWARM) -> int:
+    """
+    Open `count` pooled connections and return them to the pool, so the
+    first requests after a deploy skip the connect cost. Returns the number
+    of connections opened; failures are logged, not raised.
+    """
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connections.append(connection)
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning("Connection pool pre-warm stopped: %s", e)
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+async def prewarm_async(engine: AsyncEngine, count: int = settings.DB_POOL_PREWARM) -> int:
+    """
+    Async counterpart of prewarm()
+    """
+    connections = []
+    try:
+        for _ in range(count):
+            connection = await engine.connect()
+            connections.append(connection)
+            await connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning("Async connection pool pre-warm stopped: %s", e)
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+
 # Create SQLAlchemy engine
-engine = create_engine(settings.DATABASE_URL)
+engine = create_db_engine(settings.DATABASE_URL)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the endpoints on the async request path
+async_engine = create_db_engine(settings.DATABASE_URL, async_=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class
 Base = declarative_base()
 
+# Session.info flag of sessions bound to a read replica
+READ_REPLICA = "read_replica"
+
+# INSERT ... ON CONFLICT DO NOTHING per dialect
+_UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert
+}
+
+def lock_or_create(db: Session, model: Type[Any], key: Dict[str, Any], defaults: Dict[str, Any]) -> Any:
+    """
+    Row of `model` matching `key` (the columns of a unique index), locked
+    FOR UPDATE and inserted with `defaults` first when missing. The insert
+    skips conflicts, so concurrent first writers of the same key both end
+    up locking the one row instead of failing on the unique index.
+    """
+    query = db.query(model).filter_by(**key).with_for_update()
+    row = query.first()
+    if row is not None:
+        return row
+    insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        db.add(model(**key, **defaults))
+        db.flush()
+    else:
+        db.execute(insert(model).values(**key, **defaults).on_conflict_do_nothing(index_elements=list(key)))
+    return query.first()
+
+def update_by_id(db: Session, model: Type[Any], rows: List[Dict[str, Any]]) -> None:
+    """
+    UPDATE rows of `model` from {"id": ..., column: value} dicts (the same
+    columns in each) leaving updated_at as it was. For maintenance columns
+    such as anomaly flags and cluster labels, which are not a change of the
+    listing and must not send it down the delta sync feed again.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    columns = [column for column in rows[0] if column != "id"]
+    statement = table.update()\
+        .where(table.c.id == bindparam("_id"))\
+        .values(updated_at=table.c.updated_at, **{column: bindparam(f"_{column}") for column in columns})
+    db.execute(statement, [
+        {f"_{column}": value for column, value in row.items()}
+        for row in rows
+    ])
+
 # Dependency to get DB session
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+# Dependency to get the session factory, for work that outlives the request
+def get_session_factory() -> Callable[[], Session]:
+    return SessionLocal
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
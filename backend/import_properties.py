@@ -0,0 +1,55 @@
+# backend/import_properties.py
+"""
+Bulk import properties from a CSV or XLSX file:
+
+    python import_properties.py listings.csv [--chunk-size 1000] [--no-geocode]
+        [--method auto|insert|copy] [--errors errors.json]
+"""
+import argparse
+import json
+import os
+import sys
+from database import SessionLocal
+from services.import_service import import_service, IMPORT_CHUNK_SIZE, IMPORT_FORMATS, IMPORT_METHODS
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk import properties from CSV/XLSX")
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument("--no-geocode", action="store_true", help="reject rows without coordinates")
+    parser.add_argument("--method", choices=IMPORT_METHODS, default="auto")
+    parser.add_argument("--errors", help="write the per-row error report to this JSON file")
+    args = parser.parse_args(argv)
+
+    format = os.path.splitext(args.path)[1].lstrip(".").lower()
+    if format not in IMPORT_FORMATS:
+        parser.error(f"unsupported file type, expected one of: {', '.join(IMPORT_FORMATS)}")
+
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as f:
+            report = import_service.import_file(
+                db, f, format,
+                chunk_size=args.chunk_size,
+                geocode=not args.no_geocode,
+                method=args.method
+            )
+    finally:
+        db.close()
+
+    print(
+        f"{report['imported']} of {report['total']} rows imported, {report['failed']} failed, "
+        f"{report['anomalies']} flagged as anomalies, {report['geocoded']} addresses geocoded"
+    )
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            json.dump(report["errors"], f, ensure_ascii=False, indent=2)
+    else:
+        for error in report["errors"][:20]:
+            print(f"  row {error['row']}: {'; '.join(error['errors'])}", file=sys.stderr)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
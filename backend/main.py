@@ -1,19 +1,34 @@
 # backend/main.py
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Header, Query
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Awaitable, Callable, List, Optional
 import uvicorn
 import models
 import schemas
-from database import SessionLocal, engine, get_db
-from services.property_service import property_service
-from services.valuation_service import valuation_service
-from services.export_service import export_service
+from database import (
+    SessionLocal, engine, async_engine, get_db, get_async_db,
+    pool_stats, prewarm, prewarm_async
+)
+from services.property_service import property_service, PROPERTY_PAGE_KEY
+from services.valuation_service import valuation_service, HISTORY_PAGE_KEY
+from services.export_service import export_service, PDF_MEDIA_TYPE, EXCEL_MEDIA_TYPE, MAX_BATCH_REPORTS
 from services.user_service import user_service
 from datetime import datetime
 from auth import router as auth_router
-from routes import adjustments
+from routes import adjustments, analytics, exports, bulk_export, property_import, changes
+from services.analytics_runner import analytics_runner
+from services.export_job_service import export_job_service
+from services.maintenance_job_service import maintenance_job_service
+from services.report_cache import report_cache, etag_matches
+from services.pagination import next_cursor, NEXT_CURSOR_HEADER
+from services.serialization import models_response, ndjson_response
+from services.property_cache import property_cache
+from services.outbox_service import outbox_dispatcher
+from services.replica_router import replica_router, track_writes, get_read_db, get_async_read_db
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
@@ -21,7 +36,8 @@ models.Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="Real Estate Valuation API",
     description="API for automated real estate valuation using comparative approach",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -31,11 +47,51 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "X-Export-Watermark", "X-Render-Seconds", "ETag"],
 )
 
 # Include auth router
 app.include_router(auth_router)
 app.include_router(adjustments.router)
+app.include_router(analytics.router)
+app.include_router(exports.router)
+app.include_router(bulk_export.router)
+app.include_router(property_import.router)
+app.include_router(changes.router)
+
+# Pin users who just wrote to the primary for their next reads
+app.middleware("http")(track_writes)
+
+@app.on_event("startup")
+async def warm_connection_pools():
+    # Open pooled connections before the first request needs them
+    await run_in_threadpool(prewarm, engine)
+    await prewarm_async(async_engine)
+    await run_in_threadpool(replica_router.prewarm)
+    outbox_dispatcher.start()
+
+@app.on_event("startup")
+def fail_lost_jobs():
+    # Jobs left active by a stopped worker would hold their slots forever
+    db = SessionLocal()
+    try:
+        export_job_service.fail_lost(db)
+        maintenance_job_service.fail_lost(db)
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    outbox_dispatcher.stop()
+    analytics_runner.shutdown()
+    export_job_service.shutdown()
+    maintenance_job_service.shutdown()
+    export_service.shutdown()
+
+def _page_response(items: list, key: tuple, limit: int) -> Response:
+    # Items are response models built from rows; rendered with orjson as-is
+    cursor = next_cursor(items, key, limit)
+    return models_response(items, headers={NEXT_CURSOR_HEADER: cursor} if cursor is not None else None)
 
 # Property endpoints
 @app.post("/api/properties/", response_model=schemas.Property)
@@ -46,28 +102,127 @@ def create_property(
 ):
     return property_service.create_property(db=db, property_data=property)
 
+@app.post("/api/properties/bulk", response_model=schemas.PropertyBulkResult)
+def bulk_properties(
+    batch: schemas.PropertyBulkRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    result = property_service.bulk_apply(
+        db=db,
+        create=batch.create,
+        update=batch.update,
+        delete=batch.delete,
+        atomic=batch.atomic
+    )
+    if result["committed"]:
+        # One invalidation per batch rather than per row
+        analytics_runner.cache.clear()
+    return result
+
 @app.get("/api/properties/", response_model=List[schemas.Property])
-def get_properties(
+async def get_properties(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     property_type: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(user_service.get_current_user)
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_area: Optional[float] = Query(None, ge=0),
+    max_area: Optional[float] = Query(None, ge=0),
+    min_floor: Optional[int] = None,
+    max_floor: Optional[int] = None,
+    condition: Optional[List[str]] = Query(None),
+    renovation_status: Optional[List[str]] = Query(None),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    updated_from: Optional[datetime] = None,
+    updated_to: Optional[datetime] = None,
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lng: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lng: Optional[float] = Query(None, ge=-180, le=180),
+    feature: Optional[List[str]] = Query(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(user_service.get_current_user_async)
 ):
-    return property_service.get_properties(
+    bbox = (min_lat, min_lng, max_lat, max_lng)
+    if all(value is None for value in bbox):
+        bbox = None
+    elif any(value is None for value in bbox) or min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(
+            status_code=400,
+            detail="Bounding box needs min_lat <= max_lat and min_lng <= max_lng"
+        )
+
+    properties = await property_service.get_property_rows_async(
         db=db,
         skip=skip,
         limit=limit,
-        property_type=property_type
+        property_type=property_type,
+        min_price=min_price,
+        max_price=max_price,
+        cursor=cursor,
+        min_area=min_area,
+        max_area=max_area,
+        min_floor=min_floor,
+        max_floor=max_floor,
+        condition=condition,
+        renovation_status=renovation_status,
+        created_from=created_from,
+        created_to=created_to,
+        updated_from=updated_from,
+        updated_to=updated_to,
+        bbox=bbox,
+        feature=feature
+    )
+    return _page_response(properties, PROPERTY_PAGE_KEY, limit)
+
+SYNC_FORMATS = ("json", "ndjson")
+SYNC_TOKEN_HEADER = "X-Sync-Token"
+
+@app.get("/api/properties/sync", response_model=schemas.PropertySyncPage)
+async def sync_properties(
+    token: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=5000),
+    format: str = Query("json"),
+    # Primary only: a replica lagging past the settle window could skip changes
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(user_service.get_current_user_async)
+):
+    if format not in SYNC_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported format '{format}'. Allowed formats: {', '.join(SYNC_FORMATS)}"
+        )
+    upserts, deletes, next_token, has_more = await property_service.get_property_changes_async(
+        db=db,
+        token=token,
+        limit=limit
     )
+    headers = {SYNC_TOKEN_HEADER: next_token}
+    if format == "ndjson":
+        # Upserts then deletes, then the token; unset fields are left out
+        return ndjson_response(
+            [{"upsert": item.model_dump(exclude_none=True)} for item in upserts]
+            + [{"delete": property_id} for property_id in deletes]
+            + [{"next_token": next_token, "has_more": has_more}],
+            headers=headers
+        )
+    return ORJSONResponse({
+        "upserts": [item.model_dump() for item in upserts],
+        "deletes": deletes,
+        "next_token": next_token,
+        "has_more": has_more
+    }, headers=headers)
 
 @app.get("/api/properties/{property_id}", response_model=schemas.Property)
-def get_property(
+async def get_property(
     property_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(user_service.get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(user_service.get_current_user_async)
 ):
-    property = property_service.get_property(db=db, property_id=property_id)
+    property = await property_cache.get_async(db, property_id)
     if property is None:
         raise HTTPException(status_code=404, detail="Property not found")
     return property
@@ -117,25 +272,28 @@ def calculate_valuation(
         raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/valuation/history", response_model=List[schemas.ValuationHistory])
-def get_valuation_history(
+async def get_valuation_history(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(user_service.get_current_user)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(user_service.get_current_user_async)
 ):
-    return valuation_service.get_valuation_history(
+    history = await valuation_service.get_valuation_history_rows_async(
         db=db,
         skip=skip,
-        limit=limit
+        limit=limit,
+        cursor=cursor
     )
+    return _page_response(history, HISTORY_PAGE_KEY, limit)
 
 @app.get("/api/valuation/history/{history_id}", response_model=schemas.ValuationHistory)
-def get_valuation_history_item(
+async def get_valuation_history_item(
     history_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(user_service.get_current_user)
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user: models.User = Depends(user_service.get_current_user_async)
 ):
-    history_item = valuation_service.get_valuation_history_item(
+    history_item = await valuation_service.get_valuation_history_item_async(
         db=db,
         history_id=history_id
     )
@@ -143,6 +301,28 @@ def get_valuation_history_item(
         raise HTTPException(status_code=404, detail="Valuation history item not found")
     return history_item
 
+@app.get("/api/valuation/history/{history_id}/report")
+async def get_valuation_history_report(
+    history_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    history_item = valuation_service.get_valuation_history_item(
+        db=db,
+        history_id=history_id
+    )
+    if history_item is None or history_item.property is None:
+        raise HTTPException(status_code=404, detail="Valuation history item not found")
+
+    return await _cached_report(
+        export_service.history_report_key(history_item),
+        lambda: run_in_threadpool(export_service.render_history_pdf, history_item),
+        PDF_MEDIA_TYPE,
+        f"valuation_history_{history_id}.pdf",
+        if_none_match
+    )
+
 # Export endpoints
 @app.post("/api/export/pdf")
 async def export_to_pdf(
@@ -172,11 +352,150 @@ async def export_to_excel(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _attachment(content: bytes, media_type: str, filename: str) -> Response:
+    # Response sets Content-Length from the body
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+async def _cached_report(
+    key: str,
+    render: Callable[[], Awaitable[bytes]],
+    media_type: str,
+    filename: str,
+    if_none_match: Optional[str],
+    method: str = "GET"
+) -> Response:
+    # Strong ETag: the key hashes the exact content and template version
+    etag = f'"{key}"'
+    if etag_matches(if_none_match, etag):
+        # 304 only answers GET/HEAD; other methods fail the precondition
+        if method in ("GET", "HEAD"):
+            return Response(status_code=304, headers={"ETag": etag})
+        raise HTTPException(status_code=412, detail="Precondition failed", headers={"ETag": etag})
+
+    content = report_cache.get(key)
+    if content is None:
+        try:
+            content = await render()
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        report_cache.put(key, content)
+
+    response = _attachment(content, media_type, filename)
+    response.headers["ETag"] = etag
+    return response
+
+@app.post("/api/export/pdf/download")
+async def download_pdf(
+    valuation_data: schemas.ValuationResult,
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    async def render():
+        content, _ = await export_service.render_pdf_async(valuation_data)
+        return content
+
+    return await _cached_report(
+        export_service.report_key(valuation_data, "pdf"),
+        render,
+        PDF_MEDIA_TYPE,
+        export_service.report_filename(valuation_data, "pdf"),
+        if_none_match,
+        method="POST"
+    )
+
+@app.post("/api/export/pdf/batch")
+async def download_pdf_batch(
+    valuations: List[schemas.ValuationResult],
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    if not valuations:
+        raise HTTPException(status_code=400, detail="No valuations to render")
+    if len(valuations) > MAX_BATCH_REPORTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_REPORTS} reports per batch")
+    try:
+        reports = await export_service.render_pdf_batch(valuations)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    spool = await run_in_threadpool(export_service.spool_report_zip, reports)
+    size = spool.seek(0, 2)
+    spool.seek(0)
+    filename = f"valuation_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        export_service.iter_file(spool),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(size),
+            "X-Render-Seconds": f"{sum(seconds for _, _, seconds in reports):.4f}"
+        }
+    )
+
+@app.post("/api/export/excel/download")
+async def download_excel(
+    valuation_data: schemas.ValuationResult,
+    if_none_match: Optional[str] = Header(None),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    return await _cached_report(
+        export_service.report_key(valuation_data, "xlsx"),
+        lambda: run_in_threadpool(export_service.render_excel, valuation_data),
+        EXCEL_MEDIA_TYPE,
+        export_service.report_filename(valuation_data, "xlsx"),
+        if_none_match,
+        method="POST"
+    )
+
+@app.get("/api/export/properties/excel")
+def export_properties_excel(
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    spool = export_service.spool_properties_excel(
+        db,
+        property_type=property_type,
+        min_price=min_price,
+        max_price=max_price
+    )
+    size = spool.seek(0, 2)
+    spool.seek(0)
+    filename = f"properties_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    return StreamingResponse(
+        export_service.iter_file(spool),
+        media_type=EXCEL_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(size)
+        }
+    )
+
 # Health check endpoint (public)
 @app.get("/health")
 def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/health/db")
+def database_health(current_user: models.User = Depends(user_service.get_current_user)):
+    return {
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine),
+        "replicas": replica_router.status()
+    }
+
+@app.get("/health/cache")
+def cache_health(current_user: models.User = Depends(user_service.get_current_user)):
+    return {
+        "property": property_cache.stats(),
+        "analytics": analytics_runner.cache.stats()
+    }
+
 # Public endpoint for testing
 @app.get("/")
 def read_root():
@@ -1,7 +1,12 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, SmallInteger, String, Float, Date, DateTime, JSON, Index
+from sqlalchemy.orm import relationship, validates
 from database import Base
 from datetime import datetime
+import geohash
+from categories import PROPERTY_TYPES, CONDITIONS, RENOVATION_STATUSES
+
+# Geohash length stored per property (~150 m cells); tiles use prefixes of it
+PROPERTY_GEOHASH_PRECISION = 9
 
 
 class Property(Base):
@@ -10,19 +15,87 @@ class Property(Base):
     id = Column(Integer, primary_key=True, index=True)
     address = Column(String, index=True)
     property_type = Column(String, index=True)
+    property_type_code = Column(SmallInteger, index=True)  # categories.PropertyType
     area = Column(Float)
     floor_level = Column(Integer)
     total_floors = Column(Integer)
     condition = Column(String)
+    condition_code = Column(SmallInteger)  # categories.Condition
     renovation_status = Column(String)
+    renovation_code = Column(SmallInteger)  # categories.RenovationStatus
     location = Column(JSON)  # {lat: float, lng: float}
+    latitude = Column(Float)  # Derived from location
+    longitude = Column(Float)  # Derived from location
+    geohash = Column(String, index=True)  # Derived from location
+    cluster_id = Column(SmallInteger, index=True)  # Submarket from SubmarketModel
+    anomaly_score = Column(Float)  # Robust z-score of price per m² in its segment
+    is_anomaly = Column(Boolean, default=False, index=True)
+    is_quarantined = Column(Boolean, default=False, index=True)  # Excluded from analytics and comps
     price = Column(Float)
-    features = Column(JSON)  # List of property features
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     valuation_history = relationship("ValuationHistory", back_populates="property")
+    features = relationship(
+        "PropertyFeature",
+        back_populates="property",
+        cascade="all, delete-orphan",
+        order_by="PropertyFeature.id"
+    )
+
+    __table_args__ = (
+        # Keyset pagination of incremental exports and delta sync
+        Index("ix_properties_updated_at_id", "updated_at", "id"),
+        # Keyset pagination of listings filtered by type
+        Index("ix_properties_property_type_id", "property_type", "id"),
+        # Listing filters
+        Index("ix_properties_price", "price"),
+        Index("ix_properties_property_type_price", "property_type", "price"),
+        Index("ix_properties_property_type_area", "property_type", "area"),
+        Index("ix_properties_latitude_longitude", "latitude", "longitude"),
+        Index("ix_properties_created_at_id", "created_at", "id"),
+    )
+
+    @validates("property_type", "condition", "renovation_status")
+    def _sync_category_codes(self, key, value):
+        if key == "property_type":
+            self.property_type_code = PROPERTY_TYPES.code(value)
+        elif key == "condition":
+            self.condition_code = CONDITIONS.code(value)
+        else:
+            self.renovation_code = RENOVATION_STATUSES.code(value)
+        return value
+
+    @validates("location")
+    def _sync_coordinates(self, key, location):
+        lat = location.get("lat") if location else None
+        lng = location.get("lng") if location else None
+        self.latitude = lat
+        self.longitude = lng
+        if lat is not None and lng is not None:
+            self.geohash = geohash.encode(lat, lng, PROPERTY_GEOHASH_PRECISION)
+        else:
+            self.geohash = None
+        return location
+
+    @validates("features")
+    def _coerce_feature(self, key, feature):
+        # Features arrive as dicts from schemas.PropertyFeature.model_dump()
+        if isinstance(feature, dict):
+            feature = PropertyFeature(**feature)
+        return feature
+
+class PropertyTombstone(Base):
+    __tablename__ = "property_tombstones"
+
+    # Deleted properties, so delta sync clients can drop their copies
+    property_id = Column(Integer, primary_key=True)
+    deleted_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_property_tombstones_deleted_at_property_id", "deleted_at", "property_id"),
+    )
 
 class ValuationHistory(Base):
     __tablename__ = "valuation_history"
@@ -41,6 +114,10 @@ class ValuationHistory(Base):
     # Relationships
     property = relationship("Property", back_populates="valuation_history")
 
+    __table_args__ = (
+        Index("ix_valuation_history_valuation_date_id", "valuation_date", "id"),
+    )
+
 class User(Base):
     __tablename__ = "users"
 
@@ -66,14 +143,160 @@ class AdjustmentCoefficient(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = Column(String)  # User ID or name
 
+    __table_args__ = (
+        Index("ix_adjustment_coefficients_is_active_id", "is_active", "id"),
+    )
+
 class PropertyFeature(Base):
     __tablename__ = "property_features"
 
     id = Column(Integer, primary_key=True, index=True)
-    property_id = Column(Integer, ForeignKey("properties.id"))
-    name = Column(String, index=True)
-    value = Column(Float)
+    property_id = Column(Integer, ForeignKey("properties.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    value = Column(Float, nullable=False)
     unit = Column(String, nullable=True)
     description = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow) 
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    property = relationship("Property", back_populates="features")
+
+    __table_args__ = (
+        # Feature filters such as "parking >= 1"; also serves name lookups
+        Index("ix_property_features_name_value", "name", "value"),
+    )
+
+class PriceSketch(Base):
+    __tablename__ = "price_sketches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    property_type = Column(String)
+    metric = Column(String)  # "price" or "price_per_sqm"
+    period_start = Column(Date)  # Daily rollup window
+    count = Column(Integer, default=0)
+    sketch = Column(JSON)  # Serialized KLLSketch
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_price_sketches_segment", "property_type", "metric", "period_start", unique=True),
+    )
+
+class PriceIndexSegment(Base):
+    __tablename__ = "price_index_segments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    property_type = Column(String)
+    district = Column(String)  # Geohash cell, "*" for the whole property type
+    observations = Column(Integer, default=0)
+    periods = Column(JSON)  # Ordered list of "YYYY-MM" periods in the design matrix
+    xtx = Column(JSON)  # Normal equations X'X
+    xty = Column(JSON)  # Normal equations X'y
+    index_values = Column(JSON)  # {period: index relative to the first period}
+    last_property_id = Column(Integer, default=0)  # Watermark of folded rows
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_price_index_segments_segment", "property_type", "district", unique=True),
+    )
+
+class ScreeningSegment(Base):
+    __tablename__ = "screening_segments"
+
+    id = Column(Integer, primary_key=True, index=True)
+    property_type = Column(String)
+    district = Column(String)  # Geohash cell, "*" for the whole property type
+    observations = Column(Integer, default=0)
+    median = Column(Float)  # Running median of log(price per m²)
+    mad = Column(Float)  # Running median absolute deviation
+    warmup = Column(JSON)  # First observations, exact statistics until full
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_screening_segments_segment", "property_type", "district", unique=True),
+    )
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    kind = Column(String)
+    params = Column(JSON)
+    status = Column(String, default="pending", index=True)  # pending, running, completed, failed, expired
+    progress = Column(Float, default=0.0)  # 0..1
+    processed_rows = Column(Integer, default=0)
+    total_rows = Column(Integer)
+    filename = Column(String)
+    media_type = Column(String)
+    artifact_path = Column(String)
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    expires_at = Column(DateTime, index=True)
+
+class MaintenanceJob(Base):
+    __tablename__ = "maintenance_jobs"
+
+    id = Column(String, primary_key=True)  # uuid4 hex
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    kind = Column(String, index=True)  # fit_submarkets, rescreen
+    params = Column(JSON)
+    status = Column(String, default="pending", index=True)  # pending, running, completed, failed
+    result = Column(JSON)
+    error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class PriceTile(Base):
+    __tablename__ = "price_tiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    precision = Column(Integer)  # Geohash length of the tile
+    geohash = Column(String)
+    center_lat = Column(Float)
+    center_lng = Column(Float)
+    count = Column(Integer, default=0)
+    sum_price_per_sqm = Column(Float, default=0.0)
+    sketch = Column(JSON)  # Serialized KLLSketch of price per m²
+    sketch_stale = Column(Boolean, default=False)  # Set when a property leaves the tile
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_price_tiles_cell", "precision", "geohash", unique=True),
+        Index("ix_price_tiles_center", "precision", "center_lat", "center_lng"),
+    )
+
+class SubmarketModel(Base):
+    __tablename__ = "submarket_models"
+
+    id = Column(Integer, primary_key=True, index=True)
+    k = Column(Integer)
+    feature_means = Column(JSON)  # Standardization parameters
+    feature_scales = Column(JSON)
+    centroids = Column(JSON)  # k x n_features, in standardized space
+    cluster_sizes = Column(JSON)
+    is_active = Column(Boolean, default=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    # Offset of the change feed; AUTOINCREMENT keeps SQLite from reusing
+    # the ids of pruned events
+    id = Column(Integer, primary_key=True)
+    aggregate = Column(String)  # "property" or "adjustment_coefficient"
+    aggregate_id = Column(Integer)
+    event_type = Column(String)  # created, updated, deleted
+    payload = Column(JSON)  # {"fields": [...]} for updates
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = {"sqlite_autoincrement": True}
+
+class OutboxCheckpoint(Base):
+    __tablename__ = "outbox_checkpoints"
+
+    subscriber = Column(String, primary_key=True)
+    position = Column(Integer, default=0)  # Id of the last event handled
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,32 +1,41 @@
 # backend/routes/adjustments.py
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import models
 import schemas
 from database import get_db
 from services.user_service import user_service
-from services.adjustment_service import adjustment_service
+from services.replica_router import get_read_db
+from services.adjustment_service import adjustment_service, COEFFICIENT_PAGE_KEY
+from services.pagination import next_cursor, NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/api/adjustments", tags=["adjustments"])
 
 @router.get("/coefficients", response_model=List[schemas.AdjustmentCoefficient])
 def get_adjustment_coefficients(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     active_only: bool = True,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(user_service.get_current_user)
 ):
     """
-    Получить список коэффициентов корректировки
+    Получить список коэффициентов корректировки; курсор следующей
+    страницы возвращается в заголовке X-Next-Cursor
     """
     coefficients = adjustment_service.get_coefficients(
         db=db,
         skip=skip,
         limit=limit,
-        active_only=active_only
+        active_only=active_only,
+        cursor=cursor
     )
+    cursor = next_cursor(coefficients, COEFFICIENT_PAGE_KEY, limit)
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
     return coefficients
 
 @router.post("/coefficients", response_model=schemas.AdjustmentCoefficient)
@@ -53,7 +62,7 @@ def create_adjustment_coefficient(
 @router.get("/coefficients/{coefficient_id}", response_model=schemas.AdjustmentCoefficient)
 def get_adjustment_coefficient(
     coefficient_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(user_service.get_current_user)
 ):
     """
@@ -150,7 +159,7 @@ def deactivate_adjustment_coefficient(
 @router.get("/coefficients/feature/{feature_name}", response_model=schemas.AdjustmentCoefficient)
 def get_coefficient_by_feature(
     feature_name: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: models.User = Depends(user_service.get_current_user)
 ):
     """
@@ -0,0 +1,170 @@
+# backend/routes/analytics.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional
+import models
+import schemas
+from database import get_db
+from services.user_service import user_service
+from services.replica_router import get_read_db, get_read_session_factory
+from services.heatmap_service import heatmap_service
+from services.analytics_service import analytics_service
+from services.analytics_runner import analytics_runner
+from services.clustering_service import clustering_service
+from services.maintenance_job_service import maintenance_job_service
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+@router.get("/heatmap", response_model=List[schemas.PriceTile])
+def get_price_heatmap(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lng: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lng: float = Query(..., ge=-180, le=180),
+    zoom: int = Query(12, ge=0, le=22),
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Средняя и медианная цена за м² по тайлам geohash в пределах области карты
+    """
+    if min_lat > max_lat or min_lng > max_lng:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректная область: минимальные координаты больше максимальных"
+        )
+
+    return heatmap_service.get_tiles(
+        db=db,
+        min_lat=min_lat,
+        min_lng=min_lng,
+        max_lat=max_lat,
+        max_lng=max_lng,
+        zoom=zoom
+    )
+
+def _require_admin(user: models.User) -> None:
+    if user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Только администраторы могут запускать служебные задачи"
+        )
+
+def _raise_on_error(result: Dict[str, Any]) -> Dict[str, Any]:
+    if "error" in result:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=result["error"])
+    return result
+
+@router.get("/market-trends")
+async def get_market_trends(
+    property_type: Optional[str] = None,
+    area_min: Optional[float] = Query(None, gt=0),
+    area_max: Optional[float] = Query(None, gt=0),
+    days: int = Query(30, ge=1, le=3650),
+    approximate: bool = False,
+    cluster_id: Optional[int] = Query(None, ge=0),
+    session_factory: Callable[[], Session] = Depends(get_read_session_factory),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Рыночные тренды; approximate=true отвечает по скетчам квантилей
+    """
+    params = {
+        "property_type": property_type,
+        "area_min": area_min,
+        "area_max": area_max,
+        "days": days,
+        "approximate": approximate,
+        "cluster_id": cluster_id
+    }
+    result = await analytics_runner.run(
+        "market_trends",
+        params,
+        lambda db: analytics_service.get_market_trends(db=db, **params),
+        session_factory
+    )
+    return _raise_on_error(result)
+
+@router.get("/clusters", response_model=List[schemas.Submarket])
+def get_submarkets(
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Субрынки активной модели кластеризации
+    """
+    return clustering_service.get_clusters(db)
+
+@router.post("/clusters/fit", response_model=schemas.MaintenanceJob, status_code=status.HTTP_202_ACCEPTED)
+def fit_submarkets(
+    k: int = Query(12, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Поставить в очередь переобучение кластеров субрынков и переразметку
+    всех объектов; возвращает идентификатор задачи
+    """
+    _require_admin(current_user)
+    return maintenance_job_service.submit(db, current_user, "fit_submarkets", {"k": k})
+
+@router.post("/screening/rescreen", response_model=schemas.MaintenanceJob, status_code=status.HTTP_202_ACCEPTED)
+def rescreen_properties(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Поставить в очередь пересчет статистик сегментов и повторную проверку
+    всех объектов на аномалии; возвращает идентификатор задачи
+    """
+    _require_admin(current_user)
+    return maintenance_job_service.submit(db, current_user, "rescreen", {})
+
+@router.get("/properties/{property_id}/comparison")
+async def get_property_comparison(
+    property_id: int,
+    radius_km: float = Query(5.0, gt=0),
+    session_factory: Callable[[], Session] = Depends(get_read_session_factory),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Сравнение объекта с похожими объектами
+    """
+    params = {"property_id": property_id, "radius_km": radius_km}
+    result = await analytics_runner.run(
+        "property_comparison",
+        params,
+        lambda db: analytics_service.get_property_comparison(db=db, **params),
+        session_factory
+    )
+    return _raise_on_error(result)
+
+@router.get("/properties/{property_id}/adjustments")
+async def get_adjustment_analysis(
+    property_id: int,
+    session_factory: Callable[[], Session] = Depends(get_read_session_factory),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Статистика корректировок по истории оценок объекта
+    """
+    params = {"property_id": property_id}
+    result = await analytics_runner.run(
+        "adjustment_analysis",
+        params,
+        lambda db: analytics_service.get_adjustment_analysis(db=db, **params),
+        session_factory
+    )
+    return _raise_on_error(result)
+
+@router.get("/jobs/{job_id}", response_model=schemas.MaintenanceJob)
+def get_maintenance_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Статус и результат служебной задачи
+    """
+    _require_admin(current_user)
+    return maintenance_job_service.get_job(db, job_id)
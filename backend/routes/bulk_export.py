@@ -0,0 +1,61 @@
+# backend/routes/bulk_export.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta
+import models
+from config import settings
+from database import get_db
+from services.user_service import user_service
+from services.bulk_export_service import bulk_export_service, BULK_EXPORT_DATASETS
+
+router = APIRouter(prefix="/api/export/bulk", tags=["export"])
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet"
+}
+
+@router.get("/{dataset}")
+def bulk_export(
+    dataset: str,
+    format: str = Query("csv"),
+    since: Optional[datetime] = None,
+    chunk_size: int = Query(5000, ge=100, le=50000),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Потоковая выгрузка таблицы; since — водяной знак предыдущей выгрузки,
+    новый водяной знак возвращается в заголовке X-Export-Watermark.
+    Удаленные объекты в выгрузку не попадают: их идентификаторы отдает
+    синхронизация /api/properties/sync
+    """
+    if dataset not in BULK_EXPORT_DATASETS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Неизвестный набор данных")
+    if not bulk_export_service.supports(format):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Формат '{format}' не поддерживается")
+
+    # Fixed before streaming starts so it can be sent as a header. Rows
+    # stamped within the settle window may belong to transactions that
+    # have not committed yet; they are left for the next run.
+    until = datetime.utcnow() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    body = bulk_export_service.export(
+        db,
+        dataset,
+        format,
+        since=since,
+        until=until,
+        chunk_size=chunk_size
+    )
+    filename = f"{dataset}_{until.strftime('%Y%m%d_%H%M%S')}.{format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Export-Watermark": until.isoformat()
+        }
+    )
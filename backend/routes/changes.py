@@ -0,0 +1,37 @@
+# backend/routes/changes.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+import models
+import schemas
+from services.user_service import user_service
+from services.replica_router import get_read_db
+from services.outbox_service import outbox_service, AGGREGATES
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+@router.get("/", response_model=schemas.ChangeFeed)
+def get_changes(
+    after: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    aggregate: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Лента изменений объектов и коэффициентов: события после смещения
+    after в порядке фиксации; next_after передается в следующий запрос.
+    Доставка «хотя бы один раз» — события могут повторяться
+    """
+    if aggregate is not None and aggregate not in AGGREGATES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Неизвестный тип сущности '{aggregate}'. Допустимые: {', '.join(AGGREGATES)}"
+        )
+    if after < outbox_service.pruned_through(db):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="События после этого смещения уже удалены, требуется полная синхронизация"
+        )
+    events, next_after = outbox_service.read(db, after, limit, [aggregate] if aggregate else None)
+    return {"events": events, "next_after": next_after}
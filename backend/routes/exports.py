@@ -0,0 +1,60 @@
+# backend/routes/exports.py
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List
+import models
+import schemas
+from database import get_db
+from services.user_service import user_service
+from services.export_job_service import export_job_service
+
+router = APIRouter(prefix="/api/export/jobs", tags=["export"])
+
+@router.post("", response_model=schemas.ExportJob, status_code=status.HTTP_202_ACCEPTED)
+def submit_export_job(
+    job: schemas.ExportJobCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Поставить выгрузку в очередь; возвращает идентификатор задачи
+    """
+    return export_job_service.submit(db, current_user, job.kind, job.params)
+
+@router.get("", response_model=List[schemas.ExportJob])
+def list_export_jobs(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Последние задачи выгрузки текущего пользователя
+    """
+    return export_job_service.list_jobs(db, current_user)
+
+@router.get("/{job_id}", response_model=schemas.ExportJob)
+def get_export_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Статус и прогресс задачи выгрузки
+    """
+    return export_job_service.get_job(db, current_user, job_id)
+
+@router.get("/{job_id}/download")
+def download_export_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Скачать готовый файл выгрузки
+    """
+    job = export_job_service.get_job(db, current_user, job_id)
+    if job.status == "expired":
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Срок хранения файла выгрузки истек")
+    if job.status != "completed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Выгрузка еще не готова")
+    return FileResponse(job.artifact_path, media_type=job.media_type, filename=job.filename)
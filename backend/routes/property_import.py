@@ -0,0 +1,34 @@
+# backend/routes/property_import.py
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from sqlalchemy.orm import Session
+import os
+import zipfile
+import models
+import schemas
+from database import get_db
+from services.user_service import user_service
+from services.import_service import import_service, IMPORT_FORMATS
+
+router = APIRouter(prefix="/api/properties", tags=["properties"])
+
+@router.post("/import", response_model=schemas.PropertyImportReport)
+def import_properties(
+    file: UploadFile = File(...),
+    geocode: bool = Query(True),
+    chunk_size: int = Query(1000, ge=100, le=10000),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(user_service.get_current_user)
+):
+    """
+    Массовый импорт объектов из CSV или XLSX; ошибки возвращаются построчно
+    """
+    format = os.path.splitext(file.filename or "")[1].lstrip(".").lower()
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Поддерживаются только файлы: {', '.join(IMPORT_FORMATS)}"
+        )
+    try:
+        return import_service.import_file(db, file.file, format, chunk_size=chunk_size, geocode=geocode)
+    except (UnicodeDecodeError, zipfile.BadZipFile) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Не удалось прочитать файл: {e}")
@@ -1,7 +1,8 @@
 # backend/schemas.py
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from categories import PROPERTY_TYPES, CONDITIONS, RENOVATION_STATUSES
 
 # Property schemas
 class Location(BaseModel):
@@ -9,6 +10,8 @@ class Location(BaseModel):
     lng: float
 
 class PropertyFeature(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     name: str
     value: float
     unit: Optional[str] = None
@@ -26,10 +29,31 @@ class PropertyBase(BaseModel):
     price: float = Field(..., gt=0)
     features: List[PropertyFeature]
 
-class PropertyCreate(PropertyBase):
+def _normalize_category(registry, value: Optional[str]) -> Optional[str]:
+    return registry.normalize(value) if value is not None else None
+
+class CategoryValidators(BaseModel):
+    """Normalizes property_type, condition and renovation_status on input schemas"""
+
+    @field_validator("property_type", check_fields=False)
+    @classmethod
+    def validate_property_type(cls, value):
+        return _normalize_category(PROPERTY_TYPES, value)
+
+    @field_validator("condition", check_fields=False)
+    @classmethod
+    def validate_condition(cls, value):
+        return _normalize_category(CONDITIONS, value)
+
+    @field_validator("renovation_status", check_fields=False)
+    @classmethod
+    def validate_renovation_status(cls, value):
+        return _normalize_category(RENOVATION_STATUSES, value)
+
+class PropertyCreate(CategoryValidators, PropertyBase):
     pass
 
-class PropertyUpdate(BaseModel):
+class PropertyUpdate(CategoryValidators):
     address: Optional[str] = None
     property_type: Optional[str] = None
     area: Optional[float] = Field(None, gt=0)
@@ -41,13 +65,53 @@ class PropertyUpdate(BaseModel):
     price: Optional[float] = Field(None, gt=0)
     features: Optional[List[PropertyFeature]] = None
 
+class PropertyBulkUpdate(PropertyUpdate):
+    id: int
+
+class PropertyBulkRequest(BaseModel):
+    create: List[PropertyCreate] = []
+    update: List[PropertyBulkUpdate] = []
+    delete: List[int] = []
+    atomic: bool = False
+
+class BulkItemResult(BaseModel):
+    operation: str
+    index: int
+    id: Optional[int] = None
+    status: str
+    error: Optional[str] = None
+
+class PropertyBulkResult(BaseModel):
+    committed: bool
+    created: int
+    updated: int
+    deleted: int
+    failed: int
+    results: List[BulkItemResult]
+
 class Property(PropertyBase):
     model_config = ConfigDict(from_attributes=True)
     
     id: int
+    cluster_id: Optional[int] = None
+    anomaly_score: Optional[float] = None
+    is_anomaly: bool = False
+    is_quarantined: bool = False
     created_at: datetime
     updated_at: datetime
 
+# Read-only snapshot of a property row as kept by the property cache;
+# responses typed as Property drop the extra columns
+class PropertyRecord(Property):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    property_type_code: Optional[int] = None
+    condition_code: Optional[int] = None
+    renovation_code: Optional[int] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    geohash: Optional[str] = None
+
 # Valuation schemas
 class Adjustment(BaseModel):
     feature: str
@@ -83,6 +147,93 @@ class ValuationHistory(BaseModel):
     created_by: str
     notes: Optional[str] = None
 
+# Analytics schemas
+class PriceTile(BaseModel):
+    geohash: str
+    lat: float
+    lng: float
+    count: int
+    mean_price_per_sqm: float
+    median_price_per_sqm: Optional[float] = None
+
+class Submarket(BaseModel):
+    cluster_id: int
+    size: Optional[int] = None
+    lat: float
+    lng: float
+    price_per_sqm: float
+    area: float
+    property_type: Optional[str] = None
+
+# Maintenance job schemas
+class MaintenanceJob(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    kind: str
+    params: Optional[Dict[str, Any]] = None
+    status: str
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+# Export job schemas
+class ExportJobCreate(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
+class ExportJob(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    kind: str
+    params: Optional[Dict[str, Any]] = None
+    status: str
+    progress: float
+    processed_rows: Optional[int] = None
+    total_rows: Optional[int] = None
+    filename: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class PropertyImportReport(BaseModel):
+    total: int
+    imported: int
+    failed: int
+    anomalies: int
+    geocoded: int
+    errors: List[ImportRowError]
+
+class PropertySyncPage(BaseModel):
+    upserts: List[Property]
+    deletes: List[int]
+    next_token: str  # Pass as `token` to continue or for the next sync
+    has_more: bool
+
+# Change feed schemas
+class ChangeEvent(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    aggregate: str
+    aggregate_id: int
+    event_type: str
+    payload: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+class ChangeFeed(BaseModel):
+    events: List[ChangeEvent]
+    next_after: int  # Pass as `after` to read the following events
+
 # User schemas
 class UserBase(BaseModel):
     email: str
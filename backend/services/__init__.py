@@ -7,6 +7,18 @@ from .adjustment_service import adjustment_service
 from .geolocation_service import geolocation_service
 from .analytics_service import analytics_service
 from .database_service import database_service
+from .sketch_service import sketch_service
+from .price_index_service import price_index_service
+from .heatmap_service import heatmap_service
+from .clustering_service import clustering_service
+from .screening_service import screening_service
+from .export_job_service import export_job_service
+from .maintenance_job_service import maintenance_job_service
+from .bulk_export_service import bulk_export_service
+from .import_service import import_service
+from .replica_router import replica_router
+from .property_cache import property_cache
+from .outbox_service import outbox_service, outbox_dispatcher
 
 __all__ = [
     'property_service',
@@ -16,5 +28,18 @@ __all__ = [
     'adjustment_service',
     'geolocation_service',
     'analytics_service',
-    'database_service'
+    'database_service',
+    'sketch_service',
+    'price_index_service',
+    'heatmap_service',
+    'clustering_service',
+    'screening_service',
+    'export_job_service',
+    'maintenance_job_service',
+    'bulk_export_service',
+    'import_service',
+    'replica_router',
+    'property_cache',
+    'outbox_service',
+    'outbox_dispatcher'
 ]
\ No newline at end of file
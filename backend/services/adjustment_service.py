@@ -3,6 +3,10 @@ from typing import List, Optional
 import models
 import schemas
 from datetime import datetime
+from services.pagination import keyset_page
+from services.outbox_service import outbox_service, ADJUSTMENT_COEFFICIENT
+
+COEFFICIENT_PAGE_KEY = (models.AdjustmentCoefficient.id,)
 
 class AdjustmentService:
     def create_coefficient(
@@ -23,6 +27,8 @@ class AdjustmentService:
             created_by=user_id
         )
         db.add(db_coefficient)
+        db.flush()
+        outbox_service.record(db, ADJUSTMENT_COEFFICIENT, "created", [db_coefficient.id])
         db.commit()
         db.refresh(db_coefficient)
         return db_coefficient
@@ -44,7 +50,8 @@ class AdjustmentService:
         db: Session,
         skip: int = 0,
         limit: int = 100,
-        active_only: bool = True
+        active_only: bool = True,
+        cursor: Optional[str] = None
     ) -> List[models.AdjustmentCoefficient]:
         """
         Get list of adjustment coefficients
@@ -52,7 +59,7 @@ class AdjustmentService:
         query = db.query(models.AdjustmentCoefficient)
         if active_only:
             query = query.filter(models.AdjustmentCoefficient.is_active == True)
-        return query.offset(skip).limit(limit).all()
+        return keyset_page(query, COEFFICIENT_PAGE_KEY, limit, cursor=cursor, skip=skip).all()
 
     def get_coefficient_by_feature(
         self,
@@ -85,6 +92,7 @@ class AdjustmentService:
             setattr(db_coefficient, field, value)
 
         db_coefficient.updated_at = datetime.utcnow()
+        outbox_service.record(db, ADJUSTMENT_COEFFICIENT, "updated", [coefficient_id], fields=update_data)
         db.commit()
         db.refresh(db_coefficient)
         return db_coefficient
@@ -102,6 +110,7 @@ class AdjustmentService:
             return False
 
         db.delete(db_coefficient)
+        outbox_service.record(db, ADJUSTMENT_COEFFICIENT, "deleted", [coefficient_id])
         db.commit()
         return True
 
@@ -119,6 +128,7 @@ class AdjustmentService:
 
         db_coefficient.is_active = False
         db_coefficient.updated_at = datetime.utcnow()
+        outbox_service.record(db, ADJUSTMENT_COEFFICIENT, "updated", [coefficient_id], fields=["is_active"])
         db.commit()
         db.refresh(db_coefficient)
         return db_coefficient
@@ -0,0 +1,124 @@
+# backend/services/analytics_runner.py
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+from datetime import date, datetime
+import asyncio
+import json
+import math
+import threading
+import numpy as np
+from sqlalchemy.orm import Session
+from config import settings
+from services.cache import TTLCache
+
+
+def json_safe(value: Any) -> Any:
+    """
+    Convert pandas/numpy analytics output into JSON-encodable values
+    (native scalars, string keys, NaN/inf as None)
+    """
+    if isinstance(value, dict):
+        return {
+            (k.isoformat() if isinstance(k, (date, datetime)) else str(k)): json_safe(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class AnalyticsRunner:
+    """
+    Runs pandas/NumPy analytics off the event loop in a bounded thread pool.
+
+    Results are cached for a TTL keyed by the normalized query parameters,
+    and concurrent identical requests share one in-flight computation.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.ANALYTICS_WORKERS,
+        ttl: float = settings.ANALYTICS_CACHE_TTL_SECONDS,
+        max_entries: int = settings.ANALYTICS_CACHE_MAX_ENTRIES
+    ):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.cache = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="analytics"
+                )
+            return self._executor
+
+    @staticmethod
+    def cache_key(name: str, params: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Key of a query: unset parameters are dropped and the rest sorted
+        """
+        normalized = {k: v for k, v in params.items() if v is not None}
+        return name, json.dumps(normalized, sort_keys=True, default=str)
+
+    async def run(
+        self,
+        name: str,
+        params: Dict[str, Any],
+        func: Callable[..., Any],
+        session_factory: Optional[Callable[[], Session]] = None
+    ) -> Any:
+        """
+        Return the cached result for (name, params), or compute it with func
+        in the worker pool, joining an identical computation already running.
+        With `session_factory`, func gets a session of its own: the shared
+        computation can outlive the request that started it, and with it
+        that request's session.
+        """
+        key = self.cache_key(name, params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_executor(), self._compute, func, session_factory)
+            self._inflight[key] = future
+
+            def _done(done_future):
+                self._inflight.pop(key, None)
+                if not done_future.cancelled() and done_future.exception() is None:
+                    self.cache.set(key, done_future.result())
+
+            future.add_done_callback(_done)
+
+        # Shield so one cancelled client does not cancel the shared computation
+        return await asyncio.shield(future)
+
+    @staticmethod
+    def _compute(func: Callable[..., Any], session_factory: Optional[Callable[[], Session]]) -> Any:
+        if session_factory is None:
+            return json_safe(func())
+        db = session_factory()
+        try:
+            return json_safe(func(db))
+        finally:
+            db.close()
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+analytics_runner = AnalyticsRunner()
@@ -1,4 +1,5 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import List, Dict, Any
 import models
 import schemas
@@ -7,6 +8,9 @@ import pandas as pd
 import numpy as np
 from scipy import stats
 import json
+from services.sketch_service import sketch_service
+from services.property_cache import property_cache
+from categories import PROPERTY_TYPES, CONDITIONS, RENOVATION_STATUSES
 
 class AnalyticsService:
     def get_market_trends(
@@ -15,22 +19,43 @@ class AnalyticsService:
         property_type: str = None,
         area_min: float = None,
         area_max: float = None,
-        days: int = 30
+        days: int = 30,
+        approximate: bool = False,
+        cluster_id: int = None
     ) -> Dict[str, Any]:
         """
         Analyze market trends for properties
+
+        With approximate=True, percentiles come from the daily quantile sketch
+        rollups instead of loading the price column (see SketchService for
+        the error bound). Area and cluster filters are not part of the rollup
+        segments, so they fall back to the exact path.
         """
         # Get properties within date range
         date_threshold = datetime.utcnow() - timedelta(days=days)
-        query = db.query(models.Property)\
-            .filter(models.Property.created_at >= date_threshold)
+
+        if approximate and not area_min and not area_max and cluster_id is None:
+            return self._get_approximate_market_trends(db, property_type, date_threshold)
+
+        query = db.query(
+            models.Property.price,
+            models.Property.area,
+            models.Property.floor_level,
+            models.Property.total_floors,
+            models.Property.condition_code,
+            models.Property.renovation_code,
+            models.Property.created_at
+        ).filter(models.Property.created_at >= date_threshold)\
+            .filter(models.Property.is_quarantined.isnot(True))
 
         if property_type:
-            query = query.filter(models.Property.property_type == property_type)
+            query = self._filter_property_type(query, property_type)
         if area_min:
             query = query.filter(models.Property.area >= area_min)
         if area_max:
             query = query.filter(models.Property.area <= area_max)
+        if cluster_id is not None:
+            query = query.filter(models.Property.cluster_id == cluster_id)
 
         properties = query.all()
 
@@ -39,16 +64,11 @@ class AnalyticsService:
                 "error": "No properties found for the specified criteria"
             }
 
-        # Convert to DataFrame for analysis
-        df = pd.DataFrame([{
-            "price": p.price,
-            "area": p.area,
-            "floor": p.floor_level,
-            "total_floors": p.total_floors,
-            "condition": p.condition,
-            "renovation": p.renovation_status,
-            "created_at": p.created_at
-        } for p in properties])
+        # Convert to DataFrame for analysis (categoricals stay integer codes)
+        df = pd.DataFrame.from_records(properties, columns=[
+            "price", "area", "floor", "total_floors",
+            "condition", "renovation", "created_at"
+        ])
 
         # Calculate price per square meter
         df["price_per_sqm"] = df["price"] / df["area"]
@@ -76,13 +96,17 @@ class AnalyticsService:
         condition_stats = df.groupby("condition")["price"].agg([
             "count", "mean", "median", "std"
         ]).to_dict("index")
-        stats["condition_stats"] = condition_stats
+        stats["condition_stats"] = {
+            CONDITIONS.label(int(code)): values for code, values in condition_stats.items()
+        }
 
         # Price distribution by renovation status
         renovation_stats = df.groupby("renovation")["price"].agg([
             "count", "mean", "median", "std"
         ]).to_dict("index")
-        stats["renovation_stats"] = renovation_stats
+        stats["renovation_stats"] = {
+            RENOVATION_STATUSES.label(int(code)): values for code, values in renovation_stats.items()
+        }
 
         # Price trends over time
         df["date"] = pd.to_datetime(df["created_at"]).dt.date
@@ -93,6 +117,61 @@ class AnalyticsService:
 
         return stats
 
+    def _filter_property_type(self, query, property_type: str):
+        """
+        Filter on the indexed type code, or the raw string for unknown types
+        """
+        code = PROPERTY_TYPES.code(property_type)
+        if code is None:
+            return query.filter(models.Property.property_type == property_type)
+        return query.filter(models.Property.property_type_code == code)
+
+    def _get_approximate_market_trends(
+        self,
+        db: Session,
+        property_type: str,
+        date_threshold: datetime
+    ) -> Dict[str, Any]:
+        """
+        Market trend statistics answered from quantile sketches
+        """
+        query = db.query(
+            func.count(models.Property.id),
+            func.avg(models.Property.price),
+            func.avg(models.Property.price / models.Property.area)
+        ).filter(models.Property.created_at >= date_threshold)\
+            .filter(models.Property.is_quarantined.isnot(True))
+        if property_type:
+            query = self._filter_property_type(query, property_type)
+        total, mean_price, mean_price_per_sqm = query.one()
+
+        if not total:
+            return {
+                "error": "No properties found for the specified criteria"
+            }
+
+        stats = {
+            "total_properties": total,
+            "approximate": True
+        }
+        for metric, mean in (("price", mean_price), ("price_per_sqm", mean_price_per_sqm)):
+            summary = sketch_service.get_quantiles(
+                db,
+                metric,
+                property_type=property_type,
+                start=date_threshold.date()
+            )
+            stats[f"{metric}_stats"] = {
+                "mean": float(mean) if mean is not None else None,
+                "median": summary["percentiles"]["p50"],
+                "min": summary["min"],
+                "max": summary["max"],
+                "percentiles": summary["percentiles"],
+                "rank_error": summary["rank_error"]
+            }
+
+        return stats
+
     def get_property_comparison(
         self,
         db: Session,
@@ -103,46 +182,52 @@ class AnalyticsService:
         Compare property with similar properties in the area
         """
         # Get subject property
-        subject = db.query(models.Property).filter(models.Property.id == property_id).first()
+        subject = property_cache.get(db, property_id)
         if not subject:
             return {"error": "Property not found"}
 
-        # Get nearby properties
-        nearby = db.query(models.Property)\
-            .filter(models.Property.id != property_id)\
-            .filter(models.Property.property_type == subject.property_type)\
-            .all()
+        # Get nearby properties: the subject's submarket when it has been
+        # clustered, otherwise (or when the submarket is empty) the whole type
+        query = db.query(
+            models.Property.id,
+            models.Property.price,
+            models.Property.area,
+            models.Property.floor_level,
+            models.Property.total_floors,
+            models.Property.condition_code,
+            models.Property.renovation_code
+        ).filter(models.Property.id != property_id)\
+            .filter(models.Property.property_type_code == subject.property_type_code)\
+            .filter(models.Property.is_quarantined.isnot(True))
+
+        nearby = []
+        if subject.cluster_id is not None:
+            nearby = query.filter(models.Property.cluster_id == subject.cluster_id).all()
+        if not nearby:
+            nearby = query.all()
 
         if not nearby:
             return {"error": "No comparable properties found"}
 
         # Convert to DataFrame
-        df = pd.DataFrame([{
-            "id": p.id,
-            "price": p.price,
-            "area": p.area,
-            "floor": p.floor_level,
-            "total_floors": p.total_floors,
-            "condition": p.condition,
-            "renovation": p.renovation_status
-        } for p in nearby])
+        df = pd.DataFrame.from_records(nearby, columns=[
+            "id", "price", "area", "floor", "total_floors", "condition", "renovation"
+        ])
 
         # Calculate price per square meter
         df["price_per_sqm"] = df["price"] / df["area"]
 
         # Calculate similarity scores
-        similarity_scores = []
-        for _, comp in df.iterrows():
-            score = self._calculate_similarity_score(subject, comp)
-            similarity_scores.append(score)
-
-        df["similarity_score"] = similarity_scores
+        df["similarity_score"] = self._calculate_similarity_scores(subject, df)
 
         # Sort by similarity
         df = df.sort_values("similarity_score", ascending=False)
 
         # Get top 5 most similar properties
-        top_comparables = df.head(5).to_dict("records")
+        top = df.head(5).copy()
+        top["condition"] = [CONDITIONS.label(c) if pd.notna(c) else None for c in top["condition"]]
+        top["renovation"] = [RENOVATION_STATUSES.label(c) if pd.notna(c) else None for c in top["renovation"]]
+        top_comparables = top.to_dict("records")
 
         # Calculate price ranges
         price_ranges = {
@@ -167,54 +252,39 @@ class AnalyticsService:
                 "area": subject.area,
                 "price_per_sqm": subject.price / subject.area,
                 "condition": subject.condition,
-                "renovation": subject.renovation_status
+                "renovation": subject.renovation_status,
+                "cluster_id": subject.cluster_id
             },
             "comparable_properties": top_comparables,
             "price_ranges": price_ranges,
             "total_comparables": len(nearby)
         }
 
-    def _calculate_similarity_score(
+    def _calculate_similarity_scores(
         self,
-        subject: models.Property,
-        comparable: pd.Series
-    ) -> float:
+        subject: schemas.PropertyRecord,
+        comparables: pd.DataFrame
+    ) -> np.ndarray:
         """
-        Calculate similarity score between two properties
+        Calculate similarity scores between a property and each comparable
         """
+        area = comparables["area"].to_numpy(dtype=float)
+        floor_ratio = (comparables["floor"] / comparables["total_floors"]).to_numpy(dtype=float)
+
         # Area similarity (normalized)
-        area_diff = abs(subject.area - comparable["area"]) / max(subject.area, comparable["area"])
-        area_score = 1 - area_diff
+        area_score = 1 - np.abs(subject.area - area) / np.maximum(subject.area, area)
 
         # Floor similarity (normalized)
-        floor_diff = abs(
-            subject.floor_level / subject.total_floors -
-            comparable["floor"] / comparable["total_floors"]
-        )
-        floor_score = 1 - floor_diff
-
-        # Condition similarity
-        condition_scores = {
-            "excellent": 1.0,
-            "good": 0.8,
-            "fair": 0.6,
-            "poor": 0.4
-        }
-        condition_score = 1 - abs(
-            condition_scores[subject.condition] -
-            condition_scores[comparable["condition"]]
-        )
+        floor_score = 1 - np.abs(subject.floor_level / subject.total_floors - floor_ratio)
 
-        # Renovation similarity
-        renovation_scores = {
-            "new": 1.0,
-            "renovated": 0.8,
-            "partial": 0.6,
-            "none": 0.4
-        }
-        renovation_score = 1 - abs(
-            renovation_scores[subject.renovation_status] -
-            renovation_scores[comparable["renovation"]]
+        # Condition and renovation similarity: 0.2 per quality level apart
+        condition_score = 1 - 0.2 * np.abs(
+            CONDITIONS.rank(subject.condition_code) -
+            CONDITIONS.rank_array(comparables["condition"].to_numpy(dtype=float))
+        )
+        renovation_score = 1 - 0.2 * np.abs(
+            RENOVATION_STATUSES.rank(subject.renovation_code) -
+            RENOVATION_STATUSES.rank_array(comparables["renovation"].to_numpy(dtype=float))
         )
 
         # Weighted average
@@ -225,15 +295,13 @@ class AnalyticsService:
             "renovation": 0.2
         }
 
-        similarity = (
+        return (
             area_score * weights["area"] +
             floor_score * weights["floor"] +
             condition_score * weights["condition"] +
             renovation_score * weights["renovation"]
         )
 
-        return similarity
-
     def get_adjustment_analysis(
         self,
         db: Session,
@@ -243,7 +311,7 @@ class AnalyticsService:
         Analyze adjustment coefficients for a property
         """
         # Get property
-        property = db.query(models.Property).filter(models.Property.id == property_id).first()
+        property = property_cache.get(db, property_id)
         if not property:
             return {"error": "Property not found"}
 
@@ -259,11 +327,12 @@ class AnalyticsService:
         # Analyze adjustments
         adjustment_stats = {}
         for valuation in valuations:
-            for comp_id, adjustments in valuation.adjustments.items():
+            for comp_id, adjustments in (valuation.adjustments or {}).items():
                 for adj in adjustments:
-                    if adj.feature not in adjustment_stats:
-                        adjustment_stats[adj.feature] = []
-                    adjustment_stats[adj.feature].append(adj.value)
+                    # Stored history holds plain dicts
+                    feature = adj["feature"] if isinstance(adj, dict) else adj.feature
+                    value = adj["value"] if isinstance(adj, dict) else adj.value
+                    adjustment_stats.setdefault(feature, []).append(value)
 
         # Calculate statistics for each adjustment
         analysis = {}
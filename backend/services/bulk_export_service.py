@@ -0,0 +1,234 @@
+# backend/services/bulk_export_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, Boolean, DateTime, Float, Integer
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+from datetime import date, datetime
+import csv
+import io
+import json
+import tempfile
+import models
+from services.export_service import export_service, SPOOL_MAX_MEMORY
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet export is optional
+    pyarrow = None
+
+BULK_EXPORT_CHUNK_SIZE = 5000
+
+BULK_EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+
+# Exported columns and the watermark column of each dataset; keyset
+# pagination walks (watermark, id), backed by a composite index. Columns
+# listed in "collections" are child rows, exported as a list per row and
+# loaded with one IN query per chunk: (foreign key, child columns).
+BULK_EXPORT_DATASETS = {
+    "properties": {
+        "model": models.Property,
+        "watermark": models.Property.updated_at,
+        "columns": (
+            "id", "address", "property_type", "area", "floor_level", "total_floors",
+            "condition", "renovation_status", "location", "latitude", "longitude",
+            "price", "features", "cluster_id", "is_anomaly", "created_at", "updated_at"
+        ),
+        "collections": {
+            "features": (models.PropertyFeature.property_id, ("name", "value", "unit", "description"))
+        }
+    },
+    "valuation_history": {
+        "model": models.ValuationHistory,
+        "watermark": models.ValuationHistory.valuation_date,
+        "columns": (
+            "id", "property_id", "valuation_date", "valuation_type", "original_price",
+            "adjusted_price", "adjustments", "comparable_properties", "created_by", "notes"
+        )
+    }
+}
+
+
+def _scalar(value: Any) -> Any:
+    """
+    Flat representation of a value for CSV and Parquet cells
+    """
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _arrow_schema(dataset: str):
+    """
+    Parquet schema from the column types, so chunks whose values are all
+    NULL still get the right type
+    """
+    spec = BULK_EXPORT_DATASETS[dataset]
+    fields = []
+    for name in spec["columns"]:
+        if name in spec.get("collections", {}):
+            fields.append(pyarrow.field(name, pyarrow.string()))  # JSON serialized
+            continue
+        column_type = getattr(spec["model"], name).type
+        if isinstance(column_type, Boolean):
+            arrow_type = pyarrow.bool_()
+        elif isinstance(column_type, Integer):
+            arrow_type = pyarrow.int64()
+        elif isinstance(column_type, Float):
+            arrow_type = pyarrow.float64()
+        elif isinstance(column_type, DateTime):
+            arrow_type = pyarrow.timestamp("us")
+        else:
+            arrow_type = pyarrow.string()  # String, and JSON serialized
+        fields.append(pyarrow.field(name, arrow_type))
+    return pyarrow.schema(fields)
+
+
+class BulkExportService:
+    """
+    Streaming CSV / NDJSON / Parquet exports of whole tables for the data
+    warehouse.
+
+    Rows are read in keyset-paginated chunks ordered by (watermark, id), so
+    memory is bounded by the chunk size and no cursor stays open between
+    chunks. Incremental runs pass the watermark returned by the previous
+    run as `since`; each run is capped at the `until` it reports so rows
+    written while it streams are picked up by the next run. Exports only
+    carry existing rows: deleted properties reach mirrors through the
+    tombstones of the delta sync endpoint.
+    """
+
+    def supports(self, format: str) -> bool:
+        return format in BULK_EXPORT_FORMATS and (format != "parquet" or pyarrow is not None)
+
+    def iter_chunks(
+        self,
+        db: Session,
+        dataset: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        chunk_size: int = BULK_EXPORT_CHUNK_SIZE
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield rows with since < watermark <= until as lists of dicts
+        """
+        spec = BULK_EXPORT_DATASETS[dataset]
+        model, watermark = spec["model"], spec["watermark"]
+        collections = spec.get("collections", {})
+        names = [name for name in spec["columns"] if name not in collections]
+        columns = [getattr(model, name) for name in names]
+
+        base = db.query(*columns)
+        if since is not None:
+            base = base.filter(watermark > since)
+        if until is not None:
+            base = base.filter(watermark <= until)
+
+        last: Optional[Tuple[datetime, int]] = None
+        while True:
+            query = base
+            if last is not None:
+                query = query.filter(or_(
+                    watermark > last[0],
+                    and_(watermark == last[0], model.id > last[1])
+                ))
+            rows = query.order_by(watermark, model.id).limit(chunk_size).all()
+            if not rows:
+                return
+            chunk = [dict(zip(names, row)) for row in rows]
+            for name, (foreign_key, child_columns) in collections.items():
+                self._attach_children(db, chunk, name, foreign_key, child_columns)
+            chunk = [{name: row[name] for name in spec["columns"]} for row in chunk]
+            last = (chunk[-1][watermark.key], chunk[-1]["id"])
+            yield chunk
+            if len(rows) < chunk_size:
+                return
+
+    def _attach_children(
+        self,
+        db: Session,
+        chunk: List[Dict[str, Any]],
+        name: str,
+        foreign_key,
+        child_columns: Tuple[str, ...]
+    ) -> None:
+        child_model = foreign_key.class_
+        children: Dict[int, List[Dict[str, Any]]] = {row["id"]: [] for row in chunk}
+        query = db.query(foreign_key, *[getattr(child_model, column) for column in child_columns])\
+            .filter(foreign_key.in_(list(children)))\
+            .order_by(foreign_key, child_model.id)
+        for parent_id, *values in query:
+            children[parent_id].append(dict(zip(child_columns, values)))
+        for row in chunk:
+            row[name] = children[row["id"]]
+
+    def iter_csv(self, chunks: Iterator[List[Dict[str, Any]]], columns: Tuple[str, ...]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns)
+        writer.writeheader()
+        for chunk in chunks:
+            writer.writerows({key: _scalar(value) for key, value in row.items()} for row in chunk)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    def iter_ndjson(self, chunks: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+        for chunk in chunks:
+            yield "".join(
+                json.dumps(row, default=_scalar, ensure_ascii=False) + "\n" for row in chunk
+            ).encode("utf-8")
+
+    def write_parquet(
+        self,
+        chunks: Iterator[List[Dict[str, Any]]],
+        dataset: str,
+        output: BinaryIO
+    ) -> int:
+        """
+        Write chunks as row groups of a Parquet file. Returns the row count.
+        """
+        if pyarrow is None:
+            raise RuntimeError("Parquet export requires pyarrow")
+        schema = _arrow_schema(dataset)
+        count = 0
+        with pyarrow.parquet.ParquetWriter(output, schema) as writer:
+            for chunk in chunks:
+                writer.write_table(pyarrow.Table.from_pydict({
+                    name: [
+                        _scalar(row[name]) if isinstance(row[name], (dict, list)) else row[name]
+                        for row in chunk
+                    ]
+                    for name in schema.names
+                }, schema=schema))
+                count += len(chunk)
+        return count
+
+    def export(
+        self,
+        db: Session,
+        dataset: str,
+        format: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        chunk_size: int = BULK_EXPORT_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """
+        Stream a dataset in the requested format
+        """
+        columns = BULK_EXPORT_DATASETS[dataset]["columns"]
+        chunks = self.iter_chunks(db, dataset, since=since, until=until, chunk_size=chunk_size)
+        if format == "csv":
+            return self.iter_csv(chunks, columns)
+        if format == "ndjson":
+            return self.iter_ndjson(chunks)
+
+        # Parquet needs its footer written before the file is readable
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        self.write_parquet(chunks, dataset, spool)
+        spool.seek(0)
+        return export_service.iter_file(spool)
+
+bulk_export_service = BulkExportService()
@@ -0,0 +1,310 @@
+# backend/services/clustering_service.py
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import time
+import numpy as np
+import models
+from database import update_by_id
+from categories import PROPERTY_TYPES, CONDITIONS, RENOVATION_STATUSES
+from services.outbox_service import outbox_service, PROPERTY
+from services.property_cache import property_cache
+
+MODEL_RELOAD_SECONDS = 300
+
+CLUSTER_FEATURES = (
+    "latitude", "longitude", "log_price_per_sqm", "log_area", "condition", "renovation"
+) + tuple(f"type_{name}" for name in PROPERTY_TYPES.values)
+
+# Weights applied after standardization: location and price level define a
+# submarket, and the type indicators are heavy enough that clusters do not
+# mix apartments with land or commercial stock.
+FEATURE_WEIGHTS = np.array([2.0, 2.0, 1.5, 1.0, 0.5, 0.5] + [3.0] * len(PROPERTY_TYPES.values))
+
+_PROPERTY_COLUMNS = (
+    models.Property.id,
+    models.Property.latitude,
+    models.Property.longitude,
+    models.Property.price,
+    models.Property.area,
+    models.Property.condition_code,
+    models.Property.renovation_code,
+    models.Property.property_type_code
+)
+
+
+def feature_matrix(rows: Sequence[Tuple]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Raw feature matrix of (latitude, longitude, price, area, condition_code,
+    renovation_code, property_type_code) rows. Returns the matrix and a mask
+    of rows that have every feature needed for clustering.
+    """
+    data = np.array(
+        [[np.nan if value is None else value for value in row] for row in rows],
+        dtype=float
+    ).reshape(-1, 7)
+    lat, lng, price, area, condition, renovation, type_code = data.T
+
+    valid = ~np.isnan(lat) & ~np.isnan(lng) & (price > 0) & (area > 0)
+    safe_area = np.where(valid, area, 1.0)
+    safe_price = np.where(valid, price, 1.0)
+
+    types = np.zeros((len(data), len(PROPERTY_TYPES.values)))
+    known_type = ~np.isnan(type_code) & (type_code >= 1) & (type_code <= types.shape[1])
+    types[np.flatnonzero(known_type), type_code[known_type].astype(int) - 1] = 1.0
+
+    features = np.column_stack([
+        lat,
+        lng,
+        np.log(safe_price / safe_area),
+        np.log(safe_area),
+        CONDITIONS.rank_array(condition),
+        RENOVATION_STATUSES.rank_array(renovation),
+        types
+    ])
+    return features, valid
+
+
+def nearest_centroids(points: np.ndarray, centroids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Index of and squared distance to the nearest centroid of each point
+    """
+    # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, without materializing n x k x d
+    distances = (
+        np.einsum("ij,ij->i", points, points)[:, None]
+        - 2.0 * points @ centroids.T
+        + np.einsum("ij,ij->i", centroids, centroids)[None, :]
+    )
+    labels = np.argmin(distances, axis=1)
+    return labels, np.maximum(distances[np.arange(len(points)), labels], 0.0)
+
+
+def kmeans_plus_plus(points: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    k-means++ seeding
+    """
+    centroids = [points[rng.integers(len(points))]]
+    closest = None
+    for _ in range(1, k):
+        _, distances = nearest_centroids(points, np.array(centroids[-1:]))
+        closest = distances if closest is None else np.minimum(closest, distances)
+        total = closest.sum()
+        if total <= 0:
+            break
+        centroids.append(points[rng.choice(len(points), p=closest / total)])
+    return np.array(centroids)
+
+
+def mini_batch_kmeans(
+    points: np.ndarray,
+    k: int,
+    batch_size: int = 1024,
+    iterations: int = 100,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Mini-batch k-means (Sculley, 2010). Each centroid moves towards the mean
+    of its batch members with a per-centroid learning rate of 1 / (points
+    assigned so far), so updates shrink as the centroid stabilizes.
+    """
+    rng = np.random.default_rng(seed)
+    seed_sample = points[rng.choice(len(points), size=min(len(points), 10 * batch_size), replace=False)]
+    centroids = kmeans_plus_plus(seed_sample, min(k, len(points)), rng)
+    counts = np.zeros(len(centroids))
+
+    for _ in range(iterations):
+        batch = points[rng.integers(len(points), size=min(batch_size, len(points)))]
+        labels, _ = nearest_centroids(batch, centroids)
+
+        batch_counts = np.bincount(labels, minlength=len(centroids)).astype(float)
+        batch_sums = np.zeros_like(centroids)
+        np.add.at(batch_sums, labels, batch)
+
+        touched = batch_counts > 0
+        counts[touched] += batch_counts[touched]
+        # c += (sum - n c) / N  ==  n sequential steps with rate 1/N
+        centroids[touched] += (
+            batch_sums[touched] - batch_counts[touched, None] * centroids[touched]
+        ) / counts[touched, None]
+
+    return centroids
+
+
+class ClusteringService:
+    """
+    Submarkets: k-means clusters of properties over location, price per m²
+    and attributes.
+
+    `fit` is an offline job that trains centroids with mini-batch k-means,
+    stores them as the active SubmarketModel and labels every property.
+    New and updated listings are assigned to the nearest active centroid.
+    """
+
+    def __init__(self):
+        self._model: Optional[Dict[str, Any]] = None
+        self._loaded_at: Optional[float] = None
+
+    def _standardize(self, features: np.ndarray, model: Dict[str, Any]) -> np.ndarray:
+        return (features - model["means"]) / model["scales"] * FEATURE_WEIGHTS
+
+    def fit(
+        self,
+        db: Session,
+        k: int = 12,
+        batch_size: int = 1024,
+        iterations: int = 100,
+        chunk_size: int = 5000,
+        seed: Optional[int] = None
+    ) -> Optional[models.SubmarketModel]:
+        """
+        Train submarket centroids and relabel all properties. Returns the new
+        active model, or None when there are no clusterable properties.
+        """
+        ids: List[int] = []
+        rows: List[Tuple] = []
+        query = db.query(*_PROPERTY_COLUMNS).filter(models.Property.is_quarantined.isnot(True))
+        for row in query.yield_per(chunk_size):
+            ids.append(row[0])
+            rows.append(tuple(row[1:]))
+
+        features, valid = feature_matrix(rows)
+        if not valid.any():
+            return None
+        features = features[valid]
+
+        means = features.mean(axis=0)
+        scales = features.std(axis=0)
+        scales[scales == 0] = 1.0
+        model = {"means": means, "scales": scales}
+
+        centroids = mini_batch_kmeans(
+            self._standardize(features, model),
+            k=k,
+            batch_size=batch_size,
+            iterations=iterations,
+            seed=seed
+        )
+        model["centroids"] = centroids
+
+        labels, _ = nearest_centroids(self._standardize(features, model), centroids)
+        sizes = np.bincount(labels, minlength=len(centroids))
+
+        db.query(models.SubmarketModel)\
+            .filter(models.SubmarketModel.is_active.is_(True))\
+            .update({"is_active": False}, synchronize_session=False)
+        row = models.SubmarketModel(
+            k=len(centroids),
+            feature_means=means.tolist(),
+            feature_scales=scales.tolist(),
+            centroids=centroids.tolist(),
+            cluster_sizes=sizes.tolist(),
+            is_active=True
+        )
+        db.add(row)
+
+        valid_ids = np.array(ids)[valid]
+        previous = dict(
+            db.query(models.Property.id, models.Property.cluster_id)
+            .filter(models.Property.cluster_id.isnot(None))
+        )
+        assigned = dict(zip(valid_ids.tolist(), labels.tolist()))
+        relabelled = sorted(
+            property_id for property_id in previous.keys() | assigned.keys()
+            if previous.get(property_id) != assigned.get(property_id)
+        )
+        for start in range(0, len(relabelled), chunk_size):
+            chunk = relabelled[start:start + chunk_size]
+            update_by_id(db, models.Property, [
+                {"id": property_id, "cluster_id": assigned.get(property_id)} for property_id in chunk
+            ])
+            outbox_service.record(db, PROPERTY, "updated", chunk, fields=["cluster_id"])
+        db.commit()
+        property_cache.clear()
+
+        self._model = model
+        self._loaded_at = time.monotonic()
+        return row
+
+    def load(self, db: Session) -> None:
+        row = db.query(models.SubmarketModel)\
+            .filter(models.SubmarketModel.is_active.is_(True))\
+            .order_by(models.SubmarketModel.id.desc())\
+            .first()
+        self._model = None if row is None else {
+            "means": np.array(row.feature_means, dtype=float),
+            "scales": np.array(row.feature_scales, dtype=float),
+            "centroids": np.array(row.centroids, dtype=float)
+        }
+        self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > MODEL_RELOAD_SECONDS:
+            self.load(db)
+
+    def assign_property(self, db: Session, property: models.Property) -> Optional[int]:
+        """
+        Set the cluster of a property to its nearest active centroid
+        (caller commits)
+        """
+        return self.assign_properties(db, [property])[0]
+
+    def assign_properties(self, db: Session, properties: List[models.Property]) -> List[Optional[int]]:
+        """
+        Set the clusters of a batch of properties in one vectorized pass
+        (caller commits)
+        """
+        self.ensure_loaded(db)
+        if self._model is None or not properties:
+            return [None] * len(properties)
+
+        features, valid = feature_matrix([(
+            property.latitude,
+            property.longitude,
+            property.price,
+            property.area,
+            property.condition_code,
+            property.renovation_code,
+            property.property_type_code
+        ) for property in properties])
+
+        labels = np.full(len(properties), -1)
+        if valid.any():
+            labels[valid], _ = nearest_centroids(
+                self._standardize(features[valid], self._model),
+                self._model["centroids"]
+            )
+
+        clusters = []
+        for property, is_valid, label in zip(properties, valid, labels):
+            property.cluster_id = int(label) if is_valid else None
+            clusters.append(property.cluster_id)
+        return clusters
+
+    def get_clusters(self, db: Session) -> List[Dict[str, Any]]:
+        """
+        Centroids of the active model in original feature units
+        """
+        self.ensure_loaded(db)
+        if self._model is None:
+            return []
+
+        row = db.query(models.SubmarketModel)\
+            .filter(models.SubmarketModel.is_active.is_(True))\
+            .order_by(models.SubmarketModel.id.desc())\
+            .first()
+        sizes = row.cluster_sizes if row is not None else None
+        centroids = self._model["centroids"] / FEATURE_WEIGHTS * self._model["scales"] + self._model["means"]
+
+        clusters = []
+        for cluster_id, centroid in enumerate(centroids):
+            clusters.append({
+                "cluster_id": cluster_id,
+                "size": sizes[cluster_id] if sizes else None,
+                "lat": float(centroid[0]),
+                "lng": float(centroid[1]),
+                "price_per_sqm": float(np.exp(centroid[2])),
+                "area": float(np.exp(centroid[3])),
+                "property_type": PROPERTY_TYPES.label(int(np.argmax(centroid[6:])) + 1)
+            })
+        return clusters
+
+clustering_service = ClusteringService()
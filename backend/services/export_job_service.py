@@ -0,0 +1,253 @@
+# backend/services/export_job_service.py
+from concurrent.futures import Future, ThreadPoolExecutor
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from typing import Any, Callable, Dict, List, Optional
+from datetime import datetime, timedelta
+import logging
+import os
+import shutil
+import threading
+import uuid
+import models
+from config import settings
+from database import SessionLocal
+from services.export_service import export_service, EXCEL_MEDIA_TYPE, PDF_MEDIA_TYPE
+
+logger = logging.getLogger(__name__)
+
+EXPORT_JOB_KINDS = ("properties_excel", "property_report")
+ACTIVE_STATUSES = ("pending", "running")
+
+
+class ExportJobService:
+    """
+    Background export jobs.
+
+    Jobs are recorded in the export_jobs table and run in a bounded worker
+    pool separate from the request thread pool, with at most
+    `per_user_limit` active jobs per user. Workers open their own sessions
+    from `session_factory`. Finished files are kept in `artifact_dir` until
+    they expire; expired artifacts are removed whenever a job is submitted
+    or `cleanup_expired` is called. Jobs still pending or running `timeout`
+    seconds after submission were lost with a stopped worker (shutdown
+    does not wait for the queue) and are marked failed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_workers: int = settings.EXPORT_WORKERS,
+        per_user_limit: int = settings.EXPORT_JOBS_PER_USER,
+        artifact_dir: str = settings.EXPORT_ARTIFACT_DIR,
+        ttl: float = settings.EXPORT_ARTIFACT_TTL_SECONDS,
+        timeout: float = settings.EXPORT_JOB_TIMEOUT_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.max_workers = max_workers
+        self.per_user_limit = per_user_limit
+        self.artifact_dir = artifact_dir
+        self.ttl = ttl
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="export"
+                )
+            return self._executor
+
+    def submit(self, db: Session, user: models.User, kind: str, params: Dict[str, Any]) -> models.ExportJob:
+        """
+        Queue an export job for a user
+        """
+        if kind not in EXPORT_JOB_KINDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported export kind '{kind}'. Allowed kinds: {', '.join(EXPORT_JOB_KINDS)}"
+            )
+
+        self.cleanup_expired(db)
+        self.fail_lost(db)
+
+        # Held until the job is committed, so concurrent submits of one user
+        # are counted one after another instead of all passing the limit
+        db.query(models.User.id)\
+            .filter(models.User.id == user.id)\
+            .with_for_update()\
+            .first()
+        active = db.query(models.ExportJob)\
+            .filter(models.ExportJob.user_id == user.id)\
+            .filter(models.ExportJob.status.in_(ACTIVE_STATUSES))\
+            .count()
+        if active >= self.per_user_limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Too many active export jobs (limit {self.per_user_limit})"
+            )
+
+        job = models.ExportJob(
+            id=uuid.uuid4().hex,
+            user_id=user.id,
+            kind=kind,
+            params=params,
+            status="pending",
+            progress=0.0,
+            processed_rows=0
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        job_id = job.id
+        future = self._get_executor().submit(self._run, job_id)
+        self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._futures.pop(job_id, None))
+        return job
+
+    def get_job(self, db: Session, user: models.User, job_id: str) -> models.ExportJob:
+        job = db.query(models.ExportJob)\
+            .filter(models.ExportJob.id == job_id)\
+            .filter(models.ExportJob.user_id == user.id)\
+            .first()
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Export job not found"
+            )
+        return job
+
+    def list_jobs(self, db: Session, user: models.User, limit: int = 50) -> List[models.ExportJob]:
+        return db.query(models.ExportJob)\
+            .filter(models.ExportJob.user_id == user.id)\
+            .order_by(models.ExportJob.created_at.desc())\
+            .limit(limit)\
+            .all()
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> None:
+        """
+        Block until a job submitted by this process has finished
+        """
+        future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    def _run(self, job_id: str) -> None:
+        db = self.session_factory()
+        try:
+            job = db.query(models.ExportJob).filter(models.ExportJob.id == job_id).first()
+            if job is None:
+                return
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            db.commit()
+
+            job_dir = os.path.join(self.artifact_dir, job.id)
+            try:
+                os.makedirs(job_dir, exist_ok=True)
+                if job.kind == "properties_excel":
+                    self._run_properties_excel(db, job, job_dir)
+                else:
+                    self._run_property_report(db, job, job_dir)
+            except Exception as e:
+                logger.exception("Export job %s failed", job_id)
+                db.rollback()
+                shutil.rmtree(job_dir, ignore_errors=True)
+                job.status = "failed"
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                return
+
+            job.status = "completed"
+            job.progress = 1.0
+            job.finished_at = datetime.utcnow()
+            job.expires_at = job.finished_at + timedelta(seconds=self.ttl)
+            db.commit()
+        finally:
+            db.close()
+
+    def _run_properties_excel(self, db: Session, job: models.ExportJob, job_dir: str) -> None:
+        params = job.params or {}
+        filters = {key: params.get(key) for key in ("property_type", "min_price", "max_price")}
+        job.total_rows = export_service.property_export_query(db, **filters).count()
+        db.commit()
+
+        # Rows are read through a separate session: committing progress on
+        # the job session must not close the streaming cursor
+        data_db = self.session_factory()
+
+        def progress(rows: int) -> None:
+            job.processed_rows = rows
+            job.progress = min(rows / job.total_rows, 1.0) if job.total_rows else 1.0
+            db.commit()
+
+        job.filename = f"properties_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        job.media_type = EXCEL_MEDIA_TYPE
+        job.artifact_path = os.path.join(job_dir, job.filename)
+        try:
+            with open(job.artifact_path, "wb") as output:
+                export_service.stream_properties_excel(data_db, output, progress=progress, **filters)
+        finally:
+            data_db.close()
+
+    def _run_property_report(self, db: Session, job: models.ExportJob, job_dir: str) -> None:
+        params = job.params or {}
+        report_format = params.get("format", "pdf")
+        job.total_rows = 1
+        job.artifact_path = export_service.generate_report(
+            db,
+            property_id=params.get("property_id"),
+            format=report_format,
+            output_dir=job_dir
+        )
+        job.filename = os.path.basename(job.artifact_path)
+        job.media_type = PDF_MEDIA_TYPE if report_format.lower() == "pdf" else EXCEL_MEDIA_TYPE
+        job.processed_rows = 1
+
+    def cleanup_expired(self, db: Session) -> int:
+        """
+        Delete artifacts of expired jobs. Returns the number of jobs expired.
+        """
+        expired = db.query(models.ExportJob)\
+            .filter(models.ExportJob.status == "completed")\
+            .filter(models.ExportJob.expires_at < datetime.utcnow())\
+            .all()
+        for job in expired:
+            shutil.rmtree(os.path.join(self.artifact_dir, job.id), ignore_errors=True)
+            job.status = "expired"
+            job.artifact_path = None
+        if expired:
+            db.commit()
+        return len(expired)
+
+    def fail_lost(self, db: Session) -> int:
+        """
+        Mark active jobs older than the timeout failed. Returns their number.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.timeout)
+        lost = db.query(models.ExportJob)\
+            .filter(models.ExportJob.status.in_(ACTIVE_STATUSES))\
+            .filter(models.ExportJob.created_at < cutoff)\
+            .all()
+        for job in lost:
+            shutil.rmtree(os.path.join(self.artifact_dir, job.id), ignore_errors=True)
+            job.status = "failed"
+            job.error = "Job did not finish within the timeout"
+            job.finished_at = datetime.utcnow()
+        if lost:
+            db.commit()
+        return len(lost)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+export_job_service = ExportJobService()
@@ -1,10 +1,20 @@
 # backend/services/export_service.py
+from concurrent.futures import ProcessPoolExecutor
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
 import models
 import schemas
 from datetime import datetime
+from functools import lru_cache
+import itertools
+import json
+import multiprocessing
+import tempfile
+import threading
+import time
+import zipfile
 import pandas as pd
+import xlsxwriter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -13,16 +23,131 @@ from reportlab.lib.units import inch
 import io
 import os
 import base64
+import asyncio
+from config import settings
+from services.report_cache import content_key
+from services.property_cache import property_cache
+
+PDF_MEDIA_TYPE = "application/pdf"
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# A file path or a writable binary file-like object (BytesIO, response buffer)
+Output = Union[str, BinaryIO]
+
+# Streaming property export: rows per DB fetch, rows sampled for column
+# widths, and how much of the finished file stays in memory before spilling
+EXPORT_CHUNK_SIZE = 2000
+WIDTH_SAMPLE_SIZE = 1000
+MAX_COLUMN_WIDTH = 60
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+STREAM_BLOCK_SIZE = 64 * 1024
+
+MAX_BATCH_REPORTS = 200
+
+# Bump whenever the report layout changes, so cached reports are not reused
+REPORT_TEMPLATE_VERSION = "1"
+
+
+@lru_cache(maxsize=None)
+def pdf_styles() -> Dict[str, Any]:
+    """
+    Stylesheet and table styles of the PDF report, built once per process
+    (and so once per report worker) instead of once per document
+    """
+    styles = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30
+        ),
+        "heading2": styles['Heading2'],
+        "heading3": styles['Heading3'],
+        "normal": styles['Normal'],
+        "property_table": TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (0, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ]),
+        "adjustment_table": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+    }
+
+
+def render_valuation_pdf(payload: Dict[str, Any]) -> Tuple[bytes, float]:
+    """
+    Render a valuation report from its JSON form. Runs in report worker
+    processes; returns the PDF and its render time in seconds.
+    """
+    started = time.perf_counter()
+    content = export_service.render_pdf(schemas.ValuationResult.model_validate(payload))
+    return content, time.perf_counter() - started
+
+
+PROPERTY_EXPORT_COLUMNS = (
+    ("ID", models.Property.id),
+    ("Address", models.Property.address),
+    ("Type", models.Property.property_type),
+    ("Area", models.Property.area),
+    ("Floor", models.Property.floor_level),
+    ("Total Floors", models.Property.total_floors),
+    ("Condition", models.Property.condition),
+    ("Renovation", models.Property.renovation_status),
+    ("Price", models.Property.price),
+    ("Created At", models.Property.created_at),
+    ("Updated At", models.Property.updated_at)
+)
 
 class ExportService:
+    def __init__(self, report_workers: int = settings.REPORT_WORKERS):
+        self.report_workers = report_workers
+        self._report_pool: Optional[ProcessPoolExecutor] = None
+        self._report_pool_lock = threading.Lock()
+
+    def get_report_pool(self) -> ProcessPoolExecutor:
+        """
+        Process pool for CPU-bound PDF rendering, created on first use.
+        Workers are spawned rather than forked: a fork would copy the
+        server's threads, locks and pooled database connections.
+        """
+        with self._report_pool_lock:
+            if self._report_pool is None:
+                self._report_pool = ProcessPoolExecutor(
+                    max_workers=self.report_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=pdf_styles
+                )
+            return self._report_pool
+
+    def shutdown(self) -> None:
+        with self._report_pool_lock:
+            if self._report_pool is not None:
+                self._report_pool.shutdown(wait=False)
+                self._report_pool = None
+
     def export_to_excel(
         self,
         db: Session,
         properties: List[models.Property],
-        output_path: str
-    ) -> str:
+        output: Output
+    ) -> Output:
         """
-        Export properties to Excel file
+        Export properties to an Excel file path or file-like object
         """
         # Create DataFrame
         data = []
@@ -44,7 +169,7 @@ class ExportService:
         df = pd.DataFrame(data)
 
         # Create Excel writer
-        with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
             df.to_excel(writer, sheet_name='Properties', index=False)
             
             # Get workbook and worksheet objects
@@ -72,20 +197,115 @@ class ExportService:
                 )
                 worksheet.set_column(idx, idx, max_length + 2)
 
-        return output_path
+        return output
+
+    def property_export_query(
+        self,
+        db: Session,
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None
+    ):
+        query = db.query(*[column for _, column in PROPERTY_EXPORT_COLUMNS])\
+            .order_by(models.Property.id)
+        if property_type:
+            query = query.filter(models.Property.property_type == property_type)
+        if min_price:
+            query = query.filter(models.Property.price >= min_price)
+        if max_price:
+            query = query.filter(models.Property.price <= max_price)
+        return query
+
+    def stream_properties_excel(
+        self,
+        db: Session,
+        output: Output,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        progress: Optional[Callable[[int], None]] = None,
+        **filters
+    ) -> int:
+        """
+        Write matching properties to Excel in constant memory: rows are read
+        with a server-side cursor in chunks and flushed row by row by
+        xlsxwriter. Column widths come from the first rows. `progress` is
+        called with the rows written so far after every chunk. Returns the
+        number of rows written.
+        """
+        workbook = xlsxwriter.Workbook(output, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+        })
+        worksheet = workbook.add_worksheet('Properties')
+        header_format = workbook.add_format({
+            'bold': True,
+            'text_wrap': True,
+            'valign': 'top',
+            'fg_color': '#D7E4BC',
+            'border': 1
+        })
+
+        rows = iter(self.property_export_query(db, **filters).yield_per(chunk_size))
+        sample = list(itertools.islice(rows, WIDTH_SAMPLE_SIZE))
+
+        headers = [name for name, _ in PROPERTY_EXPORT_COLUMNS]
+        for idx, header in enumerate(headers):
+            width = max([len(header)] + [len(str(row[idx])) for row in sample if row[idx] is not None])
+            worksheet.set_column(idx, idx, min(width + 2, MAX_COLUMN_WIDTH))
+        worksheet.write_row(0, 0, headers, header_format)
+
+        # constant_memory requires rows in order; each one is flushed when the next starts
+        count = 0
+        for row in itertools.chain(sample, rows):
+            count += 1
+            worksheet.write_row(count, 0, row)
+            if progress is not None and count % chunk_size == 0:
+                progress(count)
+
+        workbook.close()
+        if progress is not None:
+            progress(count)
+        return count
+
+    def spool_properties_excel(self, db: Session, **filters) -> BinaryIO:
+        """
+        Build the streaming Excel export into a spooled temporary file that
+        stays in memory up to SPOOL_MAX_MEMORY and spills to disk beyond it.
+        Returns the file rewound to the start.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        try:
+            self.stream_properties_excel(db, spool, **filters)
+        except Exception:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
+    def iter_file(self, file: BinaryIO, block_size: int = STREAM_BLOCK_SIZE) -> Iterator[bytes]:
+        """
+        Yield a file in blocks and close it when done
+        """
+        try:
+            while True:
+                block = file.read(block_size)
+                if not block:
+                    break
+                yield block
+        finally:
+            file.close()
 
     def export_to_pdf(
         self,
         db: Session,
         property: models.Property,
-        output_path: str,
+        output: Output,
         valuation_result: Optional[schemas.ValuationResult] = None
-    ) -> str:
+    ) -> Output:
         """
-        Export property details and valuation to PDF
+        Export property details and valuation to a PDF file path or file-like object
         """
         doc = SimpleDocTemplate(
-            output_path,
+            output,
             pagesize=letter,
             rightMargin=72,
             leftMargin=72,
@@ -97,18 +317,12 @@ class ExportService:
         elements = []
 
         # Add title
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30
-        )
-        elements.append(Paragraph("Property Valuation Report", title_style))
+        styles = pdf_styles()
+        elements.append(Paragraph("Property Valuation Report", styles['title']))
         elements.append(Spacer(1, 12))
 
         # Property details
-        elements.append(Paragraph("Property Details", styles['Heading2']))
+        elements.append(Paragraph("Property Details", styles['heading2']))
         elements.append(Spacer(1, 12))
 
         property_data = [
@@ -125,150 +339,217 @@ class ExportService:
 
         # Create property details table
         property_table = Table(property_data, colWidths=[2*inch, 4*inch])
-        property_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        property_table.setStyle(styles['property_table'])
         elements.append(property_table)
         elements.append(Spacer(1, 20))
 
         # Add valuation results if available
         if valuation_result:
-            elements.append(Paragraph("Valuation Results", styles['Heading2']))
+            elements.append(Paragraph("Valuation Results", styles['heading2']))
             elements.append(Spacer(1, 12))
 
+            final_valuation, confidence_score, adjustment_rows = self._valuation_summary(valuation_result)
+
             # Final valuation
             elements.append(Paragraph(
-                f"Final Valuation: ${valuation_result.final_valuation:,.2f}",
-                styles['Heading3']
+                f"Final Valuation: ${final_valuation:,.2f}",
+                styles['heading3']
             ))
             elements.append(Spacer(1, 12))
 
             # Confidence score
-            elements.append(Paragraph(
-                f"Confidence Score: {valuation_result.confidence_score:.2%}",
-                styles['Normal']
-            ))
-            elements.append(Spacer(1, 12))
+            if confidence_score is not None:
+                elements.append(Paragraph(
+                    f"Confidence Score: {confidence_score:.2%}",
+                    styles['normal']
+                ))
+                elements.append(Spacer(1, 12))
 
             # Adjustments
-            elements.append(Paragraph("Adjustments", styles['Heading3']))
+            elements.append(Paragraph("Adjustments", styles['heading3']))
             elements.append(Spacer(1, 12))
 
             adjustment_data = [["Feature", "Value", "Description"]]
-            for comp_id, adjustments in valuation_result.adjustments.items():
-                for adj in adjustments:
-                    adjustment_data.append([
-                        adj.feature,
-                        f"${adj.value:,.2f}",
-                        adj.description or ""
-                    ])
+            for feature, value, description in adjustment_rows:
+                adjustment_data.append([
+                    feature,
+                    f"${value:,.2f}",
+                    description or ""
+                ])
 
             # Create adjustments table
             adjustment_table = Table(adjustment_data, colWidths=[2*inch, 2*inch, 2*inch])
-            adjustment_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            adjustment_table.setStyle(styles['adjustment_table'])
             elements.append(adjustment_table)
 
         # Build PDF
         doc.build(elements)
-        return output_path
+        return output
 
-    async def generate_pdf(self, valuation_data: schemas.ValuationResult) -> str:
+    def _valuation_summary(self, valuation):
         """
-        Generate PDF report and return as base64 string
+        Final value, confidence and adjustment rows of a valuation result or
+        of a stored valuation history entry (which holds plain dicts)
+        """
+        if isinstance(valuation, models.ValuationHistory):
+            final_valuation, confidence_score = valuation.adjusted_price or 0.0, None
+        else:
+            final_valuation, confidence_score = valuation.final_valuation, valuation.confidence_score
+
+        rows = []
+        for comp_id, adjustments in (valuation.adjustments or {}).items():
+            for adj in adjustments:
+                if isinstance(adj, dict):
+                    rows.append((adj.get("feature"), adj.get("value") or 0.0, adj.get("description")))
+                else:
+                    rows.append((adj.feature, adj.value, adj.description))
+        return final_valuation, confidence_score, rows
+
+    def render_pdf(self, valuation_data: schemas.ValuationResult) -> bytes:
+        """
+        Render the valuation PDF report in memory
+        """
+        buffer = io.BytesIO()
+        self.export_to_pdf(
+            db=None,
+            property=valuation_data.subject_property,
+            output=buffer,
+            valuation_result=valuation_data
+        )
+        return buffer.getvalue()
+
+    def write_valuation_excel(self, valuation_data: schemas.ValuationResult, output: Output) -> Output:
+        """
+        Write the subject and comparables of a valuation to an Excel file
+        """
+        all_properties = [valuation_data.subject_property] + valuation_data.comparable_properties
+
+        # Convert to list of dicts for DataFrame
+        properties_data = []
+        for prop in all_properties:
+            properties_data.append({
+                "ID": prop.id,
+                "Address": prop.address,
+                "Type": prop.property_type,
+                "Area": prop.area,
+                "Floor": prop.floor_level,
+                "Total Floors": prop.total_floors,
+                "Condition": prop.condition,
+                "Renovation": prop.renovation_status,
+                "Price": prop.price,
+                "Role": "Subject" if prop.id == valuation_data.subject_property.id else "Comparable"
+            })
+
+        df = pd.DataFrame(properties_data)
+        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='Properties')
+        return output
+
+    def render_excel(self, valuation_data: schemas.ValuationResult) -> bytes:
+        """
+        Render the valuation Excel report in memory
+        """
+        buffer = io.BytesIO()
+        self.write_valuation_excel(valuation_data, buffer)
+        return buffer.getvalue()
+
+    def report_key(self, valuation_data: schemas.ValuationResult, extension: str) -> str:
+        """
+        Cache key of a valuation report: its content, format and template version
+        """
+        return content_key(REPORT_TEMPLATE_VERSION, extension, valuation_data.model_dump(mode="json"))
+
+    def history_report_key(self, history: models.ValuationHistory) -> str:
+        """
+        Cache key of the report of a stored valuation and its property
+        """
+        property = history.property
+        return content_key(
+            REPORT_TEMPLATE_VERSION,
+            "history-pdf",
+            schemas.ValuationHistory.model_validate(history).model_dump(mode="json"),
+            property.id if property else None,
+            property.updated_at if property else None
+        )
+
+    def render_history_pdf(self, history: models.ValuationHistory) -> bytes:
         """
-        # Create temporary file
+        Render the PDF report of a stored valuation in memory
+        """
+        buffer = io.BytesIO()
+        self.export_to_pdf(db=None, property=history.property, output=buffer, valuation_result=history)
+        return buffer.getvalue()
+
+    def report_filename(self, valuation_data: schemas.ValuationResult, extension: str) -> str:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        temp_path = f"/tmp/valuation_report_{timestamp}.pdf"
-        
+        return f"valuation_report_{valuation_data.subject_property.id}_{timestamp}.{extension}"
+
+    async def render_pdf_async(self, valuation_data: schemas.ValuationResult) -> Tuple[bytes, float]:
+        """
+        Render a valuation PDF in the report pool without blocking the event loop
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.get_report_pool(),
+            render_valuation_pdf,
+            valuation_data.model_dump(mode="json")
+        )
+
+    async def render_pdf_batch(
+        self,
+        valuations: List[schemas.ValuationResult]
+    ) -> List[Tuple[str, bytes, float]]:
+        """
+        Render many valuation PDFs across the report pool. Returns
+        (filename, content, render seconds) in input order.
+        """
+        results = await asyncio.gather(*[self.render_pdf_async(v) for v in valuations])
+        return [
+            (f"valuation_report_{index + 1}_{valuation.subject_property.id}.pdf", content, seconds)
+            for index, (valuation, (content, seconds)) in enumerate(zip(valuations, results))
+        ]
+
+    def write_report_zip(self, reports: List[Tuple[str, bytes, float]], output: BinaryIO) -> BinaryIO:
+        """
+        Zip rendered reports together with a manifest of render times
+        """
+        manifest = [
+            {"filename": filename, "size": len(content), "render_seconds": round(seconds, 4)}
+            for filename, content, seconds in reports
+        ]
+        # PDFs are already compressed; storing them avoids a second pass
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+            for filename, content, _ in reports:
+                archive.writestr(filename, content)
+            archive.writestr("manifest.json", json.dumps({"reports": manifest}, indent=2))
+        return output
+
+    def spool_report_zip(self, reports: List[Tuple[str, bytes, float]]) -> BinaryIO:
+        """
+        write_report_zip() into a spooled temporary file, like
+        spool_properties_excel(). Returns the file rewound to the start.
+        """
+        spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
         try:
-            # Generate PDF
-            self.export_to_pdf(
-                db=None,
-                property=valuation_data.subject_property,
-                output_path=temp_path,
-                valuation_result=valuation_data
-            )
-            
-            # Read and encode as base64
-            with open(temp_path, 'rb') as f:
-                pdf_data = f.read()
-                encoded = base64.b64encode(pdf_data).decode('utf-8')
-            
-            # Clean up
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-                
-            return encoded
-        except Exception as e:
-            # Clean up on error
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            raise e
+            self.write_report_zip(reports, spool)
+        except Exception:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool
+
+    async def generate_pdf(self, valuation_data: schemas.ValuationResult) -> str:
+        """
+        Generate PDF report and return as base64 string
+        """
+        content, _ = await self.render_pdf_async(valuation_data)
+        return base64.b64encode(content).decode('utf-8')
 
     async def generate_excel(self, valuation_data: schemas.ValuationResult) -> str:
         """
         Generate Excel report and return as base64 string
         """
-        # Create temporary file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        temp_path = f"/tmp/valuation_report_{timestamp}.xlsx"
-        
-        try:
-            # Prepare data
-            all_properties = [valuation_data.subject_property] + valuation_data.comparable_properties
-            
-            # Convert to list of dicts for DataFrame
-            properties_data = []
-            for prop in all_properties:
-                properties_data.append({
-                    "ID": prop.id,
-                    "Address": prop.address,
-                    "Type": prop.property_type,
-                    "Area": prop.area,
-                    "Floor": prop.floor_level,
-                    "Total Floors": prop.total_floors,
-                    "Condition": prop.condition,
-                    "Renovation": prop.renovation_status,
-                    "Price": prop.price,
-                    "Role": "Subject" if prop.id == valuation_data.subject_property.id else "Comparable"
-                })
-            
-            # Generate Excel
-            df = pd.DataFrame(properties_data)
-            df.to_excel(temp_path, index=False, sheet_name='Properties')
-            
-            # Read and encode as base64
-            with open(temp_path, 'rb') as f:
-                excel_data = f.read()
-                encoded = base64.b64encode(excel_data).decode('utf-8')
-            
-            # Clean up
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-                
-            return encoded
-        except Exception as e:
-            # Clean up on error
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            raise e
+        return base64.b64encode(self.render_excel(valuation_data)).decode('utf-8')
 
     def generate_report(
         self,
@@ -284,7 +565,7 @@ class ExportService:
         os.makedirs(output_dir, exist_ok=True)
 
         # Get property
-        property = db.query(models.Property).filter(models.Property.id == property_id).first()
+        property = property_cache.get(db, property_id)
         if not property:
             raise ValueError(f"Property with ID {property_id} not found")
 
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 import models
 import schemas
 from datetime import datetime
@@ -30,6 +31,20 @@ class GeolocationService:
             print(f"Geocoding error: {str(e)}")
             return None
 
+    def geocode_addresses(
+        self,
+        addresses: Iterable[str],
+        max_workers: int = 2
+    ) -> Dict[str, Optional[Tuple[float, float]]]:
+        """
+        Geocode a batch of addresses, each distinct address once
+        """
+        unique = list(dict.fromkeys(address.strip() for address in addresses if address and address.strip()))
+        if not unique:
+            return {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(unique, pool.map(self.geocode_address, unique)))
+
     def reverse_geocode(
         self,
         lat: float,
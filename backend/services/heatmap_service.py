@@ -0,0 +1,254 @@
+# backend/services/heatmap_service.py
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import models
+from database import lock_or_create
+import geohash
+from services.outbox_service import outbox_dispatcher, PROPERTY
+from services.quantile_sketch import KLLSketch
+
+# Geohash precisions that are kept precomputed
+TILE_PRECISIONS = (2, 3, 4, 5, 6, 7)
+
+# Smaller sketches than the analytics rollups: tiles are many and small
+TILE_SKETCH_K = 64
+
+
+def precision_for_zoom(zoom: int) -> int:
+    """
+    Map a web map zoom level (0-22) to a tile geohash precision
+    """
+    precision = 2 + max(zoom - 1, 0) // 3
+    return min(max(precision, TILE_PRECISIONS[0]), TILE_PRECISIONS[-1])
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """
+    Height and width in degrees of a geohash cell of the given precision
+    """
+    bits = precision * 5
+    lat_bits = bits // 2
+    lng_bits = bits - lat_bits
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+class HeatmapService:
+    """
+    Price per m² aggregates per geohash tile, kept for every precision in
+    TILE_PRECISIONS and maintained on property writes.
+
+    Count and sum are exact and updated incrementally. Medians come from a
+    small quantile sketch per tile; sketches cannot forget values, so a
+    removal marks the tile stale and the change feed subscriber below
+    recomputes it from its geohash prefix. Reads never write: until then a
+    stale tile serves its previous median.
+    """
+
+    def snapshot(self, property: models.Property) -> Optional[Tuple[str, float]]:
+        """
+        Tile-relevant state of a property; take it before modifying the row
+        """
+        if property.is_quarantined:
+            return None
+        if not property.geohash or not property.price or not property.area:
+            return None
+        return property.geohash, property.price / property.area
+
+    def _tile(self, db: Session, precision: int, cell: str) -> models.PriceTile:
+        center_lat, center_lng = geohash.decode(cell)
+        return lock_or_create(
+            db,
+            models.PriceTile,
+            {"precision": precision, "geohash": cell},
+            {
+                "center_lat": center_lat,
+                "center_lng": center_lng,
+                "count": 0,
+                "sum_price_per_sqm": 0.0,
+                "sketch": KLLSketch(k=TILE_SKETCH_K).to_dict(),
+                "sketch_stale": False
+            }
+        )
+
+    def apply(
+        self,
+        db: Session,
+        added: Iterable[Optional[Tuple[str, float]]] = (),
+        removed: Iterable[Optional[Tuple[str, float]]] = ()
+    ) -> None:
+        """
+        Apply a batch of added and removed snapshots to the tiles, touching
+        each tile once (caller commits)
+        """
+        changes: Dict[Tuple[int, str], Dict[str, Any]] = {}
+
+        def change(precision, cell):
+            key = (precision, cell[:precision])
+            if key not in changes:
+                changes[key] = {"count": 0, "sum": 0.0, "values": [], "removed": False}
+            return changes[key]
+
+        for snapshot in added:
+            if snapshot is None:
+                continue
+            cell, price_per_sqm = snapshot
+            for precision in TILE_PRECISIONS:
+                delta = change(precision, cell)
+                delta["count"] += 1
+                delta["sum"] += price_per_sqm
+                delta["values"].append(price_per_sqm)
+
+        for snapshot in removed:
+            if snapshot is None:
+                continue
+            cell, price_per_sqm = snapshot
+            for precision in TILE_PRECISIONS:
+                delta = change(precision, cell)
+                delta["count"] -= 1
+                delta["sum"] -= price_per_sqm
+                delta["removed"] = True
+
+        for (precision, cell), delta in changes.items():
+            tile = self._tile(db, precision, cell)
+            tile.count = max(tile.count + delta["count"], 0)
+            tile.sum_price_per_sqm += delta["sum"]
+            if delta["values"]:
+                sketch = KLLSketch.from_dict(tile.sketch)
+                sketch.update_many(delta["values"])
+                tile.sketch = sketch.to_dict()
+            if delta["removed"]:
+                tile.sketch_stale = True
+
+    def add_property(self, db: Session, property: models.Property) -> None:
+        self.apply(db, added=[self.snapshot(property)])
+
+    def remove_property(self, db: Session, property: models.Property) -> None:
+        self.apply(db, removed=[self.snapshot(property)])
+
+    def update_property(
+        self,
+        db: Session,
+        before: Optional[Tuple[str, float]],
+        property: models.Property
+    ) -> None:
+        """
+        Move a property between tiles after an update (caller commits)
+        """
+        after = self.snapshot(property)
+        if before != after:
+            self.apply(db, added=[after], removed=[before])
+
+    def _refresh_tile(self, db: Session, tile: models.PriceTile) -> None:
+        rows = db.query(models.Property.price, models.Property.area)\
+            .filter(models.Property.geohash.like(f"{tile.geohash}%"))\
+            .filter(models.Property.is_quarantined.isnot(True))\
+            .all()
+        values = [price / area for price, area in rows if price and area]
+        sketch = KLLSketch(k=TILE_SKETCH_K)
+        sketch.update_many(values)
+        tile.count = len(values)
+        tile.sum_price_per_sqm = float(sum(values))
+        tile.sketch = sketch.to_dict()
+        tile.sketch_stale = False
+
+    def refresh_stale(self, db: Session, limit: Optional[int] = None) -> int:
+        """
+        Recompute stale tiles, finest first (caller commits). Returns the
+        number of tiles refreshed.
+        """
+        query = db.query(models.PriceTile)\
+            .filter(models.PriceTile.sketch_stale.is_(True))\
+            .order_by(models.PriceTile.precision.desc(), models.PriceTile.id)\
+            .with_for_update(skip_locked=True)
+        if limit is not None:
+            query = query.limit(limit)
+        tiles = query.all()
+        for tile in tiles:
+            self._refresh_tile(db, tile)
+        return len(tiles)
+
+    def rebuild_tiles(self, db: Session, chunk_size: int = 5000) -> int:
+        """
+        Recompute all tiles from the properties table. Returns the tile count.
+        """
+        aggregates: Dict[Tuple[int, str], List[Any]] = {}
+        query = db.query(models.Property.geohash, models.Property.price, models.Property.area)\
+            .filter(models.Property.geohash.isnot(None))\
+            .filter(models.Property.is_quarantined.isnot(True))
+        for cell, price, area in query.yield_per(chunk_size):
+            if not price or not area:
+                continue
+            price_per_sqm = price / area
+            for precision in TILE_PRECISIONS:
+                key = (precision, cell[:precision])
+                if key not in aggregates:
+                    aggregates[key] = [0, 0.0, KLLSketch(k=TILE_SKETCH_K)]
+                aggregates[key][0] += 1
+                aggregates[key][1] += price_per_sqm
+                aggregates[key][2].update(price_per_sqm)
+
+        db.query(models.PriceTile).delete(synchronize_session=False)
+        for (precision, cell), (count, total, sketch) in aggregates.items():
+            center_lat, center_lng = geohash.decode(cell)
+            db.add(models.PriceTile(
+                precision=precision,
+                geohash=cell,
+                center_lat=center_lat,
+                center_lng=center_lng,
+                count=count,
+                sum_price_per_sqm=total,
+                sketch=sketch.to_dict(),
+                sketch_stale=False
+            ))
+        db.commit()
+        return len(aggregates)
+
+    def get_tiles(
+        self,
+        db: Session,
+        min_lat: float,
+        min_lng: float,
+        max_lat: float,
+        max_lng: float,
+        zoom: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Tile aggregates intersecting a bounding box at a zoom level
+        """
+        precision = precision_for_zoom(zoom)
+        height, width = cell_size(precision)
+
+        # A tile intersects the box when its center is within half a cell of it
+        tiles = db.query(models.PriceTile)\
+            .filter(models.PriceTile.precision == precision)\
+            .filter(models.PriceTile.center_lat >= min_lat - height / 2)\
+            .filter(models.PriceTile.center_lat <= max_lat + height / 2)\
+            .filter(models.PriceTile.center_lng >= min_lng - width / 2)\
+            .filter(models.PriceTile.center_lng <= max_lng + width / 2)\
+            .filter(models.PriceTile.count > 0)\
+            .all()
+
+        result = []
+        for tile in tiles:
+            result.append({
+                "geohash": tile.geohash,
+                "lat": tile.center_lat,
+                "lng": tile.center_lng,
+                "count": tile.count,
+                "mean_price_per_sqm": tile.sum_price_per_sqm / tile.count,
+                "median_price_per_sqm": KLLSketch.from_dict(tile.sketch).quantile(0.5)
+            })
+        return result
+
+heatmap_service = HeatmapService()
+
+
+def _refresh_stale_tiles(db: Session, events: List[models.OutboxEvent]) -> None:
+    # Only updates and deletes take values out of a tile
+    if any(e.event_type != "created" for e in events):
+        heatmap_service.refresh_stale(db)
+
+
+# Stale tiles are recomputed off the request path, in the transaction that
+# advances the subscriber's checkpoint
+outbox_dispatcher.subscribe("heatmap_tiles", _refresh_stale_tiles, aggregates=[PROPERTY])
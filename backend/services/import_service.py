@@ -0,0 +1,308 @@
+# backend/services/import_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, text
+from pydantic import ValidationError
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime
+import csv
+import io
+import itertools
+import json
+import logging
+import models
+import schemas
+from services.geolocation_service import geolocation_service
+from services.screening_service import screening_service
+from services.clustering_service import clustering_service
+from services.sketch_service import sketch_service
+from services.heatmap_service import heatmap_service
+from services.outbox_service import outbox_service, PROPERTY
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_FORMATS = ("csv", "xlsx")
+IMPORT_METHODS = ("auto", "insert", "copy")
+
+# Alternative spellings accepted in import headers
+COLUMN_ALIASES = {
+    "type": "property_type",
+    "floor": "floor_level",
+    "renovation": "renovation_status",
+    "latitude": "lat",
+    "longitude": "lng",
+    "lon": "lng"
+}
+
+# Columns written by the import; id comes from the database
+_INSERT_COLUMNS = [column.key for column in models.Property.__table__.columns if column.key != "id"]
+_FEATURE_COLUMNS = ["property_id", "name", "value", "unit", "description", "created_at", "updated_at"]
+
+
+def read_csv_rows(file: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the rows of a UTF-8 CSV file as dicts
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.DictReader(text)
+    finally:
+        text.detach()
+
+
+def read_xlsx_rows(file: BinaryIO) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the rows of the first sheet of an XLSX file as dicts
+    """
+    import openpyxl  # Only needed for XLSX imports
+
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else "" for name in next(rows, ())]
+        for values in rows:
+            if all(value is None for value in values):
+                continue
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def _copy_value(value: Any) -> Any:
+    """
+    Text form of a value for COPY ... WITH (FORMAT csv); None stays empty (NULL)
+    """
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ImportService:
+    """
+    Bulk property import from CSV/XLSX.
+
+    Rows are parsed as a stream and processed in chunks: each chunk is
+    validated through PropertyCreate, rows without coordinates are geocoded
+    (each distinct address once per import), and valid rows are written
+    with one multi-row INSERT, or COPY on PostgreSQL, followed by their
+    features in the same way. Screening, submarket
+    assignment, rollups and heatmap tiles are updated once per chunk, and
+    every chunk is committed on its own, so a failure only loses that chunk.
+    """
+
+    def _parse_row(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for key, value in raw.items():
+            if key is None:
+                continue
+            key = str(key).strip().lower()
+            key = COLUMN_ALIASES.get(key, key)
+            if isinstance(value, str):
+                value = value.strip()
+            data[key] = None if value == "" else value
+
+        lat, lng = data.pop("lat", None), data.pop("lng", None)
+        if lat is not None and lng is not None:
+            data["location"] = {"lat": lat, "lng": lng}
+
+        features = data.get("features")
+        if isinstance(features, str):
+            try:
+                data["features"] = json.loads(features)
+            except ValueError:
+                pass  # Reported by validation
+        elif features is None:
+            data["features"] = []
+        return data
+
+    def _format_errors(self, error: ValidationError) -> List[str]:
+        return [
+            f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+            for item in error.errors()
+        ]
+
+    def _method(self, db: Session, method: str) -> str:
+        if method == "auto":
+            return "copy" if db.get_bind().dialect.name == "postgresql" else "insert"
+        return method
+
+    def _copy(self, db: Session, table: str, columns: List[str], values: List[Dict[str, Any]]) -> None:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in values:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+
+        # Raw psycopg2 connection of the session's transaction
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    def _reserve_ids(self, db: Session, count: int) -> List[int]:
+        """
+        Take `count` ids from the properties sequence, so COPY can write the
+        features of rows it has not inserted yet
+        """
+        return list(db.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            {"table": models.Property.__tablename__, "count": count}
+        ).scalars())
+
+    def _write(self, db: Session, objects: List[models.Property], method: str) -> None:
+        """
+        Write properties and their features; assigns the new ids to `objects`
+        """
+        values = [
+            {column: getattr(db_property, column) for column in _INSERT_COLUMNS}
+            for db_property in objects
+        ]
+        copy = self._method(db, method) == "copy"
+        if copy:
+            ids = self._reserve_ids(db, len(values))
+            for row, property_id in zip(values, ids):
+                row["id"] = property_id
+            self._copy(db, models.Property.__tablename__, ["id"] + _INSERT_COLUMNS, values)
+        else:
+            ids = db.execute(
+                insert(models.Property).returning(models.Property.id, sort_by_parameter_order=True),
+                values
+            ).scalars().all()
+
+        features = []
+        for db_property, property_id in zip(objects, ids):
+            db_property.id = property_id
+            features.extend({
+                "property_id": property_id,
+                "name": feature.name,
+                "value": feature.value,
+                "unit": feature.unit,
+                "description": feature.description,
+                "created_at": db_property.created_at,
+                "updated_at": db_property.updated_at
+            } for feature in db_property.features)
+        if not features:
+            return
+        if copy:
+            self._copy(db, models.PropertyFeature.__tablename__, _FEATURE_COLUMNS, features)
+        else:
+            db.execute(insert(models.PropertyFeature), features)
+
+    def _import_chunk(
+        self,
+        db: Session,
+        rows: List[Tuple[int, Dict[str, Any]]],
+        report: Dict[str, Any],
+        geocoded: Dict[str, Optional[Tuple[float, float]]],
+        geocode: bool,
+        method: str
+    ) -> None:
+        parsed = [(number, self._parse_row(raw)) for number, raw in rows]
+
+        if geocode:
+            pending = {
+                data["address"] for _, data in parsed
+                if "location" not in data and data.get("address") and data["address"] not in geocoded
+            }
+            if pending:
+                results = geolocation_service.geocode_addresses(pending)
+                geocoded.update(results)
+                # Addresses the geocoder could not place are not counted
+                report["geocoded"] += sum(1 for location in results.values() if location)
+            for _, data in parsed:
+                if "location" not in data and geocoded.get(data.get("address")):
+                    lat, lng = geocoded[data["address"]]
+                    data["location"] = {"lat": lat, "lng": lng}
+
+        objects: List[models.Property] = []
+        numbers: List[int] = []
+        for number, data in parsed:
+            try:
+                property_data = schemas.PropertyCreate.model_validate(data)
+            except ValidationError as e:
+                report["errors"].append({"row": number, "errors": self._format_errors(e)})
+                continue
+            # Transient instance: model validators fill the derived columns
+            db_property = models.Property(**property_data.model_dump())
+            objects.append(db_property)
+            numbers.append(number)
+
+        if not objects:
+            return
+
+        try:
+            screening_service.screen_properties(db, objects)
+            clustering_service.assign_properties(db, objects)
+
+            # Stamped just before the INSERT, so the rows are not older than
+            # the settle window of delta sync by the time they commit
+            now = datetime.utcnow()
+            for db_property in objects:
+                db_property.created_at = now
+                db_property.updated_at = now
+            self._write(db, objects, method)
+            outbox_service.record(db, PROPERTY, "created", [p.id for p in objects])
+            sketch_service.record_properties(db, objects)
+            heatmap_service.apply(db, added=[heatmap_service.snapshot(p) for p in objects])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.exception("Import chunk starting at row %s failed", numbers[0])
+            report["errors"].extend({"row": number, "errors": [str(e)]} for number in numbers)
+            return
+
+        report["imported"] += len(objects)
+        report["anomalies"] += sum(1 for p in objects if p.is_anomaly)
+
+    def import_rows(
+        self,
+        db: Session,
+        rows: Iterable[Dict[str, Any]],
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        geocode: bool = True,
+        method: str = "auto"
+    ) -> Dict[str, Any]:
+        """
+        Import parsed rows. Returns totals and per-row errors; row numbers
+        are file lines, with the header on line 1.
+        """
+        if method not in IMPORT_METHODS:
+            raise ValueError(f"Unsupported import method: {method}")
+
+        report: Dict[str, Any] = {"total": 0, "imported": 0, "anomalies": 0, "geocoded": 0, "errors": []}
+        geocoded: Dict[str, Optional[Tuple[float, float]]] = {}
+        numbered = enumerate(rows, start=2)
+        while True:
+            chunk = list(itertools.islice(numbered, chunk_size))
+            if not chunk:
+                break
+            report["total"] += len(chunk)
+            self._import_chunk(db, chunk, report, geocoded, geocode, method)
+
+        report["failed"] = len(report["errors"])
+        return report
+
+    def import_file(
+        self,
+        db: Session,
+        file: BinaryIO,
+        format: str,
+        **options
+    ) -> Dict[str, Any]:
+        """
+        Import a CSV or XLSX file object
+        """
+        if format not in IMPORT_FORMATS:
+            raise ValueError(f"Unsupported import format: {format}")
+        rows = read_csv_rows(file) if format == "csv" else read_xlsx_rows(file)
+        return self.import_rows(db, rows, **options)
+
+import_service = ImportService()
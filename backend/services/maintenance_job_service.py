@@ -0,0 +1,177 @@
+# backend/services/maintenance_job_service.py
+from concurrent.futures import Future, ThreadPoolExecutor
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from typing import Any, Callable, Dict, Optional
+from datetime import datetime, timedelta
+import logging
+import threading
+import uuid
+import models
+from config import settings
+from database import SessionLocal
+from services.analytics_runner import analytics_runner
+from services.clustering_service import clustering_service
+from services.screening_service import screening_service
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("pending", "running")
+
+Runner = Callable[[Session, Dict[str, Any]], Dict[str, Any]]
+
+
+def _fit_submarkets(db: Session, params: Dict[str, Any]) -> Dict[str, Any]:
+    model = clustering_service.fit(db, k=params.get("k", 12))
+    analytics_runner.cache.clear()
+    return {"clusters": model.k if model is not None else 0}
+
+
+def _rescreen(db: Session, params: Dict[str, Any]) -> Dict[str, Any]:
+    result = screening_service.rescreen(db)
+    analytics_runner.cache.clear()
+    return result
+
+
+class MaintenanceJobService:
+    """
+    Admin jobs that rewrite whole tables (re-clustering, re-screening).
+
+    Jobs are recorded in the maintenance_jobs table and run one at a time
+    in a single background worker, off the request path; a second job of
+    a kind that is already active is refused. Workers open their own
+    sessions from `session_factory`. An active job older than `timeout`
+    seconds was lost with its worker and is marked failed, so it does not
+    block its kind forever.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        timeout: float = settings.MAINTENANCE_JOB_TIMEOUT_SECONDS
+    ):
+        self.session_factory = session_factory
+        self.timeout = timeout
+        self.runners: Dict[str, Runner] = {
+            "fit_submarkets": _fit_submarkets,
+            "rescreen": _rescreen
+        }
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="maintenance")
+            return self._executor
+
+    def submit(self, db: Session, user: models.User, kind: str, params: Dict[str, Any]) -> models.MaintenanceJob:
+        """
+        Queue a maintenance job
+        """
+        if kind not in self.runners:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported maintenance job '{kind}'"
+            )
+
+        self.fail_lost(db)
+
+        active = db.query(models.MaintenanceJob)\
+            .filter(models.MaintenanceJob.kind == kind)\
+            .filter(models.MaintenanceJob.status.in_(ACTIVE_STATUSES))\
+            .first()
+        if active is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"A {kind} job is already active: {active.id}"
+            )
+
+        job = models.MaintenanceJob(
+            id=uuid.uuid4().hex,
+            user_id=user.id,
+            kind=kind,
+            params=params,
+            status="pending"
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        job_id = job.id
+        future = self._get_executor().submit(self._run, job_id)
+        self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._futures.pop(job_id, None))
+        return job
+
+    def get_job(self, db: Session, job_id: str) -> models.MaintenanceJob:
+        job = db.get(models.MaintenanceJob, job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Maintenance job not found"
+            )
+        return job
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> None:
+        """
+        Block until a job submitted by this process has finished
+        """
+        future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    def _run(self, job_id: str) -> None:
+        db = self.session_factory()
+        try:
+            job = db.get(models.MaintenanceJob, job_id)
+            if job is None:
+                return
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            db.commit()
+            params = dict(job.params or {})
+
+            try:
+                result = self.runners[job.kind](db, params)
+            except Exception as e:
+                logger.exception("Maintenance job %s failed", job_id)
+                db.rollback()
+                job.status = "failed"
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                db.commit()
+                return
+
+            job.status = "completed"
+            job.result = result
+            job.finished_at = datetime.utcnow()
+            db.commit()
+        finally:
+            db.close()
+
+    def fail_lost(self, db: Session) -> int:
+        """
+        Mark active jobs older than the timeout failed. Returns their number.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.timeout)
+        lost = db.query(models.MaintenanceJob)\
+            .filter(models.MaintenanceJob.status.in_(ACTIVE_STATUSES))\
+            .filter(models.MaintenanceJob.created_at < cutoff)\
+            .all()
+        for job in lost:
+            job.status = "failed"
+            job.error = "Job did not finish within the timeout"
+            job.finished_at = datetime.utcnow()
+        if lost:
+            db.commit()
+        return len(lost)
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+maintenance_job_service = MaintenanceJobService()
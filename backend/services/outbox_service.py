@@ -0,0 +1,309 @@
+# backend/services/outbox_service.py
+from sqlalchemy import event, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+import logging
+import threading
+import time
+import models
+from config import settings
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Aggregates with change events
+PROPERTY = "property"
+ADJUSTMENT_COEFFICIENT = "adjustment_coefficient"
+AGGREGATES = (PROPERTY, ADJUSTMENT_COEFFICIENT)
+
+# Checkpoint row holding the id of the last pruned event
+PRUNED_CHECKPOINT = "outbox.pruned"
+PRUNE_INTERVAL_SECONDS = 3600
+
+Handler = Callable[[Session, List[models.OutboxEvent]], None]
+
+
+class OutboxService:
+    """
+    Transactional outbox of property and adjustment coefficient changes.
+
+    Services record events on the session that makes the change, so an
+    event is committed exactly when its change is. Event ids are the
+    offsets of the change feed. Ids are allocated before commit, so on
+    PostgreSQL a later id can become visible before an earlier one;
+    readers stop at such a gap until the event after it is `gap_grace`
+    seconds old, after which the gap is taken for a rolled back
+    transaction.
+    """
+
+    def __init__(
+        self,
+        gap_grace: float = settings.OUTBOX_GAP_GRACE_SECONDS,
+        retention_days: int = settings.OUTBOX_RETENTION_DAYS
+    ):
+        self.gap_grace = gap_grace
+        self.retention_days = retention_days
+        # Set after a commit that recorded events, wakes the dispatcher
+        self.committed = threading.Event()
+        self._notify = lambda session: self.committed.set()
+
+    def record(
+        self,
+        db: Session,
+        aggregate: str,
+        event_type: str,
+        ids: Iterable[int],
+        fields: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Add one event per id to the session's transaction, in one INSERT;
+        `fields` names the columns an update changed
+        """
+        ids = list(ids)
+        if not ids:
+            return
+        payload = {"fields": sorted(fields)} if fields else None
+        now = datetime.utcnow()
+        db.execute(insert(models.OutboxEvent), [
+            {
+                "aggregate": aggregate,
+                "aggregate_id": aggregate_id,
+                "event_type": event_type,
+                "payload": payload,
+                "created_at": now
+            }
+            for aggregate_id in ids
+        ])
+        if not event.contains(db, "after_commit", self._notify):
+            event.listen(db, "after_commit", self._notify)
+
+    def read(
+        self,
+        db: Session,
+        after: int,
+        limit: int,
+        aggregates: Optional[Sequence[str]] = None
+    ) -> Tuple[List[models.OutboxEvent], int]:
+        """
+        Committed events after offset `after`, oldest first, and the offset
+        to continue from. Filtering by aggregate still advances the offset
+        past the other events.
+        """
+        events = db.query(models.OutboxEvent)\
+            .filter(models.OutboxEvent.id > after)\
+            .order_by(models.OutboxEvent.id)\
+            .limit(limit)\
+            .all()
+        settled = datetime.utcnow() - timedelta(seconds=self.gap_grace)
+        visible = []
+        position = after
+        for outbox_event in events:
+            if outbox_event.id != position + 1 and outbox_event.created_at > settled:
+                break  # An earlier id may still commit
+            visible.append(outbox_event)
+            position = outbox_event.id
+        if aggregates:
+            visible = [e for e in visible if e.aggregate in aggregates]
+        return visible, position
+
+    def head(self, db: Session) -> int:
+        """
+        Offset of the newest event
+        """
+        latest = db.query(func.max(models.OutboxEvent.id)).scalar()
+        return latest if latest is not None else self.pruned_through(db)
+
+    def pruned_through(self, db: Session) -> int:
+        """
+        Id of the last pruned event; older offsets can no longer be read
+        """
+        checkpoint = db.get(models.OutboxCheckpoint, PRUNED_CHECKPOINT)
+        return checkpoint.position if checkpoint is not None else 0
+
+    def prune(self, db: Session) -> int:
+        """
+        Delete events older than the retention period that every durable
+        subscriber has handled
+        """
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        # Ids follow creation order: the first recent event bounds the old ones
+        first_recent = db.query(models.OutboxEvent.id)\
+            .filter(models.OutboxEvent.created_at >= cutoff)\
+            .order_by(models.OutboxEvent.id)\
+            .limit(1)\
+            .scalar()
+        bound = first_recent - 1 if first_recent is not None else self.head(db)
+        handled = db.query(func.min(models.OutboxCheckpoint.position))\
+            .filter(models.OutboxCheckpoint.subscriber != PRUNED_CHECKPOINT)\
+            .scalar()
+        if handled is not None:
+            bound = min(bound, handled)
+        if bound <= self.pruned_through(db):
+            return 0
+
+        deleted = db.query(models.OutboxEvent)\
+            .filter(models.OutboxEvent.id <= bound)\
+            .delete(synchronize_session=False)
+        db.merge(models.OutboxCheckpoint(subscriber=PRUNED_CHECKPOINT, position=bound))
+        db.commit()
+        return deleted
+
+
+class OutboxDispatcher:
+    """
+    Delivers committed outbox events in id order to in-process subscribers.
+
+    Durable subscribers keep their offset in outbox_checkpoints and resume
+    from it after a restart; the handler runs in the transaction that
+    advances the checkpoint, so its own writes commit together with it.
+    On PostgreSQL the checkpoint row is locked, so with several workers
+    each durable subscriber runs in one of them at a time. Local
+    subscribers (per-process state such as caches) start at the head of
+    the feed. A handler that raises gets the same events again on the
+    next round: delivery is at least once, handlers must be idempotent.
+    """
+
+    def __init__(
+        self,
+        outbox: OutboxService,
+        session_factory: Callable[[], Session] = SessionLocal,
+        interval: float = settings.OUTBOX_DISPATCH_INTERVAL_SECONDS,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE
+    ):
+        self.outbox = outbox
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.subscribers: Dict[str, Tuple[Handler, Optional[Tuple[str, ...]], bool]] = {}
+        self._local_positions: Dict[str, int] = {}
+        self._round_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(
+        self,
+        name: str,
+        handler: Handler,
+        aggregates: Optional[Sequence[str]] = None,
+        durable: bool = True
+    ) -> None:
+        """
+        Register `handler(db, events)` for events of `aggregates` (all by default)
+        """
+        self.subscribers[name] = (handler, tuple(aggregates) if aggregates else None, durable)
+
+    def dispatch(self) -> int:
+        """
+        Deliver everything committed so far; returns the number of events
+        handed to subscribers
+        """
+        delivered = 0
+        with self._round_lock:
+            pending = set(self.subscribers)
+            while pending:
+                for name in list(pending):
+                    db = self.session_factory()
+                    try:
+                        count, advanced = self._deliver_batch(db, name)
+                        delivered += count
+                    except Exception:
+                        db.rollback()
+                        logger.exception("Outbox subscriber %s failed, its events will be redelivered", name)
+                        advanced = False
+                    finally:
+                        db.close()
+                    if not advanced:
+                        pending.discard(name)
+        return delivered
+
+    def _deliver_batch(self, db: Session, name: str) -> Tuple[int, bool]:
+        handler, aggregates, durable = self.subscribers[name]
+        if durable:
+            checkpoint = self._claim(db, name)
+            if checkpoint is None:
+                return 0, False  # Running in another worker
+            position = checkpoint.position
+        else:
+            position = self._local_positions.get(name)
+            if position is None:
+                position = self._local_positions[name] = self.outbox.head(db)
+
+        events, next_position = self.outbox.read(db, position, self.batch_size, aggregates)
+        if next_position == position:
+            db.rollback()
+            return 0, False
+        if events:
+            handler(db, events)
+        if durable:
+            checkpoint.position = next_position
+        db.commit()
+        if not durable:
+            self._local_positions[name] = next_position
+        return len(events), True
+
+    def _claim(self, db: Session, name: str) -> Optional[models.OutboxCheckpoint]:
+        """
+        Lock the subscriber's checkpoint row, creating it at the oldest
+        retained event; None when another worker holds it
+        """
+        checkpoint = db.query(models.OutboxCheckpoint)\
+            .filter(models.OutboxCheckpoint.subscriber == name)\
+            .with_for_update(skip_locked=True)\
+            .first()
+        if checkpoint is not None:
+            return checkpoint
+        exists = db.query(models.OutboxCheckpoint.subscriber)\
+            .filter(models.OutboxCheckpoint.subscriber == name)\
+            .first()
+        if exists is not None:
+            return None
+        checkpoint = models.OutboxCheckpoint(subscriber=name, position=self.outbox.pruned_through(db))
+        db.add(checkpoint)
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            return None
+        return checkpoint
+
+    def start(self) -> None:
+        """
+        Dispatch in a background thread, woken by local commits and
+        polling every `interval` seconds for other workers' commits
+        """
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        last_prune = 0.0
+        while not self._stopping.is_set():
+            self.outbox.committed.clear()
+            self.dispatch()
+            if time.monotonic() - last_prune >= PRUNE_INTERVAL_SECONDS:
+                last_prune = time.monotonic()
+                db = self.session_factory()
+                try:
+                    self.outbox.prune(db)
+                except Exception:
+                    db.rollback()
+                    logger.exception("Outbox pruning failed")
+                finally:
+                    db.close()
+            self.outbox.committed.wait(self.interval)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self.outbox.committed.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+
+outbox_service = OutboxService()
+outbox_dispatcher = OutboxDispatcher(outbox_service)
@@ -0,0 +1,83 @@
+# backend/services/pagination.py
+from sqlalchemy import and_, or_, DateTime, Select
+from sqlalchemy.orm import Query
+from fastapi import HTTPException, status
+from typing import Any, List, Optional, Sequence, Union
+from datetime import datetime
+import base64
+import binascii
+import json
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Opaque token for the sort key values of the last row of a page
+    """
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) and value is not None else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_after(columns: Sequence[Any], values: Sequence[Any], descending: bool = False) -> Any:
+    """
+    Condition for rows that sort after `values` in the order of `columns`
+    """
+    after = None
+    # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), built from the right
+    for column, value in reversed(list(zip(columns, values))):
+        beyond = column < value if descending else column > value
+        after = beyond if after is None else or_(beyond, and_(column == value, after))
+    return after
+
+
+def keyset_page(
+    query: Union[Query, Select],
+    columns: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+    skip: int = 0
+) -> Union[Query, Select]:
+    """
+    Order a query or select() by `columns` (the last one unique, normally
+    id) and continue after the row the cursor was taken from. Each page is
+    an index range scan on a composite index over the same columns, however
+    deep it is. Without a cursor, `skip` keeps the legacy OFFSET paging.
+    """
+    if cursor is not None:
+        query = query.filter(keyset_after(columns, decode_cursor(cursor, columns), descending))
+
+    query = query.order_by(*[column.desc() if descending else column for column in columns])
+    if cursor is None and skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def next_cursor(items: Sequence[Any], columns: Sequence[Any], limit: int) -> Optional[str]:
+    """
+    Cursor of the page after `items`, or None when the page was not full
+    """
+    if not items or len(items) < limit:
+        return None
+    return encode_cursor([getattr(items[-1], column.key) for column in columns])
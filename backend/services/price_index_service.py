@@ -0,0 +1,300 @@
+# backend/services/price_index_service.py
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import math
+import time
+import numpy as np
+import models
+import geohash
+from categories import CONDITIONS, RENOVATION_STATUSES
+from services.outbox_service import outbox_dispatcher, PROPERTY
+
+DISTRICT_PRECISION = 5  # Geohash cells of roughly 5 x 5 km
+ALL_DISTRICTS = "*"  # Property-type-wide segment used as a fallback
+INDEX_RELOAD_SECONDS = 300
+
+HEDONIC_FEATURES = ("log_area", "floor_ratio", "condition", "renovation")
+
+
+def period_of(moment: datetime) -> str:
+    """
+    Index period (calendar month) of a timestamp
+    """
+    return moment.strftime("%Y-%m")
+
+
+def district_of(location: Any) -> Optional[str]:
+    """
+    District key (coarse geohash cell) of a location dict or schema
+    """
+    if not location:
+        return None
+    if isinstance(location, dict):
+        lat, lng = location.get("lat"), location.get("lng")
+    else:
+        lat, lng = location.lat, location.lng
+    if lat is None or lng is None:
+        return None
+    return geohash.encode(lat, lng, DISTRICT_PRECISION)
+
+
+class _SegmentState:
+    """
+    Normal equations of a time-dummy hedonic regression:
+
+        log(price) = b . features + sum_t delta_t * D_t
+
+    Columns are the hedonic features followed by one dummy per period, so a
+    new period only appends a zero row/column and earlier sums stay valid.
+    """
+
+    def __init__(
+        self,
+        periods: Optional[List[str]] = None,
+        xtx: Optional[List[List[float]]] = None,
+        xty: Optional[List[float]] = None,
+        observations: int = 0
+    ):
+        size = len(HEDONIC_FEATURES) + len(periods or [])
+        self.periods = list(periods or [])
+        self.xtx = np.array(xtx, dtype=float) if xtx else np.zeros((size, size))
+        self.xty = np.array(xty, dtype=float) if xty else np.zeros(size)
+        self.observations = observations
+
+    def _period_column(self, period: str) -> int:
+        if period not in self.periods:
+            self.periods.append(period)
+            self.xtx = np.pad(self.xtx, ((0, 1), (0, 1)))
+            self.xty = np.pad(self.xty, (0, 1))
+        return len(HEDONIC_FEATURES) + self.periods.index(period)
+
+    def fold(self, features: np.ndarray, periods: List[str], log_prices: np.ndarray) -> None:
+        """
+        Add a batch of observations to X'X and X'y
+        """
+        columns = np.array([self._period_column(p) for p in periods])
+        design = np.zeros((len(periods), self.xtx.shape[0]))
+        design[:, :len(HEDONIC_FEATURES)] = features
+        design[np.arange(len(periods)), columns] = 1.0
+
+        self.xtx += design.T @ design
+        self.xty += design.T @ log_prices
+        self.observations += len(periods)
+
+    def solve(self) -> Dict[str, float]:
+        """
+        Least-squares fit; returns the index per period relative to the first
+        """
+        if not self.periods:
+            return {}
+        beta = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        deltas = beta[len(HEDONIC_FEATURES):]
+        base = deltas[0]
+        return {
+            period: float(math.exp(delta - base))
+            for period, delta in zip(self.periods, deltas)
+        }
+
+
+class PriceIndexService:
+    """
+    Time-adjusted price index per (property_type, district).
+
+    Each segment keeps the normal equations of its hedonic regression in
+    `price_index_segments`, so new listings are folded in and re-solved
+    without rescanning the table. Listing date (created_at) stands in for
+    the sale date. Index ratios are cached in memory for O(1) lookups from
+    the valuation engine.
+
+    New listings are folded in by the "price_index" change feed subscriber
+    (see the bottom of this module) by the ids of their created events, so
+    a listing that commits after a later id is not skipped. `update` and
+    `refit` scan the table past the `last_property_id` watermark instead;
+    the feed leaves listings at or below it to them.
+    """
+
+    def __init__(self):
+        self._index: Dict[Tuple[str, str], Dict[str, float]] = {}
+        self._loaded_at: Optional[float] = None
+
+    def _features(self, area, floor_level, total_floors, condition, renovation_status) -> List[float]:
+        return [
+            math.log(area),
+            floor_level / total_floors if total_floors else 0.0,
+            CONDITIONS.score(condition),
+            RENOVATION_STATUSES.score(renovation_status)
+        ]
+
+    def update(self, db: Session, chunk_size: int = 5000) -> int:
+        """
+        Fold properties added since the last run into the index, refit the
+        touched segments and commit. Returns the number of rows folded.
+        """
+        folded = self.fold(db, chunk_size=chunk_size)
+        db.commit()
+        self.load(db)
+        return folded
+
+    def fold(self, db: Session, ids: Optional[List[int]] = None, chunk_size: int = 5000) -> int:
+        """
+        update() without the commit, for callers that own the transaction.
+        With `ids` only those listings are folded and the watermark stays.
+        """
+        watermark = db.query(func.max(models.PriceIndexSegment.last_property_id)).scalar() or 0
+
+        query = db.query(
+            models.Property.id,
+            models.Property.property_type,
+            models.Property.area,
+            models.Property.floor_level,
+            models.Property.total_floors,
+            models.Property.condition,
+            models.Property.renovation_status,
+            models.Property.location,
+            models.Property.price,
+            models.Property.created_at
+        ).filter(models.Property.id > watermark)\
+            .filter(models.Property.is_quarantined.isnot(True))\
+            .order_by(models.Property.id)
+        if ids is not None:
+            query = query.filter(models.Property.id.in_(ids))
+
+        states: Dict[Tuple[str, str], _SegmentState] = {}
+        buffers: Dict[Tuple[str, str], List[Tuple[List[float], str, float]]] = {}
+        folded = 0
+        last_id = watermark
+
+        def flush(key):
+            rows = buffers.pop(key, [])
+            if not rows:
+                return
+            if key not in states:
+                states[key] = self._load_state(db, key)
+            states[key].fold(
+                np.array([r[0] for r in rows]),
+                [r[1] for r in rows],
+                np.array([r[2] for r in rows])
+            )
+
+        for row in query.yield_per(chunk_size):
+            if ids is None:
+                last_id = row.id
+            if not row.price or not row.area or row.price <= 0 or row.area <= 0 or not row.created_at:
+                continue
+            observation = (
+                self._features(row.area, row.floor_level, row.total_floors, row.condition, row.renovation_status),
+                period_of(row.created_at),
+                math.log(row.price)
+            )
+            keys = [(row.property_type, ALL_DISTRICTS)]
+            district = district_of(row.location)
+            if district:
+                keys.append((row.property_type, district))
+            for key in keys:
+                buffers.setdefault(key, []).append(observation)
+                if len(buffers[key]) >= chunk_size:
+                    flush(key)
+            folded += 1
+
+        for key in list(buffers):
+            flush(key)
+
+        for key, state in states.items():
+            self._save_state(db, key, state, last_id)
+        return folded
+
+    def refit(self, db: Session, chunk_size: int = 5000) -> int:
+        """
+        Drop all segments and rebuild the index from scratch. A listing
+        that commits after the scan with an id below the new watermark is
+        left out until the next refit, so run it while writes are quiet.
+        """
+        db.query(models.PriceIndexSegment).delete(synchronize_session=False)
+        db.commit()
+        return self.update(db, chunk_size=chunk_size)
+
+    def _load_state(self, db: Session, key: Tuple[str, str]) -> _SegmentState:
+        row = self._segment_row(db, key)
+        if row is None:
+            return _SegmentState()
+        return _SegmentState(row.periods, row.xtx, row.xty, row.observations)
+
+    def _segment_row(self, db: Session, key: Tuple[str, str]) -> Optional[models.PriceIndexSegment]:
+        property_type, district = key
+        return db.query(models.PriceIndexSegment)\
+            .filter(models.PriceIndexSegment.property_type == property_type)\
+            .filter(models.PriceIndexSegment.district == district)\
+            .first()
+
+    def _save_state(self, db: Session, key: Tuple[str, str], state: _SegmentState, last_id: int) -> None:
+        row = self._segment_row(db, key)
+        if row is None:
+            row = models.PriceIndexSegment(property_type=key[0], district=key[1])
+            db.add(row)
+        row.periods = list(state.periods)
+        row.xtx = state.xtx.tolist()
+        row.xty = state.xty.tolist()
+        row.observations = state.observations
+        row.index_values = state.solve()
+        row.last_property_id = last_id
+
+    def load(self, db: Session) -> None:
+        """
+        Load fitted index values into memory
+        """
+        rows = db.query(
+            models.PriceIndexSegment.property_type,
+            models.PriceIndexSegment.district,
+            models.PriceIndexSegment.index_values
+        ).all()
+        self._index = {(t, d): values or {} for t, d, values in rows}
+        self._loaded_at = time.monotonic()
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > INDEX_RELOAD_SECONDS:
+            self.load(db)
+
+    def get_index(self, property_type: str, district: str = ALL_DISTRICTS) -> Dict[str, float]:
+        """
+        Fitted index values of a segment, by period
+        """
+        return dict(self._index.get((property_type, district), {}))
+
+    def index_ratio(
+        self,
+        property_type: str,
+        district: Optional[str],
+        from_period: str,
+        to_period: Optional[str] = None
+    ) -> float:
+        """
+        Price level at to_period relative to from_period (latest period when
+        to_period is None). Falls back from the district to the whole
+        property type, and to 1.0 when neither segment covers both periods.
+        """
+        for key in ((property_type, district), (property_type, ALL_DISTRICTS)):
+            values = self._index.get(key)
+            if not values:
+                continue
+            target = to_period or max(values)
+            if from_period in values and target in values:
+                return values[target] / values[from_period]
+        return 1.0
+
+price_index_service = PriceIndexService()
+
+
+def _fold_new_listings(db: Session, events: List[models.OutboxEvent]) -> None:
+    created = [e.aggregate_id for e in events if e.event_type == "created"]
+    if created:
+        price_index_service.fold(db, ids=created)
+        price_index_service.load(db)
+
+
+# Created, bulk-created and imported listings reach the index through the
+# change feed. The subscriber is durable: one worker at a time folds them,
+# and the segments commit together with its checkpoint, so each created
+# event is folded exactly once.
+outbox_dispatcher.subscribe("price_index", _fold_new_listings, aggregates=[PROPERTY])
@@ -0,0 +1,244 @@
+# backend/services/property_cache.py
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import Any, Dict, Iterable, List, Optional
+import asyncio
+import logging
+import threading
+import models
+import schemas
+from config import settings
+from database import READ_REPLICA
+from services.cache import TTLCache
+from services.outbox_service import outbox_dispatcher, PROPERTY
+
+try:
+    import redis
+except ImportError:  # The shared cache backend is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Ids per IN query when filling misses
+CACHE_FILL_CHUNK_SIZE = 1000
+
+
+class LocalBackend:
+    """
+    Process-local LRU with TTL
+    """
+    name = "local"
+    blocking = False
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    def get_many(self, ids: List[int]) -> Dict[int, schemas.PropertyRecord]:
+        found = {}
+        for property_id in ids:
+            record = self.cache.get(property_id)
+            if record is not None:
+                found[property_id] = record
+        return found
+
+    def set_many(self, records: Dict[int, schemas.PropertyRecord]) -> None:
+        for property_id, record in records.items():
+            self.cache.set(property_id, record)
+
+    def delete_many(self, ids: Iterable[int]) -> None:
+        for property_id in ids:
+            self.cache.delete(property_id)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class RedisBackend:
+    """
+    Shared cache in Redis, one JSON value per property with a TTL. Redis
+    errors are logged and treated as misses, so the database stays the
+    fallback.
+    """
+    name = "redis"
+    blocking = True
+    prefix = "property:"
+
+    def __init__(self, ttl: int, client=None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("PROPERTY_CACHE_BACKEND=redis requires the redis package")
+            client = redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD,
+                socket_timeout=0.5
+            )
+        self.client = client
+        self.ttl = ttl
+
+    def get_many(self, ids: List[int]) -> Dict[int, schemas.PropertyRecord]:
+        try:
+            values = self.client.mget([f"{self.prefix}{property_id}" for property_id in ids])
+        except Exception as e:
+            logger.warning("Property cache read failed: %s", e)
+            return {}
+        return {
+            property_id: schemas.PropertyRecord.model_validate_json(value)
+            for property_id, value in zip(ids, values) if value is not None
+        }
+
+    def set_many(self, records: Dict[int, schemas.PropertyRecord]) -> None:
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for property_id, record in records.items():
+                pipeline.setex(f"{self.prefix}{property_id}", self.ttl, record.model_dump_json())
+            pipeline.execute()
+        except Exception as e:
+            logger.warning("Property cache write failed: %s", e)
+
+    def delete_many(self, ids: Iterable[int]) -> None:
+        keys = [f"{self.prefix}{property_id}" for property_id in ids]
+        if not keys:
+            return
+        try:
+            self.client.delete(*keys)
+        except Exception as e:
+            logger.warning("Property cache invalidation failed: %s", e)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(f"{self.prefix}*", count=1000))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            logger.warning("Property cache clear failed: %s", e)
+
+
+class PropertyCache:
+    """
+    Read cache of property records for the paths that re-fetch the same hot
+    properties (property page, analytics, reports).
+
+    Writes go through PropertyService: created properties are written
+    through, updated and deleted ones invalidated, bulk changes and
+    re-clustering/re-screening invalidate or clear. Rows changed outside
+    the service are picked up when their entry expires.
+
+    Misses read on a replica session are returned but not cached: a
+    lagging replica would otherwise put back a row the invalidation just
+    removed. Users inside the read-your-writes window read the primary,
+    so their misses fill the cache with their own writes.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or self._default_backend()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _default_backend(self):
+        if settings.PROPERTY_CACHE_BACKEND == "redis":
+            return RedisBackend(ttl=settings.PROPERTY_CACHE_TTL_SECONDS)
+        return LocalBackend(
+            max_entries=settings.PROPERTY_CACHE_MAX_ENTRIES,
+            ttl=settings.PROPERTY_CACHE_TTL_SECONDS
+        )
+
+    def _count(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def _records(self, properties: Iterable[models.Property]) -> Dict[int, schemas.PropertyRecord]:
+        return {p.id: schemas.PropertyRecord.model_validate(p) for p in properties}
+
+    def get(self, db: Session, property_id: int) -> Optional[schemas.PropertyRecord]:
+        return self.get_many(db, [property_id]).get(property_id)
+
+    def get_many(self, db: Session, ids: Iterable[int]) -> Dict[int, schemas.PropertyRecord]:
+        """
+        Records of the existing properties among `ids`, in the order given;
+        misses are loaded with one IN query (per CACHE_FILL_CHUNK_SIZE ids)
+        """
+        ids = list(dict.fromkeys(ids))
+        found = self.backend.get_many(ids)
+        missing = [property_id for property_id in ids if property_id not in found]
+        self._count(len(found), len(missing))
+        for start in range(0, len(missing), CACHE_FILL_CHUNK_SIZE):
+            chunk = missing[start:start + CACHE_FILL_CHUNK_SIZE]
+            records = self._records(
+                db.query(models.Property)
+                .options(selectinload(models.Property.features))
+                .filter(models.Property.id.in_(chunk))
+            )
+            if not db.info.get(READ_REPLICA):
+                self.backend.set_many(records)
+            found.update(records)
+        return {property_id: found[property_id] for property_id in ids if property_id in found}
+
+    async def get_async(self, db: AsyncSession, property_id: int) -> Optional[schemas.PropertyRecord]:
+        return (await self.get_many_async(db, [property_id])).get(property_id)
+
+    async def get_many_async(self, db: AsyncSession, ids: Iterable[int]) -> Dict[int, schemas.PropertyRecord]:
+        """
+        get_many() on an async session; a network backend is called from a
+        worker thread
+        """
+        ids = list(dict.fromkeys(ids))
+        found = await self._call(self.backend.get_many, ids)
+        missing = [property_id for property_id in ids if property_id not in found]
+        self._count(len(found), len(missing))
+        for start in range(0, len(missing), CACHE_FILL_CHUNK_SIZE):
+            chunk = missing[start:start + CACHE_FILL_CHUNK_SIZE]
+            result = await db.execute(
+                select(models.Property)
+                .options(selectinload(models.Property.features))
+                .where(models.Property.id.in_(chunk))
+            )
+            records = self._records(result.scalars())
+            if not db.info.get(READ_REPLICA):
+                await self._call(self.backend.set_many, records)
+            found.update(records)
+        return {property_id: found[property_id] for property_id in ids if property_id in found}
+
+    async def _call(self, method, *args) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    def put(self, properties: Iterable[models.Property]) -> None:
+        """
+        Write-through of freshly committed properties
+        """
+        self.backend.set_many(self._records(properties))
+
+    def invalidate(self, ids: Iterable[int]) -> None:
+        self.backend.delete_many(list(ids))
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+property_cache = PropertyCache()
+
+
+def _invalidate_changed(db: Session, events: List[models.OutboxEvent]) -> None:
+    property_cache.invalidate({e.aggregate_id for e in events})
+
+
+# Writes made by other workers reach a process-local cache through the
+# change feed; a shared backend is invalidated by the writer itself
+if property_cache.backend.name == "local":
+    outbox_dispatcher.subscribe("property_cache", _invalidate_changed, aggregates=[PROPERTY], durable=False)
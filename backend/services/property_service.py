@@ -1,9 +1,54 @@
 # backend/services/property_service.py
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from models import Property
-from schemas import PropertyCreate, PropertyUpdate
+from typing import Any, Dict, List, Optional, Tuple, Union
+from sqlalchemy.orm import Query, Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, insert, or_, select, Select
+from datetime import datetime, timedelta
+import operator
+import re
+from categories import CONDITIONS, RENOVATION_STATUSES
+from models import Property, PropertyFeature, PropertyTombstone, ValuationHistory
+from schemas import PropertyCreate, PropertyUpdate, PropertyBulkUpdate
+import schemas
 from fastapi import HTTPException, status
+from config import settings
+from services.sketch_service import sketch_service
+from services.heatmap_service import heatmap_service
+from services.clustering_service import clustering_service
+from services.screening_service import screening_service
+from services.pagination import decode_cursor, encode_cursor, keyset_after, keyset_page
+from services.serialization import construct_rows, schema_columns
+from services.property_cache import property_cache
+from services.outbox_service import outbox_service, PROPERTY
+
+MAX_BULK_ITEMS = 5000
+BULK_ID_CHUNK_SIZE = 500
+
+# Keyset order of property listings
+PROPERTY_PAGE_KEY = (Property.id,)
+
+# Delta sync walks: changed rows on ix_properties_updated_at_id, deletes on
+# ix_property_tombstones_deleted_at_property_id; a sync token holds both positions
+PROPERTY_SYNC_KEY = (Property.updated_at, Property.id)
+TOMBSTONE_SYNC_KEY = (PropertyTombstone.deleted_at, PropertyTombstone.property_id)
+SYNC_TOKEN_COLUMNS = PROPERTY_SYNC_KEY + TOMBSTONE_SYNC_KEY
+
+# Features of listed properties load with one IN query per page
+WITH_FEATURES = selectinload(Property.features)
+
+# Response columns read as plain rows by the listing fast path
+PROPERTY_ROW_COLUMNS = schema_columns(Property, schemas.Property, exclude=("features",))
+FEATURE_ROW_COLUMNS = schema_columns(PropertyFeature, schemas.PropertyFeature)
+
+# Feature filters: "parking>=1", "ceiling_height>2.7", or a bare name for presence
+FEATURE_FILTER_PATTERN = re.compile(r"^\s*([\w.-]+)\s*(?:(>=|<=|=|>|<)\s*(-?\d+(?:\.\d+)?))?\s*$")
+FEATURE_OPERATORS = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "=": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt
+}
 
 class PropertyService:
     @staticmethod
@@ -11,7 +56,8 @@ class PropertyService:
         # Convert Pydantic model to dict and handle nested objects
         property_dict = property_data.model_dump()
         
-        # Handle location separately as JSON
+        # Handle location separately as JSON; feature dicts become
+        # property_features rows
         location_data = property_dict.pop('location', None)
         features_data = property_dict.pop('features', [])
         
@@ -22,8 +68,15 @@ class PropertyService:
         )
         
         db.add(db_property)
+        screening_service.screen_property(db, db_property)
+        clustering_service.assign_property(db, db_property)
+        sketch_service.record_property(db, db_property)
+        heatmap_service.add_property(db, db_property)
+        db.flush()
+        outbox_service.record(db, PROPERTY, "created", [db_property.id])
         db.commit()
         db.refresh(db_property)
+        property_cache.put([db_property])
         return db_property
 
     @staticmethod
@@ -37,18 +90,225 @@ class PropertyService:
         limit: int = 100,
         property_type: Optional[str] = None,
         min_price: Optional[float] = None,
-        max_price: Optional[float] = None
+        max_price: Optional[float] = None,
+        cursor: Optional[str] = None,
+        **filters
     ) -> List[Property]:
-        query = db.query(Property)
-        
+        query = PropertyService.filter_properties(
+            db.query(Property).options(WITH_FEATURES),
+            property_type=property_type,
+            min_price=min_price,
+            max_price=max_price,
+            **filters
+        )
+        return keyset_page(query, PROPERTY_PAGE_KEY, limit, cursor=cursor, skip=skip).all()
+
+    @staticmethod
+    async def get_property_async(db: AsyncSession, property_id: int) -> Optional[Property]:
+        return await db.get(Property, property_id, options=[WITH_FEATURES])
+
+    @staticmethod
+    async def get_properties_async(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        **filters
+    ) -> List[Property]:
+        statement = PropertyService.filter_properties(select(Property).options(WITH_FEATURES), **filters)
+        result = await db.execute(keyset_page(statement, PROPERTY_PAGE_KEY, limit, cursor=cursor, skip=skip))
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_property_rows_async(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        **filters
+    ) -> List[schemas.Property]:
+        """
+        Listing page as response models built from rows: no ORM entities,
+        no validation. Same filters and order as get_properties_async().
+        """
+        statement = PropertyService.filter_properties(select(*PROPERTY_ROW_COLUMNS), **filters)
+        rows = (await db.execute(keyset_page(statement, PROPERTY_PAGE_KEY, limit, cursor=cursor, skip=skip))).all()
+        return await PropertyService._construct_property_rows_async(db, rows)
+
+    @staticmethod
+    async def _construct_property_rows_async(db: AsyncSession, rows: List[Any]) -> List[schemas.Property]:
+        """
+        Response models for PROPERTY_ROW_COLUMNS rows, features loaded with
+        one IN query
+        """
+        features: Dict[int, List[schemas.PropertyFeature]] = {row.id: [] for row in rows}
+        if features:
+            result = await db.execute(
+                select(PropertyFeature.property_id, *FEATURE_ROW_COLUMNS)
+                .where(PropertyFeature.property_id.in_(list(features)))
+                .order_by(PropertyFeature.property_id, PropertyFeature.id)
+            )
+            for property_id, *values in result:
+                features[property_id].append(
+                    schemas.PropertyFeature.model_construct(**dict(zip(schemas.PropertyFeature.model_fields, values)))
+                )
+
+        return construct_rows(
+            schemas.Property,
+            rows,
+            location=lambda values: schemas.Location.model_construct(**values["location"]) if values["location"] else None,
+            features=lambda values: features[values["id"]]
+        )
+
+    @staticmethod
+    async def get_property_changes_async(
+        db: AsyncSession,
+        token: Optional[str] = None,
+        limit: int = 1000
+    ) -> Tuple[List[schemas.Property], List[int], str, bool]:
+        """
+        Properties created or updated and ids deleted since a sync token
+        (everything when there is none), up to `limit` of each. Returns them
+        with the next token and whether more changes are waiting. Changes
+        from the last SYNC_SETTLE_SECONDS are left for the next call, so a
+        transaction that commits late is not skipped.
+        """
+        now = datetime.utcnow()
+        until = now - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        if token is None:
+            # A first sync has nothing to delete
+            updated_after, deleted_after = None, [until, 0]
+        else:
+            values = decode_cursor(token, SYNC_TOKEN_COLUMNS)
+            updated_after, deleted_after = values[:2], values[2:]
+            if deleted_after[0] is None or updated_after[0] is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid sync token"
+                )
+            if deleted_after[0] < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="Sync token expired, start a full sync"
+                )
+
+        statement = select(*PROPERTY_ROW_COLUMNS).where(Property.updated_at <= until)
+        if updated_after is not None:
+            statement = statement.where(keyset_after(PROPERTY_SYNC_KEY, updated_after))
+        rows = (await db.execute(statement.order_by(*PROPERTY_SYNC_KEY).limit(limit))).all()
+        tombstones = (await db.execute(
+            select(*TOMBSTONE_SYNC_KEY)
+            .where(PropertyTombstone.deleted_at <= until)
+            .where(keyset_after(TOMBSTONE_SYNC_KEY, deleted_after))
+            .order_by(*TOMBSTONE_SYNC_KEY)
+            .limit(limit)
+        )).all()
+
+        def position(last: Optional[Tuple[datetime, int]], full: bool) -> List[Any]:
+            # A short page covered everything up to `until`
+            if full or (last is not None and last[0] == until):
+                return list(last)
+            return [until, 0]
+
+        has_more = len(rows) == limit or len(tombstones) == limit
+        next_token = encode_cursor(
+            position((rows[-1].updated_at, rows[-1].id) if rows else None, len(rows) == limit)
+            + position(tuple(tombstones[-1]) if tombstones else None, len(tombstones) == limit)
+        )
+        upserts = await PropertyService._construct_property_rows_async(db, rows)
+        return upserts, [t.property_id for t in tombstones], next_token, has_more
+
+    @staticmethod
+    def record_tombstones(db: Session, ids: List[int]) -> None:
+        """
+        Tombstones for deleted properties, in the deleting transaction;
+        ones past SYNC_TOMBSTONE_RETENTION_DAYS are dropped on the way
+        """
+        if not ids:
+            return
+        now = datetime.utcnow()
+        expired = PropertyTombstone.deleted_at < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        for start in range(0, len(ids), BULK_ID_CHUNK_SIZE):
+            chunk = ids[start:start + BULK_ID_CHUNK_SIZE]
+            # Ids can come back on SQLite, and with them an earlier tombstone
+            db.query(PropertyTombstone)\
+                .filter(or_(expired, PropertyTombstone.property_id.in_(chunk)))\
+                .delete(synchronize_session=False)
+            db.execute(insert(PropertyTombstone), [{"property_id": i, "deleted_at": now} for i in chunk])
+
+    @staticmethod
+    def filter_properties(
+        query: Union[Query, Select],
+        property_type: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_area: Optional[float] = None,
+        max_area: Optional[float] = None,
+        min_floor: Optional[int] = None,
+        max_floor: Optional[int] = None,
+        condition: Optional[List[str]] = None,
+        renovation_status: Optional[List[str]] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        updated_from: Optional[datetime] = None,
+        updated_to: Optional[datetime] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        feature: Optional[List[str]] = None
+    ) -> Union[Query, Select]:
+        """
+        Apply listing filters to a Query or select(); ranges are inclusive
+        and bbox is (min_lat, min_lng, max_lat, max_lng). Categories are
+        matched by their codes; unknown values raise 400. Each `feature`
+        expression ("parking>=1", or a bare name) must hold for some
+        feature of the property.
+        """
         if property_type:
             query = query.filter(Property.property_type == property_type)
-        if min_price:
-            query = query.filter(Property.price >= min_price)
-        if max_price:
-            query = query.filter(Property.price <= max_price)
-            
-        return query.offset(skip).limit(limit).all()
+
+        ranges = (
+            (Property.price, min_price, max_price),
+            (Property.area, min_area, max_area),
+            (Property.floor_level, min_floor, max_floor),
+            (Property.created_at, created_from, created_to),
+            (Property.updated_at, updated_from, updated_to)
+        )
+        for column, low, high in ranges:
+            if low is not None:
+                query = query.filter(column >= low)
+            if high is not None:
+                query = query.filter(column <= high)
+
+        for column, registry, values in (
+            (Property.condition_code, CONDITIONS, condition),
+            (Property.renovation_code, RENOVATION_STATUSES, renovation_status)
+        ):
+            if values:
+                try:
+                    codes = {registry.code(registry.normalize(value)) for value in values}
+                except ValueError as e:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+                query = query.filter(column.in_(sorted(codes)))
+
+        if bbox is not None:
+            min_lat, min_lng, max_lat, max_lng = bbox
+            query = query\
+                .filter(Property.latitude.between(min_lat, max_lat))\
+                .filter(Property.longitude.between(min_lng, max_lng))
+
+        for expression in feature or ():
+            match = FEATURE_FILTER_PATTERN.match(expression)
+            if match is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Invalid feature filter: {expression!r}"
+                )
+            name, op, value = match.groups()
+            condition = PropertyFeature.name == name
+            if op is not None:
+                condition = and_(condition, FEATURE_OPERATORS[op](PropertyFeature.value, float(value)))
+            # Semi-join driven by ix_property_features_name_value
+            query = query.filter(Property.id.in_(select(PropertyFeature.property_id).where(condition)))
+        return query
 
     @staticmethod
     def update_property(
@@ -63,10 +323,12 @@ class PropertyService:
                 detail="Property not found"
             )
         
+        tile_snapshot = heatmap_service.snapshot(db_property)
+
         # Convert to dict and exclude unset values
         update_data = property_data.model_dump(exclude_unset=True)
         
-        # Handle nested objects
+        # Handle nested objects; replaced features are deleted as orphans
         if 'location' in update_data:
             db_property.location = update_data['location']
         if 'features' in update_data:
@@ -76,9 +338,20 @@ class PropertyService:
         for key, value in update_data.items():
             if key not in ['location', 'features'] and hasattr(db_property, key):
                 setattr(db_property, key, value)
-            
+
+        was_quarantined = db_property.is_quarantined
+        screening_service.screen_property(db, db_property, fold=False)
+        clustering_service.assign_property(db, db_property)
+        if was_quarantined and not db_property.is_quarantined:
+            # Left out of the rollups while quarantined
+            sketch_service.record_property(db, db_property)
+        heatmap_service.update_property(db, tile_snapshot, db_property)
+        outbox_service.record(db, PROPERTY, "updated", [property_id], fields=update_data)
         db.commit()
         db.refresh(db_property)
+        # Invalidated rather than written through: a put from an update that
+        # committed earlier could land last and keep the older row
+        property_cache.invalidate([property_id])
         return db_property
 
     @staticmethod
@@ -90,10 +363,168 @@ class PropertyService:
                 detail="Property not found"
             )
             
+        heatmap_service.remove_property(db, db_property)
         db.delete(db_property)
+        PropertyService.record_tombstones(db, [property_id])
+        outbox_service.record(db, PROPERTY, "deleted", [property_id])
         db.commit()
+        property_cache.invalidate([property_id])
         return True
 
+    @staticmethod
+    def _load_by_ids(db: Session, ids: List[int]) -> Dict[int, Property]:
+        found: Dict[int, Property] = {}
+        for start in range(0, len(ids), BULK_ID_CHUNK_SIZE):
+            chunk = ids[start:start + BULK_ID_CHUNK_SIZE]
+            found.update(
+                (p.id, p) for p in db.query(Property).options(WITH_FEATURES).filter(Property.id.in_(chunk))
+            )
+        return found
+
+    @staticmethod
+    def bulk_apply(
+        db: Session,
+        create: List[PropertyCreate] = (),
+        update: List[PropertyBulkUpdate] = (),
+        delete: List[int] = (),
+        atomic: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Apply creates, partial updates and deletes in one transaction.
+
+        Rows are loaded with one IN query per chunk of ids and written by
+        batched flushes; screening, submarkets, rollups and heatmap tiles
+        are maintained once for the whole batch. Ids that are missing or
+        repeated in the batch are reported per item; with atomic=True any
+        such failure rolls the whole batch back.
+        """
+        if len(create) + len(update) + len(delete) > MAX_BULK_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Too many items in one batch (limit {MAX_BULK_ITEMS})"
+            )
+
+        results: List[Dict[str, Any]] = []
+        seen = set()
+
+        def reject(operation: str, index: int, property_id: int, error: str) -> None:
+            results.append({
+                "operation": operation, "index": index, "id": property_id,
+                "status": "failed", "error": error
+            })
+
+        existing = PropertyService._load_by_ids(
+            db, list({item.id for item in update} | set(delete))
+        )
+
+        # Updates
+        updated: List[Tuple[int, Property, Optional[Tuple[str, float]]]] = []
+        updated_fields: Dict[Tuple[str, ...], List[int]] = {}
+        tile_removed, tile_added = [], []
+        for index, item in enumerate(update):
+            db_property = existing.get(item.id)
+            if db_property is None:
+                reject("update", index, item.id, "Property not found")
+                continue
+            if item.id in seen:
+                reject("update", index, item.id, "Property appears more than once in the batch")
+                continue
+            seen.add(item.id)
+
+            before = heatmap_service.snapshot(db_property)
+            changes = item.model_dump(exclude_unset=True, exclude={"id"})
+            for key, value in changes.items():
+                setattr(db_property, key, value)
+            updated.append((index, db_property, before))
+            updated_fields.setdefault(tuple(sorted(changes)), []).append(item.id)
+
+        # Deletes
+        deleted: List[Tuple[int, int]] = []
+        for index, property_id in enumerate(delete):
+            db_property = existing.get(property_id)
+            if db_property is None:
+                reject("delete", index, property_id, "Property not found")
+                continue
+            if property_id in seen:
+                reject("delete", index, property_id, "Property appears more than once in the batch")
+                continue
+            seen.add(property_id)
+            tile_removed.append(heatmap_service.snapshot(db_property))
+            deleted.append((index, property_id))
+
+        if atomic and results:
+            db.rollback()
+            return PropertyService._bulk_summary(results, committed=False)
+
+        created = [(index, Property(**item.model_dump())) for index, item in enumerate(create)]
+        changed = [p for _, p, _ in updated]
+        new = [p for _, p in created]
+        quarantined = {p.id for p in changed if p.is_quarantined}
+        screening_service.screen_properties(db, changed, fold=False)
+        screening_service.screen_properties(db, new)
+        clustering_service.assign_properties(db, changed + new)
+        released = [p for p in changed if p.id in quarantined and not p.is_quarantined]
+
+        for _, db_property, before in updated:
+            after = heatmap_service.snapshot(db_property)
+            if before != after:
+                tile_removed.append(before)
+                tile_added.append(after)
+        tile_added.extend(heatmap_service.snapshot(p) for p in new)
+
+        deleted_ids = [property_id for _, property_id in deleted]
+        for start in range(0, len(deleted_ids), BULK_ID_CHUNK_SIZE):
+            chunk = deleted_ids[start:start + BULK_ID_CHUNK_SIZE]
+            # Same as the ORM delete cascade: history rows are kept,
+            # unlinked, and features go with their property
+            db.query(ValuationHistory)\
+                .filter(ValuationHistory.property_id.in_(chunk))\
+                .update({"property_id": None}, synchronize_session=False)
+            db.query(PropertyFeature)\
+                .filter(PropertyFeature.property_id.in_(chunk))\
+                .delete(synchronize_session=False)
+            db.query(Property)\
+                .filter(Property.id.in_(chunk))\
+                .delete(synchronize_session=False)
+        for property_id in deleted_ids:
+            db.expunge(existing[property_id])
+
+        db.add_all(new)
+        db.flush()
+
+        sketch_service.record_properties(db, new + released)
+        heatmap_service.apply(db, added=tile_added, removed=tile_removed)
+        outbox_service.record(db, PROPERTY, "created", [p.id for p in new])
+        for fields, ids in updated_fields.items():
+            outbox_service.record(db, PROPERTY, "updated", ids, fields=fields)
+        outbox_service.record(db, PROPERTY, "deleted", deleted_ids)
+        PropertyService.record_tombstones(db, deleted_ids)
+        db.commit()
+        property_cache.invalidate([p.id for p in changed] + deleted_ids)
+
+        results.extend(
+            {"operation": "create", "index": index, "id": p.id, "status": "created"}
+            for index, p in created
+        )
+        results.extend(
+            {"operation": "update", "index": index, "id": p.id, "status": "updated"}
+            for index, p, _ in updated
+        )
+        results.extend(
+            {"operation": "delete", "index": index, "id": property_id, "status": "deleted"}
+            for index, property_id in deleted
+        )
+        return PropertyService._bulk_summary(results, committed=True)
+
+    @staticmethod
+    def _bulk_summary(results: List[Dict[str, Any]], committed: bool) -> Dict[str, Any]:
+        order = {"create": 0, "update": 1, "delete": 2}
+        results.sort(key=lambda r: (order[r["operation"]], r["index"]))
+        counts = {status: 0 for status in ("created", "updated", "deleted", "failed")}
+        for result in results:
+            counts[result["status"]] += 1
+        return {"committed": committed, **counts, "results": results}
+
     @staticmethod
     def search_properties(
         db: Session,
@@ -101,7 +532,7 @@ class PropertyService:
         skip: int = 0,
         limit: int = 100
     ) -> List[Property]:
-        return db.query(Property).filter(
+        return db.query(Property).options(WITH_FEATURES).filter(
             Property.address.ilike(f"%{query}%")
         ).offset(skip).limit(limit).all()
 
@@ -116,7 +547,7 @@ class PropertyService:
     ) -> List[Property]:
         # TODO: Implement geospatial search with PostGIS or similar
         # For now, return all properties
-        return db.query(Property).offset(skip).limit(limit).all()
+        return db.query(Property).options(WITH_FEATURES).offset(skip).limit(limit).all()
 
 # Create instance
 property_service = PropertyService()
\ No newline at end of file
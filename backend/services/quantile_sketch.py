@@ -0,0 +1,200 @@
+# backend/services/quantile_sketch.py
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import math
+import random
+import numpy as np
+
+# Capacity decay between compactor levels (from the KLL paper)
+_CAPACITY_DECAY = 2.0 / 3.0
+
+DEFAULT_K = 200
+
+# Normalized rank error for the default k at 99% confidence. The error
+# scales roughly as 1 / k, so doubling k halves it (and doubles the size).
+DEFAULT_RANK_ERROR = 0.0165
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch (Karnin, Lang, Liberty 2016).
+
+    Keeps a stack of compactors; level h holds items of weight 2^h. When the
+    sketch is full, the lowest overfull level is sorted and every other item
+    (random offset) is promoted to the level above. Memory stays around
+    3 * k floats regardless of the stream length.
+
+    Answers quantile queries with a normalized rank error of about 3.3 / k
+    (1.65% for the default k=200, at 99% confidence): the returned value's
+    true rank is within +-0.0165 * n of the requested rank.
+    Sketches with the same k can be merged without losing this bound, which
+    is what lets daily rollups be combined into arbitrary windows.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = None):
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.n = 0
+        self.min_value: Optional[float] = None
+        self.max_value: Optional[float] = None
+        self.compactors: List[List[float]] = [[]]
+        self._size = 0
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.compactors) - level - 1
+        return max(int(math.ceil(self.k * (_CAPACITY_DECAY ** depth))), 2)
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def update(self, value: float) -> None:
+        """
+        Add a single value to the sketch
+        """
+        value = float(value)
+        if math.isnan(value):
+            return
+        self.compactors[0].append(value)
+        self._size += 1
+        self.n += 1
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if self.max_value is None or value > self.max_value:
+            self.max_value = value
+        if self._size >= self._max_size():
+            self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """
+        Add many values at once (vectorized)
+        """
+        if not isinstance(values, np.ndarray):
+            values = list(values)
+        array = np.asarray(values, dtype=float)
+        array = array[~np.isnan(array)]
+        if array.size == 0:
+            return
+        self.compactors[0].extend(array.tolist())
+        self._size += int(array.size)
+        self.n += int(array.size)
+        low, high = float(array.min()), float(array.max())
+        self.min_value = low if self.min_value is None else min(self.min_value, low)
+        self.max_value = high if self.max_value is None else max(self.max_value, high)
+        while self._size >= self._max_size():
+            self._compress()
+
+    def _compress(self) -> None:
+        for level in range(len(self.compactors)):
+            if len(self.compactors[level]) < self._capacity(level):
+                continue
+            if level + 1 == len(self.compactors):
+                self.compactors.append([])
+
+            items = sorted(self.compactors[level])
+            keep = [items.pop()] if len(items) % 2 else []
+            offset = self._rng.randint(0, 1)
+            promoted = items[offset::2]
+            self.compactors[level + 1].extend(promoted)
+            self.compactors[level] = keep
+            self._size -= len(items) - len(promoted)
+            return
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Merge another sketch into this one (in place) and return self
+        """
+        if other.k != self.k:
+            raise ValueError("Only sketches with the same k can be merged")
+        if other.n == 0:
+            return self
+
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+            self._size += len(items)
+
+        self.n += other.n
+        if self.min_value is None or other.min_value < self.min_value:
+            self.min_value = other.min_value
+        if self.max_value is None or other.max_value > self.max_value:
+            self.max_value = other.max_value
+
+        while self._size >= self._max_size():
+            self._compress()
+        return self
+
+    def _weighted_items(self):
+        items = np.concatenate([np.asarray(c, dtype=float) for c in self.compactors])
+        weights = np.concatenate([
+            np.full(len(c), 2 ** level, dtype=float)
+            for level, c in enumerate(self.compactors)
+        ])
+        order = np.argsort(items, kind="mergesort")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        """
+        Approximate values at the given quantiles (each in [0, 1])
+        """
+        if self.n == 0:
+            return [None for _ in qs]
+
+        items, cumulative = self._weighted_items()
+        total = cumulative[-1]
+        result = []
+        for q in qs:
+            if not 0.0 <= q <= 1.0:
+                raise ValueError("Quantiles must be between 0 and 1")
+            if q == 0.0:
+                result.append(self.min_value)
+            elif q == 1.0:
+                result.append(self.max_value)
+            else:
+                index = int(np.searchsorted(cumulative, q * total, side="left"))
+                result.append(float(items[min(index, len(items) - 1)]))
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.quantiles([q])[0]
+
+    def rank(self, value: float) -> float:
+        """
+        Approximate fraction of the stream that is <= value
+        """
+        if self.n == 0:
+            return 0.0
+        items, cumulative = self._weighted_items()
+        index = int(np.searchsorted(items, value, side="right"))
+        if index == 0:
+            return 0.0
+        return float(cumulative[index - 1] / cumulative[-1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize to a JSON-friendly dict
+        """
+        return {
+            "k": self.k,
+            "n": self.n,
+            "min": self.min_value,
+            "max": self.max_value,
+            "levels": [list(c) for c in self.compactors]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], seed: Optional[int] = None) -> "KLLSketch":
+        """
+        Restore a sketch produced by to_dict
+        """
+        sketch = cls(k=data["k"], seed=seed)
+        sketch.n = data["n"]
+        sketch.min_value = data["min"]
+        sketch.max_value = data["max"]
+        sketch.compactors = [list(map(float, c)) for c in data["levels"]] or [[]]
+        sketch._size = sum(len(c) for c in sketch.compactors)
+        return sketch
@@ -0,0 +1,234 @@
+# backend/services/replica_router.py
+from fastapi import Depends, Request
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from jose import JWTError, jwt
+import itertools
+import logging
+import threading
+import time
+from config import settings
+from database import create_db_engine, get_async_db, get_db, get_session_factory, pool_stats, prewarm, READ_REPLICA
+from services.cache import TTLCache
+from services.user_service import SECRET_KEY, ALGORITHM
+
+logger = logging.getLogger(__name__)
+
+# Seconds a replica is behind its primary, per backend. On PostgreSQL a
+# standby that has replayed everything it received counts as current even
+# when the primary has been idle since the last replayed transaction.
+LAG_QUERIES = {
+    "postgresql": """
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END
+    """
+}
+# Backends without replication status (SQLite files) only prove they answer
+DEFAULT_LAG_QUERY = "SELECT 0"
+
+READ_ONLY_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class Replica:
+    """
+    One read replica: its engines, session factories and last health check
+    """
+
+    def __init__(self, url: str, **engine_options):
+        self.url = url
+        self.engine = create_db_engine(url, **engine_options)
+        self.async_engine = create_db_engine(url, async_=True, **engine_options)
+        self.session_factory = sessionmaker(
+            autocommit=False, autoflush=False, bind=self.engine, info={READ_REPLICA: True}
+        )
+        self.async_session_factory = async_sessionmaker(
+            self.async_engine, autoflush=False, expire_on_commit=False, info={READ_REPLICA: True}
+        )
+        self.lag_query = text(LAG_QUERIES.get(self.engine.dialect.name, DEFAULT_LAG_QUERY))
+        self.healthy = False
+        self.lag: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+
+    def check(self, max_lag: float) -> bool:
+        """
+        Measure replication lag; a replica that fails to answer, or is more
+        than `max_lag` seconds behind, is unhealthy until the next check
+        """
+        try:
+            with self.engine.connect() as connection:
+                lag = connection.execute(self.lag_query).scalar()
+            self.lag = None if lag is None else float(lag)
+            self.error = None if self.lag is not None else "replication lag unknown"
+        except Exception as e:
+            self.lag = None
+            self.error = str(e)
+        if self.error is None and self.lag > max_lag:
+            self.error = f"replication lag {self.lag:.1f}s exceeds {max_lag:.1f}s"
+        if self.healthy and self.error:
+            logger.warning("Read replica %s taken out of rotation: %s", self.display_url, self.error)
+        self.healthy = self.error is None
+        self.checked_at = time.monotonic()
+        return self.healthy
+
+    @property
+    def display_url(self) -> str:
+        return make_url(self.url).render_as_string(hide_password=True)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "url": self.display_url,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "error": self.error,
+            "pool": pool_stats(self.engine),
+            "async_pool": pool_stats(self.async_engine)
+        }
+
+
+class ReplicaRouter:
+    """
+    Hands out read sessions round-robin over the healthy replicas, and the
+    primary when none is healthy or when the caller wrote within the last
+    `sticky_seconds` (read-your-writes). Writes are remembered per process,
+    so with several workers a user may still land on a replica from a
+    worker that did not see the write; keep the window above the usual lag.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str] = (),
+        max_lag_seconds: float = settings.REPLICA_MAX_LAG_SECONDS,
+        check_interval: float = settings.REPLICA_HEALTH_CHECK_SECONDS,
+        sticky_seconds: float = settings.READ_YOUR_WRITES_SECONDS,
+        **engine_options
+    ):
+        self.replicas: List[Replica] = [Replica(url, **engine_options) for url in urls]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.recent_writers = TTLCache(max_entries=10000, ttl=sticky_seconds)
+        self._next = itertools.count()
+        self._check_lock = threading.Lock()
+
+    def checks_due(self) -> bool:
+        now = time.monotonic()
+        return any(
+            replica.checked_at is None or now - replica.checked_at >= self.check_interval
+            for replica in self.replicas
+        )
+
+    def refresh(self, force: bool = False) -> None:
+        """
+        Re-check replicas whose last check is older than the interval. One
+        caller checks at a time; concurrent callers use the previous state.
+        """
+        if not self._check_lock.acquire(blocking=force):
+            return
+        try:
+            now = time.monotonic()
+            for replica in self.replicas:
+                if force or replica.checked_at is None or now - replica.checked_at >= self.check_interval:
+                    replica.check(self.max_lag_seconds)
+        finally:
+            self._check_lock.release()
+
+    def record_write(self, key: Optional[str]) -> None:
+        if key is not None:
+            self.recent_writers.set(key, True)
+
+    def pick(self, key: Optional[str] = None) -> Optional[Replica]:
+        """
+        Replica for the next read, or None to read from the primary
+        """
+        if key is not None and self.recent_writers.get(key):
+            return None
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [replica.status() for replica in self.replicas]
+
+    def prewarm(self) -> None:
+        for replica in self.replicas:
+            prewarm(replica.engine)
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+            replica.async_engine.sync_engine.dispose()
+
+
+def request_key(request: Request) -> Optional[str]:
+    """
+    Who is asking, for read-your-writes: the subject of the bearer token
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+
+async def track_writes(request: Request, call_next):
+    """
+    HTTP middleware: a successful non-read request pins its user to the
+    primary for the read-your-writes window
+    """
+    response = await call_next(request)
+    if request.method not in READ_ONLY_METHODS and response.status_code < 400:
+        replica_router.record_write(request_key(request))
+    return response
+
+
+# Dependency to get a DB session for reads: a replica when one is healthy
+# and the user has not just written, the primary otherwise
+def get_read_db(request: Request, primary: Session = Depends(get_db)):
+    router = replica_router
+    router.refresh()
+    replica = router.pick(request_key(request))
+    if replica is None:
+        yield primary
+        return
+    db = replica.session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Session factory for reads run off the request path, picked like get_read_db()
+def get_read_session_factory(
+    request: Request,
+    primary: Callable[[], Session] = Depends(get_session_factory)
+) -> Callable[[], Session]:
+    router = replica_router
+    router.refresh()
+    replica = router.pick(request_key(request))
+    return primary if replica is None else replica.session_factory
+
+# Async counterpart of get_read_db()
+async def get_async_read_db(request: Request, primary: AsyncSession = Depends(get_async_db)):
+    router = replica_router
+    if router.checks_due():
+        await run_in_threadpool(router.refresh)
+    replica = router.pick(request_key(request))
+    if replica is None:
+        yield primary
+        return
+    async with replica.async_session_factory() as db:
+        yield db
+
+
+replica_router = ReplicaRouter(
+    url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()
+)
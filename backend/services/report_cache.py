@@ -0,0 +1,121 @@
+# backend/services/report_cache.py
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from config import settings
+
+
+def content_key(*parts: Any) -> str:
+    """
+    Stable hash of JSON-serializable parts (dict keys sorted)
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header value matches a strong ETag
+    """
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ReportCache:
+    """
+    Disk cache of rendered report files keyed by content hash.
+
+    Entries are evicted least-recently-used first once their total size
+    exceeds `max_bytes`. The index is rebuilt from file modification times
+    on first use, and reads refresh the modification time, so recency
+    survives restarts.
+    """
+
+    def __init__(
+        self,
+        directory: str = settings.REPORT_CACHE_DIR,
+        max_bytes: int = settings.REPORT_CACHE_MAX_BYTES
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: Optional["OrderedDict[str, int]"] = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _index(self) -> "OrderedDict[str, int]":
+        if self._entries is None:
+            os.makedirs(self.directory, exist_ok=True)
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+            self._entries = OrderedDict((name, size) for _, name, size in sorted(files))
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entries = self._index()
+            if key not in entries:
+                self.misses += 1
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    content = f.read()
+                os.utime(self._path(key))
+            except FileNotFoundError:
+                self._size -= entries.pop(key)
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return content
+
+    def put(self, key: str, content: bytes) -> None:
+        with self._lock:
+            entries = self._index()
+            # Write then rename, so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, self._path(key))
+
+            self._size -= entries.pop(key, 0)
+            entries[key] = len(content)
+            self._size += len(content)
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = self._entries
+        while self._size > self.max_bytes and len(entries) > 1:
+            key, size = entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._index()
+            return {
+                "entries": len(entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+report_cache = ReportCache()
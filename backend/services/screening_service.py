@@ -0,0 +1,260 @@
+# backend/services/screening_service.py
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
+import math
+import numpy as np
+import models
+from database import lock_or_create, update_by_id
+from config import settings
+from services.price_index_service import ALL_DISTRICTS, DISTRICT_PRECISION
+from services.sketch_service import sketch_service
+from services.heatmap_service import heatmap_service
+from services.outbox_service import outbox_service, PROPERTY
+from services.property_cache import property_cache
+
+# Observations kept verbatim for exact statistics before switching to
+# streaming updates; also the most a segment ever stores
+WARMUP_SIZE = 25
+# A segment needs this many observations before it can judge a listing
+MIN_OBSERVATIONS = 10
+# Step of the streaming median/MAD updates, relative to the current MAD
+LEARNING_RATE = 0.05
+# Floor for the MAD of log(price per m²), i.e. roughly 1%
+MIN_MAD = 0.01
+# Scales the MAD to a standard deviation for normally distributed data
+MAD_TO_SIGMA = 0.6745
+
+
+class _RunningStats:
+    """
+    Median and MAD of a stream in O(1) memory.
+
+    The first WARMUP_SIZE values are kept and summarized exactly; after that
+    both statistics follow a stochastic-approximation update that moves a
+    fixed fraction of the MAD towards each new value, so they also track
+    slow drift in the segment.
+    """
+
+    def __init__(
+        self,
+        observations: int = 0,
+        median: Optional[float] = None,
+        mad: Optional[float] = None,
+        warmup: Optional[List[float]] = None
+    ):
+        self.observations = observations
+        self.median = median
+        self.mad = mad
+        self.warmup = list(warmup) if warmup is not None else ([] if observations == 0 else None)
+
+    def update(self, value: float) -> None:
+        self.observations += 1
+        if self.warmup is not None:
+            self.warmup.append(value)
+            values = np.array(self.warmup)
+            self.median = float(np.median(values))
+            self.mad = max(float(np.median(np.abs(values - self.median))), MIN_MAD)
+            if len(self.warmup) >= WARMUP_SIZE:
+                self.warmup = None
+            return
+
+        step = LEARNING_RATE * self.mad
+        self.median += step if value > self.median else -step if value < self.median else 0.0
+        self.mad = max(self.mad + (step if abs(value - self.median) > self.mad else -step), MIN_MAD)
+
+    def score(self, value: float) -> Optional[float]:
+        """
+        Robust z-score of a value, None while the segment is too small
+        """
+        if self.observations < MIN_OBSERVATIONS or self.median is None:
+            return None
+        return MAD_TO_SIGMA * (value - self.median) / self.mad
+
+
+class ScreeningService:
+    """
+    Ingest-time anomaly screening of price per m².
+
+    Each listing is scored against running median/MAD statistics of its
+    segment (property type and geohash district, falling back to the whole
+    type while the district is small). Listings beyond the robust z-score
+    threshold are flagged, and with ANOMALY_ACTION=quarantine also excluded
+    from analytics, comparables, rollups and heatmap tiles. Flagged listings
+    are not folded into the statistics.
+    """
+
+    def __init__(
+        self,
+        threshold: float = settings.ANOMALY_Z_THRESHOLD,
+        action: str = settings.ANOMALY_ACTION
+    ):
+        self.threshold = threshold
+        self.action = action
+
+    def _value(self, price: Optional[float], area: Optional[float]) -> Optional[float]:
+        if not price or not area or price <= 0 or area <= 0:
+            return None
+        return math.log(price / area)
+
+    def _segment_keys(self, property_type: str, cell: Optional[str]) -> List[Tuple[str, str]]:
+        """
+        Segments of a listing, most specific first
+        """
+        keys = []
+        if cell:
+            keys.append((property_type, cell[:DISTRICT_PRECISION]))
+        keys.append((property_type, ALL_DISTRICTS))
+        return keys
+
+    def _segment_row(self, db: Session, key: Tuple[str, str]) -> models.ScreeningSegment:
+        return lock_or_create(
+            db,
+            models.ScreeningSegment,
+            {"property_type": key[0], "district": key[1]},
+            {"observations": 0, "warmup": []}
+        )
+
+    def _state(self, row: models.ScreeningSegment) -> _RunningStats:
+        return _RunningStats(row.observations or 0, row.median, row.mad, row.warmup)
+
+    def _save(self, row: models.ScreeningSegment, state: _RunningStats) -> None:
+        row.observations = state.observations
+        row.median = state.median
+        row.mad = state.mad
+        row.warmup = state.warmup
+
+    def _score(self, states: List[_RunningStats], value: float) -> Optional[float]:
+        for state in states:
+            score = state.score(value)
+            if score is not None:
+                return score
+        return None
+
+    def _flags(self, score: Optional[float]) -> Dict[str, Any]:
+        is_anomaly = score is not None and abs(score) > self.threshold
+        return {
+            "anomaly_score": score,
+            "is_anomaly": is_anomaly,
+            "is_quarantined": is_anomaly and self.action == "quarantine"
+        }
+
+    def screen_property(self, db: Session, property: models.Property, fold: bool = True) -> Optional[float]:
+        """
+        Score a listing against its segments and set its anomaly flags;
+        with fold=True a clean listing is added to the statistics
+        (caller commits). Returns the robust z-score.
+        """
+        return self.screen_properties(db, [property], fold=fold)[0]
+
+    def screen_properties(
+        self,
+        db: Session,
+        properties: List[models.Property],
+        fold: bool = True
+    ) -> List[Optional[float]]:
+        """
+        Screen a batch of listings in order, loading each segment once
+        (caller commits)
+        """
+        segments: Dict[Tuple[str, str], Tuple[models.ScreeningSegment, _RunningStats]] = {}
+        scores = []
+        for property in properties:
+            value = self._value(property.price, property.area)
+            if value is None:
+                for key, flag in self._flags(None).items():
+                    setattr(property, key, flag)
+                scores.append(None)
+                continue
+
+            keys = self._segment_keys(property.property_type, property.geohash)
+            for key in keys:
+                if key not in segments:
+                    row = self._segment_row(db, key)
+                    segments[key] = (row, self._state(row))
+            states = [segments[key][1] for key in keys]
+
+            flags = self._flags(self._score(states, value))
+            for key, flag in flags.items():
+                setattr(property, key, flag)
+            scores.append(flags["anomaly_score"])
+
+            if fold and not flags["is_anomaly"]:
+                for state in states:
+                    state.update(value)
+
+        if fold:
+            for row, state in segments.values():
+                self._save(row, state)
+        return scores
+
+    def rescreen(self, db: Session, chunk_size: int = 5000) -> Dict[str, int]:
+        """
+        Rebuild segment statistics from the properties table and re-score
+        every listing against them
+        """
+        query = db.query(
+            models.Property.id,
+            models.Property.property_type,
+            models.Property.geohash,
+            models.Property.price,
+            models.Property.area,
+            models.Property.anomaly_score,
+            models.Property.is_anomaly,
+            models.Property.is_quarantined
+        ).order_by(models.Property.id)
+
+        # Pass 1: statistics, skipping listings that are outliers at the time
+        states: Dict[Tuple[str, str], _RunningStats] = {}
+        for _, property_type, cell, price, area, *_ in query.yield_per(chunk_size):
+            value = self._value(price, area)
+            if value is None:
+                continue
+            keys = self._segment_keys(property_type, cell)
+            segment_states = [states.setdefault(key, _RunningStats()) for key in keys]
+            if not self._flags(self._score(segment_states, value))["is_anomaly"]:
+                for state in segment_states:
+                    state.update(value)
+
+        db.query(models.ScreeningSegment).delete(synchronize_session=False)
+        for (property_type, district), state in states.items():
+            row = models.ScreeningSegment(property_type=property_type, district=district)
+            self._save(row, state)
+            db.add(row)
+
+        # Pass 2: score every listing against the final statistics and
+        # write back only the ones whose flags changed
+        screened = anomalies = 0
+        batch: List[Dict[str, Any]] = []
+        changed: Dict[Tuple[str, ...], List[int]] = {}
+        for property_id, property_type, cell, price, area, *before in query.yield_per(chunk_size):
+            value = self._value(price, area)
+            score = None
+            if value is not None:
+                # A listing committed since pass 1 may be in a segment it never saw
+                keys = self._segment_keys(property_type, cell)
+                score = self._score([states[key] for key in keys if key in states], value)
+            flags = self._flags(score)
+            fields = tuple(key for key, old in zip(flags, before) if flags[key] != old)
+            if fields:
+                changed.setdefault(fields, []).append(property_id)
+                batch.append({"id": property_id, **flags})
+            screened += 1
+            anomalies += flags["is_anomaly"]
+            if len(batch) >= chunk_size:
+                update_by_id(db, models.Property, batch)
+                batch = []
+        update_by_id(db, models.Property, batch)
+        for fields, ids in changed.items():
+            for start in range(0, len(ids), chunk_size):
+                outbox_service.record(db, PROPERTY, "updated", ids[start:start + chunk_size], fields=fields)
+        db.commit()
+        property_cache.clear()
+
+        if self.action == "quarantine":
+            # Quarantine changes what the rollups and tiles may contain
+            sketch_service.rebuild_rollups(db, chunk_size=chunk_size)
+            heatmap_service.rebuild_tiles(db, chunk_size=chunk_size)
+
+        return {"screened": screened, "anomalies": anomalies}
+
+screening_service = ScreeningService()
@@ -0,0 +1,54 @@
+# backend/services/serialization.py
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple, Type
+import orjson
+
+
+def schema_columns(model: Any, schema: Type[BaseModel], exclude: Iterable[str] = ()) -> Tuple[Any, ...]:
+    """
+    ORM columns backing the fields of a response schema, for queries that
+    read plain rows instead of entities
+    """
+    excluded = set(exclude)
+    return tuple(getattr(model, name) for name in schema.model_fields if name not in excluded)
+
+
+def construct_rows(schema: Type[BaseModel], rows: Iterable[Any], **nested: Callable[[Dict[str, Any]], Any]) -> list:
+    """
+    Response models built from trusted rows with model_construct(): no
+    validation, so only for data the service itself wrote. `nested` maps a
+    field name to a function of the row's values that builds that field.
+    """
+    built = []
+    for row in rows:
+        values = dict(row._mapping)
+        for name, build in nested.items():
+            values[name] = build(values)
+        built.append(schema.model_construct(**values))
+    return built
+
+
+def models_response(
+    items: Sequence[BaseModel],
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> ORJSONResponse:
+    """
+    Render built models with orjson. Returning a Response skips FastAPI's
+    response_model validation and jsonable_encoder pass; the endpoint's
+    response_model still documents the shape.
+    """
+    return ORJSONResponse([item.model_dump() for item in items], status_code=status_code, headers=headers)
+
+
+def ndjson_response(records: Iterable[Any], headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    One orjson-rendered line per record, for clients that apply records as
+    they read them
+    """
+    return Response(
+        b"".join(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in records),
+        media_type="application/x-ndjson",
+        headers=headers
+    )
@@ -0,0 +1,166 @@
+# backend/services/sketch_service.py
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import date, datetime
+import models
+from database import lock_or_create
+from services.quantile_sketch import KLLSketch, DEFAULT_K, DEFAULT_RANK_ERROR
+
+METRICS = ("price", "price_per_sqm")
+DEFAULT_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+
+class SketchService:
+    """
+    Daily per-segment quantile sketch rollups for price and price per m².
+
+    One row per (property_type, metric, day). New listings are folded into
+    their day's sketch on create; `rebuild_rollups` recomputes days from the
+    properties table (needed after price edits or deletes, since sketches
+    cannot forget values).
+    """
+
+    def _metric_values(self, property: models.Property) -> Dict[str, float]:
+        values = {"price": property.price}
+        if property.area:
+            values["price_per_sqm"] = property.price / property.area
+        return values
+
+    def _period_of(self, property: models.Property) -> date:
+        return (property.created_at or datetime.utcnow()).date()
+
+    def record_property(self, db: Session, property: models.Property) -> None:
+        """
+        Fold a single property into its daily rollup (caller commits)
+        """
+        self.record_properties(db, [property])
+
+    def record_properties(
+        self,
+        db: Session,
+        properties: Iterable[models.Property]
+    ) -> None:
+        """
+        Fold a batch of properties into their daily rollups (caller commits)
+        """
+        grouped: Dict[Tuple[str, str, date], List[float]] = {}
+        for prop in properties:
+            if prop.price is None or prop.is_quarantined:
+                continue
+            period = self._period_of(prop)
+            for metric, value in self._metric_values(prop).items():
+                grouped.setdefault((prop.property_type, metric, period), []).append(value)
+
+        for (property_type, metric, period), values in grouped.items():
+            row = lock_or_create(
+                db,
+                models.PriceSketch,
+                {"property_type": property_type, "metric": metric, "period_start": period},
+                {"count": 0, "sketch": None}
+            )
+            sketch = KLLSketch.from_dict(row.sketch) if row.sketch else KLLSketch(k=DEFAULT_K)
+            sketch.update_many(values)
+            row.sketch = sketch.to_dict()
+            row.count = sketch.n
+
+    def rebuild_rollups(
+        self,
+        db: Session,
+        since: Optional[date] = None,
+        chunk_size: int = 5000
+    ) -> int:
+        """
+        Recompute daily rollups from the properties table, streaming rows
+        in chunks. Returns the number of rollup rows written.
+        """
+        sketches: Dict[Tuple[str, str, date], KLLSketch] = {}
+
+        query = db.query(
+            models.Property.property_type,
+            models.Property.price,
+            models.Property.area,
+            models.Property.created_at
+        ).filter(models.Property.is_quarantined.isnot(True))
+        if since is not None:
+            query = query.filter(models.Property.created_at >= datetime.combine(since, datetime.min.time()))
+
+        for property_type, price, area, created_at in query.yield_per(chunk_size):
+            if price is None or created_at is None:
+                continue
+            period = created_at.date()
+            values = {"price": price}
+            if area:
+                values["price_per_sqm"] = price / area
+            for metric, value in values.items():
+                key = (property_type, metric, period)
+                if key not in sketches:
+                    sketches[key] = KLLSketch(k=DEFAULT_K)
+                sketches[key].update(value)
+
+        delete_query = db.query(models.PriceSketch)
+        if since is not None:
+            delete_query = delete_query.filter(models.PriceSketch.period_start >= since)
+        delete_query.delete(synchronize_session=False)
+
+        for (property_type, metric, period), sketch in sketches.items():
+            db.add(models.PriceSketch(
+                property_type=property_type,
+                metric=metric,
+                period_start=period,
+                count=sketch.n,
+                sketch=sketch.to_dict()
+            ))
+        db.commit()
+        return len(sketches)
+
+    def merged_sketch(
+        self,
+        db: Session,
+        metric: str,
+        property_type: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None
+    ) -> KLLSketch:
+        """
+        Merge all daily rollups for a segment and window into one sketch
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unsupported metric: {metric}")
+
+        query = db.query(models.PriceSketch.sketch)\
+            .filter(models.PriceSketch.metric == metric)
+        if property_type:
+            query = query.filter(models.PriceSketch.property_type == property_type)
+        if start is not None:
+            query = query.filter(models.PriceSketch.period_start >= start)
+        if end is not None:
+            query = query.filter(models.PriceSketch.period_start <= end)
+
+        merged = KLLSketch(k=DEFAULT_K)
+        for (payload,) in query:
+            merged.merge(KLLSketch.from_dict(payload))
+        return merged
+
+    def get_quantiles(
+        self,
+        db: Session,
+        metric: str,
+        property_type: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        quantiles: Sequence[float] = DEFAULT_QUANTILES
+    ) -> Dict[str, object]:
+        """
+        Approximate percentiles for a segment and window
+        """
+        sketch = self.merged_sketch(db, metric, property_type, start, end)
+        values = sketch.quantiles(quantiles)
+        return {
+            "count": sketch.n,
+            "min": sketch.min_value,
+            "max": sketch.max_value,
+            "percentiles": {f"p{int(round(q * 100))}": v for q, v in zip(quantiles, values)},
+            "rank_error": DEFAULT_RANK_ERROR
+        }
+
+sketch_service = SketchService()
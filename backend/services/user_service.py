@@ -1,5 +1,7 @@
 # backend/services/user_service.py
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import Optional
 import models
 import schemas
@@ -8,8 +10,10 @@ from passlib.context import CryptContext
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from database import get_db
+from database import get_db, get_async_db
+import asyncio
 import os
+from services.pagination import keyset_page
 
 # Security configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -94,12 +98,13 @@ class UserService:
         self,
         db: Session,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> list[models.User]:
         """
         Get list of users
         """
-        return db.query(models.User).offset(skip).limit(limit).all()
+        return keyset_page(db.query(models.User), (models.User.id,), limit, cursor=cursor, skip=skip).all()
 
     def update_user(
         self,
@@ -200,6 +205,70 @@ class UserService:
             raise credentials_exception
         return user
 
+    async def get_user_by_email_async(
+        self,
+        db: AsyncSession,
+        email: str
+    ) -> Optional[models.User]:
+        """
+        Get user by email (async session)
+        """
+        result = await db.execute(select(models.User).where(models.User.email == email))
+        return result.scalars().first()
+
+    async def authenticate_user_async(
+        self,
+        db: AsyncSession,
+        email: str,
+        password: str
+    ) -> Optional[models.User]:
+        """
+        Authenticate user (async session); bcrypt runs in a worker thread
+        """
+        user = await self.get_user_by_email_async(db, email)
+        if not user:
+            return None
+        if not await asyncio.to_thread(pwd_context.verify, password, user.hashed_password):
+            return None
+        return user
+
+    async def update_last_login_async(
+        self,
+        db: AsyncSession,
+        user: models.User
+    ) -> None:
+        """
+        Update user's last login timestamp (async session)
+        """
+        user.last_login = datetime.utcnow()
+        await db.commit()
+
+    async def get_current_user_async(
+        self,
+        token: str = Depends(oauth2_scheme),
+        db: AsyncSession = Depends(get_async_db)
+    ) -> models.User:
+        """
+        Get current user from JWT token (async request path)
+        """
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            email: str = payload.get("sub")
+            if email is None:
+                raise credentials_exception
+        except JWTError:
+            raise credentials_exception
+
+        user = await self.get_user_by_email_async(db, email=email)
+        if user is None:
+            raise credentials_exception
+        return user
+
     def get_current_active_user(
         self,
         current_user: models.User = Depends(lambda: user_service.get_current_user)
@@ -1,11 +1,23 @@
 # backend/services/valuation_service.py
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Dict, Any
 import models
 import schemas
 from datetime import datetime
 from typing import Optional
 import math
+from categories import CONDITIONS, RENOVATION_STATUSES
+from services.price_index_service import price_index_service, period_of, district_of
+from services.pagination import keyset_page
+from services.serialization import construct_rows, schema_columns
+
+# Keyset order of the history listing, newest first
+HISTORY_PAGE_KEY = (models.ValuationHistory.valuation_date, models.ValuationHistory.id)
+
+# Response columns read as plain rows by the history fast path
+HISTORY_ROW_COLUMNS = schema_columns(models.ValuationHistory, schemas.ValuationHistory)
 
 class ValuationService:
     def calculate_valuation(
@@ -20,11 +32,23 @@ class ValuationService:
         adjustments = {}
         adjusted_prices = []
 
+        if db is not None:
+            price_index_service.ensure_loaded(db)
+
         for comp_property in comparable_properties:
             property_adjustments = self._calculate_adjustments(
                 subject_property,
                 comp_property
             )
+
+            # Market conditions (time) adjustment from the price index
+            market_adjustment = self._calculate_market_conditions_adjustment(comp_property)
+            if market_adjustment:
+                property_adjustments.append(schemas.Adjustment(
+                    feature="market_conditions",
+                    value=market_adjustment,
+                    description="Adjustment for market conditions since the comparable was listed"
+                ))
             adjustments[str(comp_property.id)] = property_adjustments
 
             # Calculate adjusted price
@@ -180,13 +204,7 @@ class ValuationService:
         """
         Calculate adjustment for condition difference
         """
-        condition_values = {
-            "excellent": 1.0,
-            "good": 0.9,
-            "fair": 0.8,
-            "poor": 0.7
-        }
-        condition_diff = condition_values.get(subject_condition, 0.8) - condition_values.get(comparable_condition, 0.8)
+        condition_diff = CONDITIONS.score(subject_condition) - CONDITIONS.score(comparable_condition)
         return condition_diff * 5000  # $5000 per condition level
 
     def _calculate_distance_adjustment(
@@ -222,15 +240,23 @@ class ValuationService:
         """
         Calculate adjustment for renovation status difference
         """
-        renovation_values = {
-            "recentlyRenovated": 1.0,
-            "partiallyRenovated": 0.8,
-            "needsRenovation": 0.4,
-            "original": 0.6
-        }
-        renovation_diff = renovation_values.get(subject_renovation, 0.6) - renovation_values.get(comparable_renovation, 0.6)
+        renovation_diff = RENOVATION_STATUSES.score(subject_renovation) - RENOVATION_STATUSES.score(comparable_renovation)
         return renovation_diff * 8000  # $8000 per renovation level
 
+    def _calculate_market_conditions_adjustment(
+        self,
+        comparable: schemas.Property
+    ) -> float:
+        """
+        Calculate time adjustment bringing the comparable price to the latest index period
+        """
+        ratio = price_index_service.index_ratio(
+            comparable.property_type,
+            district_of(comparable.location),
+            period_of(comparable.created_at)
+        )
+        return comparable.price * (ratio - 1)
+
     def _calculate_feature_adjustment(
         self,
         subject_feature: schemas.PropertyFeature,
@@ -324,16 +350,70 @@ class ValuationService:
         self,
         db: Session,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None
     ) -> List[models.ValuationHistory]:
         """
         Get valuation history
         """
-        return db.query(models.ValuationHistory)\
-            .order_by(models.ValuationHistory.valuation_date.desc())\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
+        return keyset_page(
+            db.query(models.ValuationHistory),
+            HISTORY_PAGE_KEY,
+            limit,
+            cursor=cursor,
+            descending=True,
+            skip=skip
+        ).all()
+
+    async def get_valuation_history_async(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[models.ValuationHistory]:
+        """
+        Get valuation history (async session)
+        """
+        result = await db.execute(keyset_page(
+            select(models.ValuationHistory),
+            HISTORY_PAGE_KEY,
+            limit,
+            cursor=cursor,
+            descending=True,
+            skip=skip
+        ))
+        return list(result.scalars().all())
+
+    async def get_valuation_history_rows_async(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[schemas.ValuationHistory]:
+        """
+        Valuation history page as response models built from rows
+        """
+        result = await db.execute(keyset_page(
+            select(*HISTORY_ROW_COLUMNS),
+            HISTORY_PAGE_KEY,
+            limit,
+            cursor=cursor,
+            descending=True,
+            skip=skip
+        ))
+        return construct_rows(schemas.ValuationHistory, result)
+
+    async def get_valuation_history_item_async(
+        self,
+        db: AsyncSession,
+        history_id: int
+    ) -> Optional[models.ValuationHistory]:
+        """
+        Get specific valuation history item (async session)
+        """
+        return await db.get(models.ValuationHistory, history_id)
 
     def get_valuation_history_item(
         self,
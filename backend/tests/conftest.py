@@ -1,27 +1,31 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 import sys
 import os
+import tempfile
 
 # Добавляем backend в путь
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from main import app
-from database import get_db, Base
+from database import get_db, get_async_db, get_session_factory, Base
 from models import User, Property, ValuationHistory
 
 # ВАЖНО: SQLite используется ТОЛЬКО для тестов!
 # Основная база данных остается PostgreSQL
-# SQLite :memory: создает временную БД в оперативной памяти
+# SQLite-файл во временном каталоге: его открывают и синхронный движок,
+# и асинхронный (aiosqlite), поэтому база в памяти не подходит
 # Преимущества для тестов:
-# 1. Быстрая работа (в памяти)
+# 1. Быстрая работа
 # 2. Изолированность (каждый тест получает чистую БД)
 # 3. Автоматическая очистка после завершения теста
 # 4. Не требует настройки PostgreSQL для тестов
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+TEST_DATABASE_PATH = os.path.join(tempfile.mkdtemp(prefix="real_estate_tests_"), "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DATABASE_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
@@ -31,6 +35,10 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Без пула: TestClient запускает приложение в собственном цикле событий
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def override_get_db():
     try:
         db = TestingSessionLocal()
@@ -38,6 +46,20 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+# Диспетчер outbox в тестах не запускается в фоне, тесты вызывают его явно
+from services.outbox_service import outbox_dispatcher
+outbox_dispatcher.interval = 0
+
+@pytest.fixture(autouse=True)
+def clear_property_cache():
+    # Каждый тест создает базу заново, и id объектов повторяются
+    from services.property_cache import property_cache
+    property_cache.clear()
+
 @pytest.fixture
 def db_session():
     Base.metadata.create_all(bind=engine)
@@ -51,6 +73,8 @@ def db_session():
 @pytest.fixture
 def client():
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
     Base.metadata.create_all(bind=engine)
     with TestClient(app) as test_client:
         yield test_client
@@ -0,0 +1,172 @@
+import pytest
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.orm import sessionmaker
+import models
+from services.analytics_runner import AnalyticsRunner, analytics_runner
+from services.maintenance_job_service import maintenance_job_service
+from tests.utils import create_test_properties_batch, InlineExecutor
+
+
+@pytest.fixture
+def admin_client(authenticated_client, db_session, monkeypatch):
+    client, user = authenticated_client
+    user.role = "admin"
+    db_session.commit()
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+    monkeypatch.setattr(maintenance_job_service, "session_factory", session_factory)
+    monkeypatch.setattr(maintenance_job_service, "_get_executor", lambda: InlineExecutor())
+    return client, user
+
+class TestAnalyticsAPI:
+
+    def setup_method(self):
+        analytics_runner.cache.clear()
+
+    def test_market_trends(self, authenticated_client, db_session):
+        """Тестирование получения рыночных трендов"""
+        client, user = authenticated_client
+        create_test_properties_batch(db_session, count=4)
+
+        response = client.get("/api/analytics/market-trends", params={"property_type": "apartment"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_properties"] == 4
+        assert data["price_stats"]["median"] == 47500000
+
+    def test_market_trends_approximate(self, authenticated_client, db_session):
+        """Тестирование приближенного режима по скетчам"""
+        client, user = authenticated_client
+        create_test_properties_batch(db_session, count=5)
+
+        response = client.get("/api/analytics/market-trends", params={"approximate": "true"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["approximate"] is True
+        assert data["price_stats"]["median"] == 50000000
+
+    def test_property_comparison_not_found(self, authenticated_client):
+        """Тестирование сравнения несуществующего объекта"""
+        client, user = authenticated_client
+
+        response = client.get("/api/analytics/properties/999/comparison")
+
+        assert response.status_code == 404
+
+    def test_heatmap(self, authenticated_client, db_session):
+        """Тестирование тепловой карты цен"""
+        client, user = authenticated_client
+        create_test_properties_batch(db_session, count=3)
+
+        response = client.get("/api/analytics/heatmap", params={
+            "min_lat": 43.0, "min_lng": 76.5, "max_lat": 43.5, "max_lng": 77.2, "zoom": 12
+        })
+
+        assert response.status_code == 200
+        assert sum(tile["count"] for tile in response.json()) == 3
+
+
+class TestMaintenanceJobs:
+
+    def test_fit_runs_as_job(self, admin_client, db_session):
+        """Тестирование переобучения кластеров фоновой задачей"""
+        client, user = admin_client
+        create_test_properties_batch(db_session, count=6)
+
+        response = client.post("/api/analytics/clusters/fit", params={"k": 2})
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        maintenance_job_service.wait(job_id, timeout=30)
+        job = client.get(f"/api/analytics/jobs/{job_id}").json()
+        assert job["status"] == "completed"
+        assert job["result"] == {"clusters": 2}
+        assert len(client.get("/api/analytics/clusters").json()) == 2
+
+    def test_rescreen_runs_as_job(self, admin_client, db_session):
+        """Тестирование повторной проверки объектов фоновой задачей"""
+        client, user = admin_client
+        create_test_properties_batch(db_session, count=3)
+
+        response = client.post("/api/analytics/screening/rescreen")
+        assert response.status_code == 202
+
+        maintenance_job_service.wait(response.json()["id"], timeout=30)
+        job = client.get(f"/api/analytics/jobs/{response.json()['id']}").json()
+        assert job["status"] == "completed"
+        assert job["result"] == {"screened": 3, "anomalies": 0}
+
+    def test_fit_requires_admin(self, authenticated_client):
+        """Тестирование запрета служебных задач для оценщика"""
+        client, user = authenticated_client
+
+        assert client.post("/api/analytics/clusters/fit").status_code == 403
+        assert client.post("/api/analytics/screening/rescreen").status_code == 403
+        assert client.get("/api/analytics/jobs/unknown").status_code == 403
+
+    def test_lost_job_does_not_block(self, admin_client, db_session):
+        """Тестирование снятия зависшей задачи по таймауту"""
+        client, user = admin_client
+        db_session.add(models.MaintenanceJob(
+            id="lost", user_id=user.id, kind="fit_submarkets", status="running",
+            created_at=datetime.utcnow() - timedelta(days=1)
+        ))
+        db_session.commit()
+
+        assert client.post("/api/analytics/clusters/fit").status_code == 202
+        db_session.expire_all()
+        assert db_session.get(models.MaintenanceJob, "lost").status == "failed"
+
+
+class TestAnalyticsRunner:
+
+    def test_concurrent_requests_share_computation(self):
+        """Тестирование объединения одинаковых параллельных запросов"""
+        runner = AnalyticsRunner(max_workers=2, ttl=60, max_entries=10)
+        calls = []
+        lock = threading.Lock()
+
+        def compute():
+            with lock:
+                calls.append(1)
+            time.sleep(0.05)
+            return {"value": 1}
+
+        async def scenario():
+            return await asyncio.gather(*[
+                runner.run("trends", {"days": 30, "property_type": None}, compute)
+                for _ in range(5)
+            ])
+
+        results = asyncio.run(scenario())
+        cached = asyncio.run(runner.run("trends", {"days": 30}, compute))
+
+        assert len(calls) == 1
+        assert all(result == {"value": 1} for result in results)
+        assert cached == {"value": 1}
+        runner.shutdown()
+
+    def test_computation_opens_own_session(self):
+        """Тестирование отдельной сессии для общей задачи аналитики"""
+        runner = AnalyticsRunner(max_workers=1, ttl=60, max_entries=10)
+        sessions = []
+
+        class FakeSession:
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        def session_factory():
+            sessions.append(FakeSession())
+            return sessions[-1]
+
+        result = asyncio.run(runner.run("trends", {}, lambda db: {"same": db is sessions[0]}, session_factory))
+
+        assert result == {"same": True}
+        assert len(sessions) == 1 and sessions[0].closed
+        runner.shutdown()
@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+from datetime import datetime
+from config import settings
+from models import Property
+from services.bulk_export_service import bulk_export_service
+from tests.utils import create_test_properties_batch
+
+
+class TestBulkExportAPI:
+
+    def test_csv_export(self, authenticated_client, db_session, monkeypatch):
+        """Тестирование потоковой выгрузки объектов в CSV"""
+        client, user = authenticated_client
+        monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+        create_test_properties_batch(db_session, 5)
+
+        response = client.get("/api/export/bulk/properties", params={"format": "csv", "chunk_size": 100})
+
+        assert response.status_code == 200
+        assert "x-export-watermark" in response.headers
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["address"] for row in rows] == [f"Test Address {i + 1}" for i in range(5)]
+        assert json.loads(rows[0]["location"]) == {"lat": 43.222, "lng": 76.8512}
+        assert json.loads(rows[0]["features"]) == []
+
+    def test_ndjson_incremental_export(self, authenticated_client, db_session):
+        """Тестирование инкрементальной выгрузки по водяному знаку"""
+        client, user = authenticated_client
+        properties = create_test_properties_batch(db_session, 3)
+        db_session.query(Property).update({"updated_at": datetime(2026, 1, 1)})
+        db_session.query(Property).filter(Property.id == properties[1].id)\
+            .update({"updated_at": datetime(2026, 1, 3)})
+        db_session.commit()
+
+        response = client.get("/api/export/bulk/properties", params={
+            "format": "ndjson",
+            "since": datetime(2026, 1, 2).isoformat()
+        })
+
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["id"] for row in rows] == [properties[1].id]
+
+    def test_recent_rows_wait_for_next_run(self, authenticated_client, db_session):
+        """Тестирование отложенной выгрузки строк, записанных только что"""
+        client, user = authenticated_client
+        create_test_properties_batch(db_session, 2)
+
+        response = client.get("/api/export/bulk/properties", params={"format": "ndjson"})
+
+        assert response.text == ""
+        watermark = datetime.fromisoformat(response.headers["x-export-watermark"])
+        assert watermark < db_session.query(Property.updated_at).first()[0]
+
+    def test_keyset_chunks_cover_all_rows(self, db_session):
+        """Тестирование постраничного чтения без пропусков при равных водяных знаках"""
+        create_test_properties_batch(db_session, 7)
+        db_session.query(Property).update({"updated_at": datetime(2026, 1, 1)})
+        db_session.commit()
+
+        chunks = list(bulk_export_service.iter_chunks(db_session, "properties", chunk_size=3))
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+        assert len({row["id"] for chunk in chunks for row in chunk}) == 7
+
+    def test_unknown_dataset_and_format(self, authenticated_client):
+        """Тестирование ошибок для неизвестных набора данных и формата"""
+        client, user = authenticated_client
+
+        assert client.get("/api/export/bulk/users").status_code == 404
+        assert client.get("/api/export/bulk/properties", params={"format": "xml"}).status_code == 400
@@ -0,0 +1,167 @@
+import base64
+import io
+import json
+import zipfile
+import pytest
+import main
+from models import ValuationHistory
+from services.report_cache import ReportCache
+from tests.utils import create_test_property
+
+
+@pytest.fixture(autouse=True)
+def isolated_report_cache(tmp_path, monkeypatch):
+    cache = ReportCache(directory=str(tmp_path / "reports"), max_bytes=10 * 1024 * 1024)
+    monkeypatch.setattr(main, "report_cache", cache)
+    return cache
+
+
+def valuation_payload(db_session):
+    subject = create_test_property(db_session, address="Export Subject")
+    comparable = create_test_property(db_session, address="Export Comparable")
+
+    def as_json(prop):
+        return {
+            "id": prop.id,
+            "address": prop.address,
+            "property_type": prop.property_type,
+            "area": prop.area,
+            "floor_level": prop.floor_level,
+            "total_floors": prop.total_floors,
+            "condition": prop.condition,
+            "renovation_status": prop.renovation_status,
+            "location": prop.location,
+            "price": prop.price,
+            "features": [],
+            "created_at": prop.created_at.isoformat(),
+            "updated_at": prop.updated_at.isoformat()
+        }
+
+    return {
+        "subject_property": as_json(subject),
+        "comparable_properties": [as_json(comparable)],
+        "adjustments": {str(comparable.id): [{"feature": "area", "value": 150000.0, "description": "Area"}]},
+        "final_valuation": 45150000.0,
+        "confidence_score": 0.8,
+        "created_at": "2026-10-19T12:00:00"
+    }
+
+
+class TestExportAPI:
+
+    def test_download_pdf(self, authenticated_client, db_session):
+        """Тестирование выгрузки PDF бинарным ответом"""
+        client, user = authenticated_client
+
+        response = client.post("/api/export/pdf/download", json=valuation_payload(db_session))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert int(response.headers["content-length"]) == len(response.content)
+        assert "attachment" in response.headers["content-disposition"]
+        assert response.content.startswith(b"%PDF")
+
+    def test_download_excel(self, authenticated_client, db_session):
+        """Тестирование выгрузки Excel бинарным ответом"""
+        client, user = authenticated_client
+
+        response = client.post("/api/export/excel/download", json=valuation_payload(db_session))
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/vnd.openxmlformats")
+        assert ".xlsx" in response.headers["content-disposition"]
+        assert zipfile.is_zipfile(io.BytesIO(response.content))
+
+    def test_base64_export_matches_binary(self, authenticated_client, db_session):
+        """Тестирование base64-выгрузки без временных файлов"""
+        client, user = authenticated_client
+
+        response = client.post("/api/export/excel", json=valuation_payload(db_session))
+
+        assert response.status_code == 200
+        content = base64.b64decode(response.json()["content"])
+        assert zipfile.is_zipfile(io.BytesIO(content))
+
+    def test_stream_properties_excel(self, authenticated_client, db_session):
+        """Тестирование потоковой выгрузки объектов в Excel"""
+        from tests.utils import create_test_properties_batch
+        client, user = authenticated_client
+        create_test_properties_batch(db_session, 5)
+
+        response = client.get("/api/export/properties/excel", params={"min_price": 50000000})
+
+        assert response.status_code == 200
+        assert int(response.headers["content-length"]) == len(response.content)
+        with zipfile.ZipFile(io.BytesIO(response.content)) as workbook:
+            sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        assert sheet.count("<row ") == 4  # header + 3 matching properties
+        assert "<v>55000000</v>" in sheet
+        assert "<v>45000000</v>" not in sheet
+
+    def test_batch_pdf_zip(self, authenticated_client, db_session):
+        """Тестирование пакетной генерации PDF в архив"""
+        client, user = authenticated_client
+        payload = valuation_payload(db_session)
+
+        response = client.post("/api/export/pdf/batch", json=[payload, payload, payload])
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        assert float(response.headers["x-render-seconds"]) > 0
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            names = archive.namelist()
+            manifest = json.loads(archive.read("manifest.json"))
+            assert all(archive.read(name).startswith(b"%PDF") for name in names if name.endswith(".pdf"))
+        assert len([name for name in names if name.endswith(".pdf")]) == 3
+        assert all(report["render_seconds"] > 0 for report in manifest["reports"])
+
+    def test_pdf_etag_and_cache(self, authenticated_client, db_session, isolated_report_cache, monkeypatch):
+        """Тестирование ETag, If-None-Match и кэша отчетов"""
+        client, user = authenticated_client
+        payload = valuation_payload(db_session)
+
+        first = client.post("/api/export/pdf/download", json=payload)
+        etag = first.headers["etag"]
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("report should be served from cache")
+        monkeypatch.setattr(main.export_service, "render_pdf_async", fail)
+
+        second = client.post("/api/export/pdf/download", json=payload)
+        unchanged = client.post("/api/export/pdf/download", json=payload, headers={"If-None-Match": etag})
+        payload["final_valuation"] += 1
+        changed = client.post("/api/export/pdf/download", json=payload, headers={"If-None-Match": etag})
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert second.content == first.content
+        assert second.headers["etag"] == etag
+        assert unchanged.status_code == 412  # 304 is only for GET
+        assert unchanged.headers["etag"] == etag
+        assert changed.status_code == 500  # new content must render, and rendering is disabled
+        assert isolated_report_cache.stats()["hits"] == 1
+
+    def test_history_report(self, authenticated_client, db_session):
+        """Тестирование отчета по элементу истории оценок"""
+        client, user = authenticated_client
+        subject = create_test_property(db_session)
+        history = ValuationHistory(
+            property_id=subject.id,
+            valuation_type="subject",
+            original_price=subject.price,
+            adjusted_price=46000000,
+            adjustments={"2": [{"feature": "area", "value": 1000000.0, "description": "Area"}]},
+            comparable_properties=[2],
+            created_by="testuser"
+        )
+        db_session.add(history)
+        db_session.commit()
+
+        response = client.get(f"/api/valuation/history/{history.id}/report")
+        cached = client.get(
+            f"/api/valuation/history/{history.id}/report",
+            headers={"If-None-Match": response.headers["etag"]}
+        )
+
+        assert response.status_code == 200
+        assert response.content.startswith(b"%PDF")
+        assert cached.status_code == 304
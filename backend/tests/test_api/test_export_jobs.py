@@ -0,0 +1,88 @@
+import io
+import zipfile
+from datetime import datetime, timedelta
+import pytest
+from services.export_job_service import export_job_service
+from sqlalchemy.orm import sessionmaker
+from tests.utils import create_test_properties_batch, InlineExecutor
+
+
+@pytest.fixture
+def job_service(db_session, tmp_path, monkeypatch):
+    # Workers open their own sessions on the test database
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=db_session.get_bind())
+    monkeypatch.setattr(export_job_service, "session_factory", session_factory)
+    monkeypatch.setattr(export_job_service, "artifact_dir", str(tmp_path))
+    monkeypatch.setattr(export_job_service, "_get_executor", lambda: InlineExecutor())
+    return export_job_service
+
+
+class TestExportJobsAPI:
+
+    def test_submit_poll_and_download(self, authenticated_client, db_session, job_service):
+        """Тестирование фоновой выгрузки: постановка, статус и скачивание"""
+        client, user = authenticated_client
+        create_test_properties_batch(db_session, 3)
+
+        response = client.post("/api/export/jobs", json={"kind": "properties_excel", "params": {}})
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        job_service.wait(job_id, timeout=30)
+        status = client.get(f"/api/export/jobs/{job_id}").json()
+        assert status["status"] == "completed"
+        assert status["progress"] == 1.0
+        assert status["processed_rows"] == status["total_rows"] == 3
+
+        download = client.get(f"/api/export/jobs/{job_id}/download")
+        assert download.status_code == 200
+        assert zipfile.is_zipfile(io.BytesIO(download.content))
+
+    def test_unknown_kind_rejected(self, authenticated_client, job_service):
+        """Тестирование отклонения неизвестного типа выгрузки"""
+        client, user = authenticated_client
+
+        response = client.post("/api/export/jobs", json={"kind": "zip", "params": {}})
+
+        assert response.status_code == 400
+
+    def test_per_user_limit(self, authenticated_client, db_session, job_service, monkeypatch):
+        """Тестирование ограничения числа активных задач пользователя"""
+        from models import ExportJob
+        client, user = authenticated_client
+        monkeypatch.setattr(job_service, "per_user_limit", 1)
+        db_session.add(ExportJob(id="busy", user_id=user.id, kind="properties_excel", status="running"))
+        db_session.commit()
+
+        response = client.post("/api/export/jobs", json={"kind": "properties_excel", "params": {}})
+
+        assert response.status_code == 429
+
+    def test_lost_job_released(self, authenticated_client, db_session, job_service, monkeypatch):
+        """Тестирование снятия задачи, потерянной при остановке воркера"""
+        from models import ExportJob
+        client, user = authenticated_client
+        monkeypatch.setattr(job_service, "per_user_limit", 1)
+        db_session.add(ExportJob(
+            id="lost", user_id=user.id, kind="properties_excel", status="pending",
+            created_at=datetime.utcnow() - timedelta(days=1)
+        ))
+        db_session.commit()
+
+        response = client.post("/api/export/jobs", json={"kind": "properties_excel", "params": {}})
+
+        assert response.status_code == 202
+        db_session.expire_all()
+        assert db_session.get(ExportJob, "lost").status == "failed"
+
+    def test_expired_artifact_removed(self, authenticated_client, db_session, job_service, monkeypatch):
+        """Тестирование удаления файлов выгрузки после истечения срока"""
+        client, user = authenticated_client
+        create_test_properties_batch(db_session, 1)
+        monkeypatch.setattr(job_service, "ttl", -1)
+
+        job_id = client.post("/api/export/jobs", json={"kind": "properties_excel", "params": {}}).json()["id"]
+        job_service.wait(job_id, timeout=30)
+
+        assert job_service.cleanup_expired(db_session) == 1
+        assert client.get(f"/api/export/jobs/{job_id}/download").status_code == 410
@@ -1,5 +1,15 @@
 import pytest
 from fastapi.testclient import TestClient
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+import json
+import schemas
+from config import settings
+from services.pagination import encode_cursor
+from models import Property, SubmarketModel, ValuationHistory
+from services.clustering_service import clustering_service
+from services.screening_service import screening_service
+from tests.utils import create_test_property, create_test_properties_batch
 
 class TestPropertiesAPI:
     
@@ -172,3 +182,241 @@ class TestPropertiesAPI:
         # Проверяем, что объект удален
         get_response = client.get(f"/api/properties/{property_id}")
         assert get_response.status_code == 404
+
+    def test_bulk_create_update_delete(self, authenticated_client, db_session):
+        """Тестирование пакетного создания, обновления и удаления объектов"""
+        client, user = authenticated_client
+        existing = create_test_properties_batch(db_session, 3)
+        ids = [p.id for p in existing]
+        new_property = {
+            "address": "Bulk Street, 1",
+            "property_type": "apartment",
+            "area": 60.0,
+            "floor_level": 2,
+            "total_floors": 9,
+            "condition": "good",
+            "renovation_status": "original",
+            "location": {"lat": 43.2400, "lng": 76.9000},
+            "price": 30000000,
+            "features": []
+        }
+
+        response = client.post("/api/properties/bulk", json={
+            "create": [new_property],
+            "update": [{"id": ids[0], "price": 41000000}, {"id": 999999, "price": 1}],
+            "delete": [ids[1]]
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["committed"] is True
+        assert (data["created"], data["updated"], data["deleted"], data["failed"]) == (1, 1, 1, 1)
+        failed = [r for r in data["results"] if r["status"] == "failed"]
+        assert failed == [{
+            "operation": "update", "index": 1, "id": 999999,
+            "status": "failed", "error": "Property not found"
+        }]
+
+        assert client.get(f"/api/properties/{ids[0]}").json()["price"] == 41000000
+        assert client.get(f"/api/properties/{ids[1]}").status_code == 404
+        created_id = data["results"][0]["id"]
+        assert client.get(f"/api/properties/{created_id}").json()["address"] == "Bulk Street, 1"
+
+    def test_bulk_atomic_rolls_back(self, authenticated_client, db_session):
+        """Тестирование отката всего пакета при ошибке в атомарном режиме"""
+        client, user = authenticated_client
+        existing = create_test_properties_batch(db_session, 2)
+
+        response = client.post("/api/properties/bulk", json={
+            "update": [{"id": existing[0].id, "price": 1000}],
+            "delete": [existing[1].id, existing[1].id],
+            "atomic": True
+        })
+
+        data = response.json()
+        assert data["committed"] is False
+        assert data["failed"] == 1
+        assert client.get(f"/api/properties/{existing[0].id}").json()["price"] == existing[0].price
+        assert client.get(f"/api/properties/{existing[1].id}").status_code == 200
+
+    def test_cursor_pagination(self, authenticated_client, db_session):
+        """Тестирование постраничного чтения по курсору"""
+        client, user = authenticated_client
+        created = create_test_properties_batch(db_session, 5)
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+            response = client.get("/api/properties/", params=params)
+            assert response.status_code == 200
+            seen.extend(item["id"] for item in response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if cursor is None:
+                break
+
+        assert seen == sorted(p.id for p in created)
+        assert client.get("/api/properties/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+    def test_history_cursor_pagination(self, authenticated_client, db_session):
+        """Тестирование курсора истории оценок при одинаковых датах"""
+        client, user = authenticated_client
+        subject = create_test_property(db_session)
+        for _ in range(3):
+            db_session.add(ValuationHistory(
+                property_id=subject.id,
+                valuation_date=datetime(2026, 5, 1),
+                valuation_type="subject",
+                original_price=subject.price,
+                adjusted_price=subject.price,
+                adjustments={},
+                comparable_properties=[],
+                created_by="testuser"
+            ))
+        db_session.commit()
+
+        first = client.get("/api/valuation/history", params={"limit": 2})
+        second = client.get(
+            "/api/valuation/history",
+            params={"limit": 2, "cursor": first.headers["x-next-cursor"]}
+        )
+
+        ids = [item["id"] for item in first.json() + second.json()]
+        assert len(ids) == 3 and ids == sorted(ids, reverse=True)
+        assert "x-next-cursor" not in second.headers
+
+    def test_filter_properties(self, authenticated_client, db_session):
+        """Тестирование серверной фильтрации списка объектов"""
+        client, user = authenticated_client
+        create_test_property(db_session, "Cheap", area=50.0, price=20000000, condition="fair")
+        create_test_property(db_session, "Mid", area=80.0, price=40000000)
+        create_test_property(
+            db_session, "Far", area=90.0, price=45000000,
+            location={"lat": 51.1694, "lng": 71.4491}
+        )
+
+        def addresses(**params):
+            response = client.get("/api/properties/", params=params)
+            assert response.status_code == 200
+            return sorted(item["address"] for item in response.json())
+
+        assert addresses(min_price=30000000, max_area=85) == ["Mid"]
+        assert addresses(condition=["fair", "poor"]) == ["Cheap"]
+        assert addresses(min_lat=43.0, min_lng=76.0, max_lat=44.0, max_lng=77.0) == ["Cheap", "Mid"]
+        assert client.get("/api/properties/", params={"condition": "mint"}).status_code == 400
+        assert client.get("/api/properties/", params={"min_lat": 43.0}).status_code == 400
+
+    def test_filter_by_features(self, authenticated_client, db_session):
+        """Тестирование фильтрации по характеристикам из property_features"""
+        client, user = authenticated_client
+        create_test_property(db_session, "Two spaces", features=[
+            {"name": "parking", "value": 2, "unit": "space"},
+            {"name": "balcony", "value": 1, "unit": "count"}
+        ])
+        create_test_property(db_session, "No parking", features=[{"name": "parking", "value": 0}])
+        create_test_property(db_session, "Bare")
+
+        def addresses(*feature):
+            response = client.get("/api/properties/", params={"feature": list(feature)})
+            assert response.status_code == 200
+            return sorted(item["address"] for item in response.json())
+
+        assert addresses("parking>=1") == ["Two spaces"]
+        assert addresses("parking") == ["No parking", "Two spaces"]
+        assert addresses("parking<1") == ["No parking"]
+        assert addresses("parking>=1", "balcony") == ["Two spaces"]
+        assert client.get("/api/properties/", params={"feature": "parking>>1"}).status_code == 400
+
+        listed = {item["address"]: item for item in client.get("/api/properties/").json()}
+        assert [f["name"] for f in listed["Two spaces"]["features"]] == ["parking", "balcony"]
+        assert listed["Bare"]["features"] == []
+
+    def test_listing_fast_path_matches_schema(self, authenticated_client, db_session):
+        """Тестирование совпадения быстрой сериализации списка со схемой ответа"""
+        client, user = authenticated_client
+        create_test_property(db_session, "Serialized", features=[{"name": "parking", "value": 1, "unit": "space"}])
+        create_test_property(db_session, "Plain")
+        expected = [
+            jsonable_encoder(schemas.Property.model_validate(p))
+            for p in db_session.query(Property).order_by(Property.id)
+        ]
+
+        response = client.get("/api/properties/")
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == expected
+
+    def test_delta_sync(self, authenticated_client, db_session, monkeypatch):
+        """Тестирование синхронизации изменений по токену"""
+        monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+        client, user = authenticated_client
+        ids = [p.id for p in create_test_properties_batch(db_session, 3)]
+
+        seen, token, has_more = [], None, True
+        while has_more:
+            params = {"limit": 2} if token is None else {"limit": 2, "token": token}
+            data = client.get("/api/properties/sync", params=params).json()
+            seen.extend(item["id"] for item in data["upserts"])
+            token, has_more = data["next_token"], data["has_more"]
+        assert seen == ids
+
+        client.put(f"/api/properties/{ids[0]}", json={"price": 52000000})
+        client.delete(f"/api/properties/{ids[1]}")
+        added = create_test_property(db_session, "Added later")
+
+        response = client.get("/api/properties/sync", params={"token": token})
+        data = response.json()
+        assert [item["id"] for item in data["upserts"]] == [ids[0], added.id]
+        assert data["upserts"][0]["price"] == 52000000
+        assert data["deletes"] == [ids[1]]
+        assert response.headers["x-sync-token"] == data["next_token"]
+
+        again = client.get("/api/properties/sync", params={"token": data["next_token"]}).json()
+        assert (again["upserts"], again["deletes"], again["has_more"]) == ([], [], False)
+
+    def test_delta_sync_skips_maintenance(self, authenticated_client, db_session, monkeypatch):
+        """Тестирование отсутствия изменений в синхронизации после перепроверки и перекластеризации"""
+        monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+        client, user = authenticated_client
+        create_test_properties_batch(db_session, 3)
+        token = client.get("/api/properties/sync").json()["next_token"]
+
+        screening_service.rescreen(db_session)
+        clustering_service.fit(db_session, k=2, batch_size=8, iterations=10, seed=1)
+        try:
+            assert db_session.query(Property).filter(Property.cluster_id.isnot(None)).count() == 3
+            data = client.get("/api/properties/sync", params={"token": token}).json()
+        finally:
+            db_session.query(SubmarketModel).delete()
+            db_session.commit()
+            clustering_service.load(db_session)
+
+        assert (data["upserts"], data["deletes"]) == ([], [])
+
+    def test_delta_sync_ndjson(self, authenticated_client, db_session, monkeypatch):
+        """Тестирование компактного формата NDJSON"""
+        monkeypatch.setattr(settings, "SYNC_SETTLE_SECONDS", 0)
+        client, user = authenticated_client
+        first_id, second_id = [p.id for p in create_test_properties_batch(db_session, 2)]
+        token = client.get("/api/properties/sync").json()["next_token"]
+        client.delete(f"/api/properties/{second_id}")
+
+        response = client.get("/api/properties/sync", params={"format": "ndjson"})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [line["upsert"]["id"] for line in lines[:-1]] == [first_id]
+        assert lines[-1] == {"next_token": response.headers["x-sync-token"], "has_more": False}
+
+        response = client.get("/api/properties/sync", params={"format": "ndjson", "token": token})
+        assert response.text.splitlines()[0] == json.dumps({"delete": second_id}, separators=(",", ":"))
+
+    def test_delta_sync_token_errors(self, authenticated_client, db_session, monkeypatch):
+        """Тестирование неверного и устаревшего токена синхронизации"""
+        client, user = authenticated_client
+        create_test_property(db_session)
+        # Fresh changes wait for the settle window
+        assert client.get("/api/properties/sync").json()["upserts"] == []
+
+        expired = encode_cursor([datetime(2020, 1, 1), 1, datetime(2020, 1, 1), 0])
+        assert client.get("/api/properties/sync", params={"token": expired}).status_code == 410
+        assert client.get("/api/properties/sync", params={"token": "not-a-token"}).status_code == 400
+        assert client.get("/api/properties/sync", params={"format": "xml"}).status_code == 400
@@ -0,0 +1,86 @@
+import io
+from models import Property, PriceTile
+from services.geolocation_service import geolocation_service
+from services.import_service import import_service
+
+HEADER = "address,property_type,area,floor_level,total_floors,condition,renovation_status,lat,lng,price\n"
+
+
+def csv_file(*rows: str) -> io.BytesIO:
+    return io.BytesIO((HEADER + "".join(row + "\n" for row in rows)).encode("utf-8"))
+
+
+class TestPropertyImport:
+
+    def test_import_reports_row_errors(self, authenticated_client, db_session):
+        """Тестирование импорта CSV с построчным отчетом об ошибках"""
+        client, user = authenticated_client
+        content = csv_file(
+            "Abay 1,apartment,80,3,9,good,recentlyRenovated,43.2220,76.8512,40000000",
+            "Abay 2,apartment,-5,3,9,good,recentlyRenovated,43.2220,76.8512,40000000",
+            "Abay 3,castle,90,3,9,good,recentlyRenovated,43.2220,76.8512,45000000",
+            "Abay 4,house,120,1,2,excellent,original,43.2300,76.8600,70000000"
+        ).getvalue()
+
+        response = client.post(
+            "/api/properties/import",
+            params={"geocode": "false"},
+            files={"file": ("listings.csv", content, "text/csv")}
+        )
+
+        assert response.status_code == 200
+        report = response.json()
+        assert (report["total"], report["imported"], report["failed"]) == (4, 2, 2)
+        assert [error["row"] for error in report["errors"]] == [3, 4]
+        assert report["errors"][0]["errors"][0].startswith("area")
+
+        imported = db_session.query(Property).order_by(Property.id).all()
+        assert [p.address for p in imported] == ["Abay 1", "Abay 4"]
+        assert imported[1].geohash is not None
+        assert imported[1].features == []
+        assert db_session.query(PriceTile).count() > 0
+
+    def test_geocodes_each_address_once(self, db_session, monkeypatch):
+        """Тестирование геокодирования уникальных адресов без координат"""
+        calls = []
+
+        def geocode(address):
+            calls.append(address)
+            return (43.25, 76.95) if address == "Dostyk 5" else None
+
+        monkeypatch.setattr(geolocation_service, "geocode_address", geocode)
+        rows = [
+            "Dostyk 5,apartment,70,2,5,good,original,,,30000000",
+            "Dostyk 5,apartment,75,4,5,good,original,,,32000000",
+            "Nowhere 1,apartment,60,1,5,good,original,,,25000000"
+        ]
+
+        report = import_service.import_file(db_session, csv_file(*rows), "csv", chunk_size=100)
+
+        assert sorted(calls) == ["Dostyk 5", "Nowhere 1"]
+        assert (report["imported"], report["geocoded"]) == (2, 1)
+        assert report["errors"][0]["row"] == 4
+        assert {p.latitude for p in db_session.query(Property).all()} == {43.25}
+
+    def test_imports_features_as_rows(self, db_session):
+        """Тестирование импорта характеристик в таблицу property_features"""
+        rows = [{
+            "address": "Satpayev 10", "property_type": "apartment", "area": "65", "floor_level": "3",
+            "total_floors": "9", "condition": "good", "renovation_status": "original",
+            "lat": "43.24", "lng": "76.92", "price": "35000000",
+            "features": '[{"name": "parking", "value": 1, "unit": "space"}, {"name": "balcony", "value": 2}]'
+        }]
+
+        report = import_service.import_rows(db_session, rows, geocode=False)
+
+        assert report["imported"] == 1
+        imported = db_session.query(Property).one()
+        assert [(f.name, f.value, f.unit) for f in imported.features] == [("parking", 1.0, "space"), ("balcony", 2.0, None)]
+
+    def test_rejects_unknown_file_type(self, authenticated_client):
+        """Тестирование отклонения неподдерживаемого формата файла"""
+        client, user = authenticated_client
+
+        response = client.post("/api/properties/import", files={"file": ("listings.txt", b"x", "text/plain")})
+
+        assert response.status_code == 400
@@ -0,0 +1,38 @@
+import pytest
+import numpy as np
+from pydantic import ValidationError
+from categories import PROPERTY_TYPES, CONDITIONS, RENOVATION_STATUSES, Condition, RenovationStatus
+from schemas import PropertyUpdate
+from tests.utils import create_test_property
+
+class TestCategories:
+
+    def test_aliases_normalize_to_canonical(self):
+        """Тестирование приведения синонимов к каноническим значениям"""
+        assert RENOVATION_STATUSES.normalize("partial") == "partiallyRenovated"
+        assert RENOVATION_STATUSES.normalize("needs_renovation") == "needsRenovation"
+        assert PROPERTY_TYPES.normalize("Flat") == "apartment"
+        assert CONDITIONS.code("excellent") == Condition.EXCELLENT
+
+    def test_unknown_value_rejected_by_schema(self):
+        """Тестирование отклонения неизвестных значений в схемах"""
+        with pytest.raises(ValidationError):
+            PropertyUpdate(condition="sparkling")
+
+        assert PropertyUpdate(renovation_status="none").renovation_status == "original"
+
+    def test_vectorized_scores_and_ranks(self):
+        """Тестирование векторных оценок по кодам"""
+        codes = np.array([1, 4, np.nan])
+
+        assert RENOVATION_STATUSES.score_array(codes).tolist() == [1.0, 0.4, 0.6]
+        assert CONDITIONS.rank_array(codes).tolist() == [0.0, 3.0, 1.5]
+
+    def test_model_codes_follow_strings(self, db_session):
+        """Тестирование синхронизации кодов в модели"""
+        prop = create_test_property(db_session, condition="fair", renovation_status="original")
+
+        assert prop.condition_code == Condition.FAIR
+        assert prop.renovation_code == RenovationStatus.ORIGINAL
+        prop.condition = "poor"
+        assert prop.condition_code == Condition.POOR
@@ -0,0 +1,84 @@
+import pytest
+from datetime import date
+from sqlalchemy import event, exc
+from sqlalchemy.orm import sessionmaker
+import models
+from database import TimedQueuePool, async_database_url, create_db_engine, lock_or_create, pool_stats, prewarm
+
+
+class TestDatabaseEngines:
+
+    def test_async_database_url(self):
+        """Тестирование выбора асинхронного драйвера"""
+        assert async_database_url("postgresql://u:p@db:5432/app") == "postgresql+asyncpg://u:p@db:5432/app"
+        assert async_database_url("sqlite:////tmp/app.db") == "sqlite+aiosqlite:////tmp/app.db"
+        with pytest.raises(ValueError):
+            async_database_url("mysql://u:p@db/app")
+
+    def test_pool_stats_count_waits_and_timeouts(self, tmp_path):
+        """Тестирование статистики пула: выдачи, переполнение и таймауты"""
+        engine = create_db_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=TimedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05
+        )
+        held = engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+        stats = pool_stats(engine)
+        held.close()
+        engine.dispose()
+
+        assert stats["checked_out"] == 1 and stats["overflow"] == 0
+        assert (stats["checkouts"], stats["connects"], stats["timeouts"]) == (1, 1, 1)
+        assert stats["max_wait_ms"] is not None
+
+    def test_prewarm_fills_pool(self, tmp_path):
+        """Тестирование предварительного открытия соединений"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'warm.db'}", poolclass=TimedQueuePool, pool_size=3)
+
+        assert prewarm(engine, 3) == 3
+        stats = pool_stats(engine)
+        engine.dispose()
+
+        assert stats["connects"] == 3
+        assert stats["checked_in"] == 3
+
+    def test_lock_or_create_concurrent_first_write(self, tmp_path):
+        """Тестирование одновременного создания одной строки двумя сессиями"""
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'race.db'}")
+        models.Base.metadata.create_all(bind=engine, tables=[models.PriceSketch.__table__])
+        Session = sessionmaker(bind=engine)
+        key = {"property_type": "apartment", "metric": "price", "period_start": date(2026, 10, 19)}
+        raced = []
+
+        # The other writer commits the row between this session's lookup and its insert
+        @event.listens_for(engine, "before_cursor_execute")
+        def other_writer(conn, cursor, statement, *args):
+            if statement.startswith("INSERT INTO price_sketches") and not raced:
+                raced.append(True)
+                other = Session()
+                other.add(models.PriceSketch(**key, count=7))
+                other.commit()
+                other.close()
+
+        db = Session()
+        row = lock_or_create(db, models.PriceSketch, key, {"count": 0})
+        db.commit()
+
+        assert raced and row.count == 7
+        assert db.query(models.PriceSketch).count() == 1
+        db.close()
+        engine.dispose()
+
+    def test_health_endpoint(self, authenticated_client):
+        """Тестирование отчета о пулах соединений"""
+        client, user = authenticated_client
+
+        response = client.get("/health/db")
+
+        assert response.status_code == 200
+        assert {"sync", "async"} <= set(response.json())
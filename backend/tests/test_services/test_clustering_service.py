@@ -0,0 +1,62 @@
+import pytest
+import numpy as np
+from services.clustering_service import clustering_service, mini_batch_kmeans, nearest_centroids
+from services.analytics_service import analytics_service
+from models import Property, SubmarketModel
+from tests.utils import create_test_property
+
+ALMATY = {"lat": 43.2220, "lng": 76.8512}
+ASTANA = {"lat": 51.1694, "lng": 71.4491}
+
+
+@pytest.fixture
+def clusters(db_session):
+    for i in range(6):
+        create_test_property(db_session, address=f"Алматы {i}", area=60.0 + i, price=30000000 + i * 100000, location=ALMATY)
+        create_test_property(db_session, address=f"Астана {i}", area=60.0 + i, price=18000000 + i * 100000, location=ASTANA)
+    clustering_service.fit(db_session, k=2, batch_size=8, iterations=50, seed=1)
+    yield
+    # Forget the model so other tests start unclustered
+    db_session.query(SubmarketModel).delete()
+    db_session.commit()
+    clustering_service.load(db_session)
+
+
+class TestClusteringService:
+
+    def test_mini_batch_kmeans_separates_groups(self):
+        """Тестирование разделения явно разнесенных групп точек"""
+        rng = np.random.default_rng(0)
+        points = np.vstack([rng.normal(0, 0.1, (200, 2)), rng.normal(5, 0.1, (200, 2))])
+
+        centroids = mini_batch_kmeans(points, k=2, batch_size=32, iterations=50, seed=0)
+        labels, _ = nearest_centroids(points, centroids)
+
+        assert len(set(labels[:200])) == 1
+        assert len(set(labels[200:])) == 1
+        assert labels[0] != labels[-1]
+
+    def test_fit_labels_properties_by_submarket(self, db_session, clusters):
+        """Тестирование разметки объектов по субрынкам"""
+        almaty = {p.cluster_id for p in db_session.query(Property).filter(Property.address.like("Алматы%"))}
+        astana = {p.cluster_id for p in db_session.query(Property).filter(Property.address.like("Астана%"))}
+
+        assert len(almaty) == 1 and len(astana) == 1
+        assert almaty != astana
+
+    def test_new_listing_assigned_to_nearest_centroid(self, db_session, clusters):
+        """Тестирование отнесения нового объекта к ближайшему центроиду"""
+        new = create_test_property(db_session, address="Алматы новый", area=62.0, price=31000000, location=ALMATY)
+        reference = db_session.query(Property).filter_by(address="Алматы 1").first()
+
+        assert new.cluster_id is not None
+        assert new.cluster_id == reference.cluster_id
+
+    def test_market_trends_filter_by_cluster(self, db_session, clusters):
+        """Тестирование фильтрации рыночных трендов по кластеру"""
+        cluster_id = db_session.query(Property).filter_by(address="Астана 0").first().cluster_id
+
+        result = analytics_service.get_market_trends(db_session, cluster_id=cluster_id)
+
+        assert result["total_properties"] == 6
+        assert result["price_stats"]["max"] < 20000000
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+import models
+from services.outbox_service import OutboxDispatcher, outbox_dispatcher, outbox_service
+from services.heatmap_service import heatmap_service, precision_for_zoom
+from services.property_service import PropertyService
+from schemas import PropertyUpdate
+from tests.utils import create_test_property
+
+ALMATY_BBOX = dict(min_lat=43.0, min_lng=76.5, max_lat=43.5, max_lng=77.2)
+
+
+class TestHeatmapService:
+
+    def test_tiles_maintained_on_create(self, db_session):
+        """Тестирование агрегатов тайлов при создании объектов"""
+        create_test_property(db_session, area=50.0, price=20000000)
+        create_test_property(db_session, area=100.0, price=60000000)
+
+        tiles = heatmap_service.get_tiles(db_session, zoom=10, **ALMATY_BBOX)
+
+        assert len(tiles) == 1
+        assert tiles[0]["count"] == 2
+        assert tiles[0]["mean_price_per_sqm"] == pytest.approx(500000)
+        assert len(tiles[0]["geohash"]) == precision_for_zoom(10)
+
+    def test_tiles_follow_updates_and_deletes(self, db_session):
+        """Тестирование обновления тайлов при изменении и удалении объектов"""
+        moved = create_test_property(db_session, area=50.0, price=20000000)
+        removed = create_test_property(db_session, area=50.0, price=30000000)
+        create_test_property(db_session, area=50.0, price=25000000)
+
+        PropertyService.update_property(
+            db_session, moved.id, PropertyUpdate(location={"lat": 51.1694, "lng": 71.4491})
+        )
+        PropertyService.delete_property(db_session, removed.id)
+
+        tiles = heatmap_service.get_tiles(db_session, zoom=10, **ALMATY_BBOX)
+        assert len(tiles) == 1
+        assert tiles[0]["count"] == 1
+        # Reads leave stale tiles to the change feed subscriber
+        assert db_session.query(models.PriceTile).filter(models.PriceTile.sketch_stale.is_(True)).count() > 0
+
+        dispatcher = OutboxDispatcher(outbox_service, session_factory=sessionmaker(bind=db_session.get_bind()))
+        dispatcher.subscribers["heatmap_tiles"] = outbox_dispatcher.subscribers["heatmap_tiles"]
+        dispatcher.dispatch()
+        db_session.expire_all()
+
+        tiles = heatmap_service.get_tiles(db_session, zoom=10, **ALMATY_BBOX)
+        assert tiles[0]["count"] == 1
+        assert tiles[0]["median_price_per_sqm"] == pytest.approx(500000)
+        assert db_session.query(models.PriceTile).filter(models.PriceTile.sketch_stale.is_(True)).count() == 0
+
+    def test_bbox_excludes_distant_tiles(self, db_session):
+        """Тестирование выборки только тайлов внутри области"""
+        create_test_property(db_session, location={"lat": 51.1694, "lng": 71.4491})
+
+        assert heatmap_service.get_tiles(db_session, zoom=14, **ALMATY_BBOX) == []
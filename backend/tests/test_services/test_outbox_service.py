@@ -0,0 +1,220 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy.orm import sessionmaker
+import models
+from schemas import AdjustmentCoefficientCreate, PropertyBulkUpdate, PropertyCreate, PropertyUpdate
+from services.adjustment_service import adjustment_service
+from services.clustering_service import clustering_service
+from services.screening_service import screening_service
+from services.outbox_service import OutboxDispatcher, OutboxService, outbox_service, PROPERTY
+from services.property_service import PropertyService
+from tests.utils import create_test_property, create_test_properties_batch
+
+
+def feed(db, after=0):
+    events, _ = outbox_service.read(db, after, 100)
+    return [(e.aggregate, e.aggregate_id, e.event_type, e.payload) for e in events]
+
+
+def add_event(db, aggregate_id, created_at, event_id=None):
+    db.add(models.OutboxEvent(
+        id=event_id, aggregate=PROPERTY, aggregate_id=aggregate_id,
+        event_type="updated", created_at=created_at
+    ))
+    db.commit()
+
+
+@pytest.fixture
+def dispatcher(db_session):
+    return OutboxDispatcher(outbox_service, session_factory=sessionmaker(bind=db_session.get_bind()))
+
+
+class TestOutboxService:
+
+    def test_property_mutations_recorded(self, db_session):
+        """Тестирование записи событий вместе с изменениями объекта"""
+        prop = create_test_property(db_session)
+        PropertyService.update_property(db_session, prop.id, PropertyUpdate(price=50000000, area=90))
+        PropertyService.delete_property(db_session, prop.id)
+
+        assert feed(db_session) == [
+            (PROPERTY, prop.id, "created", None),
+            (PROPERTY, prop.id, "updated", {"fields": ["area", "price"]}),
+            (PROPERTY, prop.id, "deleted", None)
+        ]
+
+    def test_rolled_back_change_has_no_event(self, db_session):
+        """Тестирование отката события вместе с транзакцией"""
+        prop = create_test_property(db_session)
+        outbox_service.record(db_session, PROPERTY, "updated", [prop.id])
+        db_session.rollback()
+
+        assert [event[2] for event in feed(db_session)] == ["created"]
+
+    def test_bulk_apply_recorded(self, db_session):
+        """Тестирование событий пакетных изменений"""
+        first = create_test_property(db_session, address="First")
+        second = create_test_property(db_session, address="Second")
+        _, after = outbox_service.read(db_session, 0, 100)
+
+        PropertyService.bulk_apply(
+            db_session,
+            create=[PropertyCreate(
+                address="New", property_type="apartment", area=50, floor_level=2, total_floors=9,
+                condition="good", renovation_status="original", location={"lat": 43.2, "lng": 76.9},
+                price=20000000, features=[]
+            )],
+            update=[PropertyBulkUpdate(id=first.id, price=30000000)],
+            delete=[second.id]
+        )
+
+        events = feed(db_session, after)
+        assert [(event[2], event[3]) for event in events] == [
+            ("created", None),
+            ("updated", {"fields": ["price"]}),
+            ("deleted", None)
+        ]
+        assert events[1][1] == first.id and events[2][1] == second.id
+
+    def test_rescreen_records_changed_flags(self, db_session):
+        """Тестирование событий повторной проверки на аномалии"""
+        for i in range(15):
+            create_test_property(db_session, address=f"Segment {i}", area=60.0 + i, price=(60.0 + i) * 500000)
+        typo = create_test_property(db_session, area=70.0, price=36000)
+        db_session.query(models.Property).update({"is_anomaly": False, "anomaly_score": None})
+        db_session.commit()
+        _, after = outbox_service.read(db_session, 0, 100)
+
+        screening_service.rescreen(db_session)
+
+        events = feed(db_session, after)
+        assert (PROPERTY, typo.id, "updated", {"fields": ["anomaly_score", "is_anomaly"]}) in events
+        assert all(event[3]["fields"] == ["anomaly_score"] for event in events if event[1] != typo.id)
+
+    def test_fit_records_relabelled(self, db_session):
+        """Тестирование событий переразметки субрынков"""
+        properties = create_test_properties_batch(db_session, 6)
+        _, after = outbox_service.read(db_session, 0, 100)
+
+        clustering_service.fit(db_session, k=2, seed=1)
+
+        events = feed(db_session, after)
+        assert sorted(event[1] for event in events) == [p.id for p in properties]
+        assert {event[3]["fields"][0] for event in events} == {"cluster_id"}
+
+    def test_adjustment_mutations_recorded(self, db_session):
+        """Тестирование событий коэффициентов корректировки"""
+        coefficient = adjustment_service.create_coefficient(
+            db_session,
+            AdjustmentCoefficientCreate(feature_name="parking", coefficient_value=1.05, description="Parking"),
+            user_id=1
+        )
+        adjustment_service.deactivate_coefficient(db_session, coefficient.id)
+
+        assert feed(db_session) == [
+            ("adjustment_coefficient", coefficient.id, "created", None),
+            ("adjustment_coefficient", coefficient.id, "updated", {"fields": ["is_active"]})
+        ]
+
+    def test_read_waits_for_recent_gap(self, db_session):
+        """Тестирование остановки чтения на незафиксированном id"""
+        now = datetime.utcnow()
+        add_event(db_session, 1, now, event_id=1)
+        add_event(db_session, 2, now, event_id=3)
+
+        events, position = outbox_service.read(db_session, 0, 100)
+        assert [e.id for e in events] == [1] and position == 1
+
+        # A gap older than the grace period was a rolled back transaction
+        settled = OutboxService(gap_grace=0)
+        events, position = settled.read(db_session, 0, 100)
+        assert [e.id for e in events] == [1, 3] and position == 3
+
+    def test_prune_keeps_unhandled_events(self, db_session):
+        """Тестирование очистки старых обработанных событий"""
+        old = datetime.utcnow() - timedelta(days=30)
+        for aggregate_id in range(1, 4):
+            add_event(db_session, aggregate_id, old)
+        db_session.add(models.OutboxCheckpoint(subscriber="search_index", position=2))
+        db_session.commit()
+
+        assert outbox_service.prune(db_session) == 2
+        assert outbox_service.pruned_through(db_session) == 2
+        assert [e[1] for e in feed(db_session, 2)] == [3]
+
+
+class TestOutboxDispatcher:
+
+    def test_durable_subscriber_resumes_from_checkpoint(self, db_session, dispatcher):
+        """Тестирование доставки по сохраненному смещению"""
+        received = []
+        dispatcher.subscribe("search_index", lambda db, events: received.extend(e.aggregate_id for e in events))
+        first = create_test_property(db_session, address="First")
+        assert dispatcher.dispatch() == 1
+
+        second = create_test_property(db_session, address="Second")
+        restarted = OutboxDispatcher(outbox_service, session_factory=dispatcher.session_factory)
+        restarted.subscribe("search_index", lambda db, events: received.extend(e.aggregate_id for e in events))
+        assert restarted.dispatch() == 1
+
+        assert received == [first.id, second.id]
+        assert db_session.get(models.OutboxCheckpoint, "search_index").position == 2
+
+    def test_failed_batch_is_redelivered(self, db_session, dispatcher):
+        """Тестирование повторной доставки после ошибки обработчика"""
+        attempts = []
+
+        def handler(db, events):
+            attempts.append([e.aggregate_id for e in events])
+            if len(attempts) == 1:
+                raise RuntimeError("index unavailable")
+
+        dispatcher.subscribe("search_index", handler)
+        prop = create_test_property(db_session)
+
+        assert dispatcher.dispatch() == 0
+        assert dispatcher.dispatch() == 1
+        assert attempts == [[prop.id], [prop.id]]
+
+    def test_local_subscriber_starts_at_head(self, db_session, dispatcher):
+        """Тестирование локального подписчика с текущей позиции"""
+        create_test_property(db_session, address="Before")
+        received = []
+        dispatcher.subscribe(
+            "cache", lambda db, events: received.extend(e.aggregate_id for e in events),
+            aggregates=[PROPERTY], durable=False
+        )
+        dispatcher.dispatch()
+
+        prop = create_test_property(db_session, address="After")
+        dispatcher.dispatch()
+
+        assert received == [prop.id]
+        assert db_session.get(models.OutboxCheckpoint, "cache") is None
+
+
+class TestChangesEndpoint:
+
+    def test_read_changes(self, authenticated_client, db_session):
+        """Тестирование получения ленты изменений"""
+        client, user = authenticated_client
+        prop = create_test_property(db_session)
+        client.put(f"/api/properties/{prop.id}", json={"price": 47000000})
+
+        response = client.get("/api/changes/", params={"aggregate": "property"})
+        assert response.status_code == 200
+        data = response.json()
+        assert [e["event_type"] for e in data["events"]] == ["created", "updated"]
+        assert data["next_after"] == data["events"][-1]["id"]
+
+        response = client.get("/api/changes/", params={"after": data["next_after"]})
+        assert response.json() == {"events": [], "next_after": data["next_after"]}
+
+    def test_pruned_offset_is_gone(self, authenticated_client, db_session):
+        """Тестирование устаревшего смещения"""
+        client, user = authenticated_client
+        db_session.add(models.OutboxCheckpoint(subscriber="outbox.pruned", position=10))
+        db_session.commit()
+
+        assert client.get("/api/changes/", params={"after": 3}).status_code == 410
+        assert client.get("/api/changes/", params={"aggregate": "valuation"}).status_code == 400
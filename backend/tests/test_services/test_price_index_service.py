@@ -0,0 +1,96 @@
+import pytest
+from datetime import datetime
+from sqlalchemy.orm import sessionmaker
+from services.outbox_service import OutboxDispatcher, outbox_dispatcher, outbox_service
+from services.price_index_service import price_index_service, district_of, period_of
+from services.valuation_service import ValuationService
+from schemas import Property as PropertySchema
+from tests.utils import create_test_property
+
+LOCATION = {"lat": 43.2220, "lng": 76.8512}
+
+
+def create_listing(db, listed_at, price, area=80.0, condition="good"):
+    prop = create_test_property(db, area=area, price=price, condition=condition, location=LOCATION)
+    prop.created_at = listed_at
+    db.commit()
+    return prop
+
+
+class TestPriceIndexService:
+
+    def test_time_dummy_index(self, db_session):
+        """Тестирование расчета индекса цен по периодам"""
+        for area in (60.0, 80.0, 100.0):
+            create_listing(db_session, datetime(2025, 1, 15), price=area * 400000, area=area)
+            create_listing(db_session, datetime(2025, 6, 15), price=area * 500000, area=area)
+
+        price_index_service.refit(db_session)
+        district = district_of(LOCATION)
+
+        ratio = price_index_service.index_ratio("apartment", district, "2025-01", "2025-06")
+        assert ratio == pytest.approx(1.25, rel=1e-6)
+        assert price_index_service.index_ratio("house", district, "2025-01") == 1.0
+
+    def test_incremental_update_matches_refit(self, db_session):
+        """Тестирование инкрементального обновления без полного пересчета"""
+        create_listing(db_session, datetime(2025, 1, 10), price=30000000, area=60.0)
+        create_listing(db_session, datetime(2025, 2, 10), price=42000000, area=80.0, condition="excellent")
+        price_index_service.refit(db_session)
+
+        create_listing(db_session, datetime(2025, 3, 10), price=55000000, area=90.0)
+        create_listing(db_session, datetime(2025, 3, 20), price=36000000, area=65.0, condition="fair")
+        folded = price_index_service.update(db_session)
+        incremental = price_index_service.get_index("apartment")
+
+        price_index_service.refit(db_session)
+
+        assert folded == 2
+        assert incremental == pytest.approx(price_index_service.get_index("apartment"))
+
+    def test_valuation_time_adjusts_comparables(self, db_session):
+        """Тестирование корректировки на рыночные условия при оценке"""
+        for area in (60.0, 80.0):
+            create_listing(db_session, datetime(2025, 1, 15), price=area * 400000, area=area)
+            create_listing(db_session, datetime(2025, 6, 15), price=area * 500000, area=area)
+        price_index_service.refit(db_session)
+
+        old_comparable = create_listing(db_session, datetime(2025, 1, 20), price=32000000)
+        comparable = PropertySchema.model_validate(old_comparable)
+
+        adjustment = ValuationService()._calculate_market_conditions_adjustment(comparable)
+
+        assert adjustment == pytest.approx(32000000 * 0.25, rel=1e-6)
+
+    def test_new_listing_reaches_index_through_change_feed(self, db_session):
+        """Тестирование обновления индекса при создании объекта"""
+        for area in (60.0, 80.0):
+            create_listing(db_session, datetime(2025, 1, 15), price=area * 400000, area=area)
+        price_index_service.refit(db_session)
+        dispatcher = OutboxDispatcher(outbox_service, session_factory=sessionmaker(bind=db_session.get_bind()))
+        dispatcher.subscribers["price_index"] = outbox_dispatcher.subscribers["price_index"]
+        dispatcher.dispatch()
+
+        create_test_property(db_session, area=80.0, price=40000000, location=LOCATION)
+        dispatcher.dispatch()
+
+        assert period_of(datetime.utcnow()) in price_index_service.get_index("apartment")
+        assert price_index_service.index_ratio("apartment", district_of(LOCATION), "2025-01") != 1.0
+
+    def test_fold_listings_committed_out_of_order(self, db_session):
+        """Тестирование учета объекта, зафиксированного позже объекта с большим ID"""
+        create_listing(db_session, datetime(2025, 1, 10), price=30000000, area=60.0)
+        create_listing(db_session, datetime(2025, 2, 10), price=42000000, area=80.0, condition="excellent")
+        price_index_service.refit(db_session)
+
+        earlier = create_listing(db_session, datetime(2025, 3, 10), price=55000000, area=90.0)
+        later = create_listing(db_session, datetime(2025, 3, 20), price=36000000, area=65.0, condition="fair")
+        price_index_service.fold(db_session, ids=[later.id])
+        price_index_service.fold(db_session, ids=[earlier.id])
+        db_session.commit()
+        price_index_service.load(db_session)
+        incremental = price_index_service.get_index("apartment")
+
+        price_index_service.refit(db_session)
+
+        assert incremental == pytest.approx(price_index_service.get_index("apartment"))
@@ -0,0 +1,159 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from database import READ_REPLICA
+from schemas import PropertyUpdate
+from services.property_cache import PropertyCache, LocalBackend, RedisBackend, property_cache
+from services.property_service import PropertyService
+from tests.utils import create_test_property
+
+
+class FakeRedis:
+    """Минимальный клиент Redis в памяти"""
+
+    def __init__(self):
+        self.values = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value.encode()
+
+    def execute(self):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def scan_iter(self, pattern, count=None):
+        return [key for key in self.values if key.startswith(pattern.rstrip("*"))]
+
+
+@pytest.fixture
+def count_queries(db_session):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+class TestPropertyCache:
+
+    def test_hits_and_misses(self, db_session):
+        """Тестирование подсчета попаданий в кэш"""
+        prop = create_test_property(db_session, address="Cached")
+        cache = PropertyCache(LocalBackend(max_entries=100, ttl=60))
+
+        assert cache.get(db_session, prop.id).address == "Cached"
+        assert cache.get(db_session, prop.id).address == "Cached"
+        assert cache.get(db_session, 999999) is None
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+        assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+    def test_get_many_fills_misses_in_one_query(self, db_session, count_queries):
+        """Тестирование загрузки промахов одним запросом"""
+        ids = [
+            create_test_property(db_session, address=f"Bulk {i}", features=[{"name": "parking", "value": 1}]).id
+            for i in range(5)
+        ]
+        cache = PropertyCache(LocalBackend(max_entries=100, ttl=60))
+        db_session.expire_all()
+        count_queries.clear()
+
+        records = cache.get_many(db_session, list(reversed(ids)))
+
+        assert list(records) == list(reversed(ids))
+        assert all(record.features[0].name == "parking" for record in records.values())
+        # properties and their features
+        assert len(count_queries) == 2
+
+        count_queries.clear()
+        cache.get_many(db_session, ids)
+        assert count_queries == []
+
+    def test_replica_misses_not_cached(self, db_session):
+        """Тестирование промахов на реплике без записи в кэш"""
+        prop = create_test_property(db_session, address="Replica Row")
+        cache = PropertyCache(LocalBackend(max_entries=100, ttl=60))
+        replica = sessionmaker(bind=db_session.get_bind(), info={READ_REPLICA: True})()
+        try:
+            assert cache.get(replica, prop.id).address == "Replica Row"
+            assert cache.get(replica, prop.id).address == "Replica Row"
+        finally:
+            replica.close()
+        assert cache.stats()["misses"] == 2
+
+        cache.get(db_session, prop.id)
+        cache.get(db_session, prop.id)
+        assert cache.stats()["hits"] == 1
+
+    def test_writes_through_and_invalidates(self, db_session):
+        """Тестирование сброса кэша при изменении и удалении"""
+        prop = create_test_property(db_session, address="Before")
+        property_id = prop.id
+
+        assert property_cache.get(db_session, property_id).address == "Before"
+        PropertyService.update_property(db_session, property_id, PropertyUpdate(address="After"))
+        misses = property_cache.stats()["misses"]
+        assert property_cache.get(db_session, property_id).address == "After"
+        assert property_cache.stats()["misses"] == misses + 1
+
+        PropertyService.delete_property(db_session, property_id)
+        assert property_cache.get(db_session, property_id) is None
+
+    def test_redis_backend_round_trip(self, db_session):
+        """Тестирование хранения записей в Redis"""
+        prop = create_test_property(db_session, address="Shared", features=[{"name": "balcony", "value": 2}])
+        client = FakeRedis()
+        cache = PropertyCache(RedisBackend(ttl=60, client=client))
+
+        cache.get(db_session, prop.id)
+        # another worker sees the record written by the first one
+        other = PropertyCache(RedisBackend(ttl=60, client=client))
+        record = other.get(db_session, prop.id)
+
+        assert record.address == "Shared"
+        assert record.features[0].value == 2
+        assert other.stats()["hits"] == 1
+
+        cache.invalidate([prop.id])
+        assert client.values == {}
+
+    def test_redis_errors_fall_back_to_database(self, db_session):
+        """Тестирование работы без доступного Redis"""
+        prop = create_test_property(db_session, address="Fallback")
+
+        class BrokenRedis(FakeRedis):
+            def mget(self, keys):
+                raise ConnectionError("redis is down")
+
+        cache = PropertyCache(RedisBackend(ttl=60, client=BrokenRedis()))
+        assert cache.get(db_session, prop.id).address == "Fallback"
+
+
+def test_property_endpoint_served_from_cache(authenticated_client, db_session):
+    """Тестирование ответа карточки объекта из кэша"""
+    client, user = authenticated_client
+    prop = create_test_property(db_session, address="Endpoint")
+
+    first = client.get(f"/api/properties/{prop.id}")
+    second = client.get(f"/api/properties/{prop.id}")
+
+    assert first.status_code == 200
+    assert first.json() == second.json()
+    assert "condition_code" not in first.json()
+
+    stats = client.get("/health/cache").json()["property"]
+    assert stats["hits"] >= 1
@@ -0,0 +1,103 @@
+import json
+import os
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+import models
+from services.pagination import keyset_after, keyset_page
+from services.property_service import (
+    property_service, PROPERTY_PAGE_KEY, PROPERTY_SYNC_KEY, TOMBSTONE_SYNC_KEY
+)
+
+# Common filter combinations of GET /api/properties/ and the indexes
+# that may serve them; a type filter can also be driven by the
+# (property_type, id) index, which matches the keyset order
+FILTER_CASES = [
+    ({"min_price": 30000000, "max_price": 50000000}, {"ix_properties_price"}),
+    (
+        {"property_type": "apartment", "min_price": 30000000},
+        {"ix_properties_property_type_price", "ix_properties_property_type_id"}
+    ),
+    (
+        {"property_type": "house", "min_area": 50, "max_area": 80},
+        {"ix_properties_property_type_area", "ix_properties_property_type_id"}
+    ),
+    ({"bbox": (43.1, 76.8, 43.3, 77.0)}, {"ix_properties_latitude_longitude"}),
+    (
+        {"created_from": datetime(2026, 1, 1), "created_to": datetime(2026, 2, 1)},
+        {"ix_properties_created_at_id"}
+    ),
+    ({"updated_from": datetime(2026, 1, 1)}, {"ix_properties_updated_at_id"}),
+    ({"feature": ["parking>=1"]}, {"ix_property_features_name_value"})
+]
+
+
+def listing_sql(db, filters):
+    query = property_service.filter_properties(db.query(models.Property), **filters)
+    statement = keyset_page(query, PROPERTY_PAGE_KEY, 100).statement
+    return str(statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+class TestPropertyQueryPlans:
+
+    @pytest.mark.parametrize("filters, indexes", FILTER_CASES[:4])
+    def test_sqlite_filters_use_indexes(self, db_session, filters, indexes):
+        """Тестирование использования индексов фильтрами списка (SQLite)"""
+        if db_session.get_bind().dialect.name != "sqlite":
+            pytest.skip("SQLite plan format")
+
+        plan = [row[-1] for row in db_session.execute(text("EXPLAIN QUERY PLAN " + listing_sql(db_session, filters)))]
+
+        assert any(index in step for step in plan for index in indexes), plan
+
+    @pytest.mark.parametrize("key, index", [
+        (PROPERTY_SYNC_KEY, "ix_properties_updated_at_id"),
+        (TOMBSTONE_SYNC_KEY, "ix_property_tombstones_deleted_at_property_id")
+    ])
+    def test_sqlite_sync_walks_use_indexes(self, db_session, key, index):
+        """Тестирование индексов обхода дельта-синхронизации (SQLite)"""
+        if db_session.get_bind().dialect.name != "sqlite":
+            pytest.skip("SQLite plan format")
+
+        position = [datetime(2026, 1, 1), 10]
+        statement = select(*key).where(key[0] <= datetime(2026, 2, 1))\
+            .where(keyset_after(key, position)).order_by(*key).limit(1000)
+        sql = str(statement.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True}))
+        plan = [row[-1] for row in db_session.execute(text("EXPLAIN QUERY PLAN " + sql))]
+
+        assert any(index in step for step in plan), plan
+        assert not any("TEMP B-TREE" in step for step in plan), plan
+
+    @pytest.mark.parametrize("filters, indexes", FILTER_CASES)
+    def test_postgres_filters_use_indexes(self, filters, indexes):
+        """Тестирование индексов фильтров списка в PostgreSQL"""
+        url = os.getenv("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL is not set")
+
+        engine = create_engine(url)
+        models.Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        try:
+            # Small test tables are cheapest to scan; forbid it so the plan
+            # shows whether an index can serve the filter at all
+            db.execute(text("SET LOCAL enable_seqscan = off"))
+            plan = db.execute(text("EXPLAIN (FORMAT JSON) " + listing_sql(db, filters))).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            nodes = list(plan_nodes(plan[0]["Plan"]))
+            assert "Seq Scan" not in [node["Node Type"] for node in nodes], nodes
+            # A primary key walk filtering every row would also avoid the seq scan
+            used = {node["Index Name"] for node in nodes if "Index Name" in node}
+            assert used & indexes, used
+        finally:
+            db.rollback()
+            db.close()
+            engine.dispose()
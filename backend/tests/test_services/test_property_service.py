@@ -1,7 +1,7 @@
 import pytest
 from services.property_service import PropertyService
 from schemas import PropertyCreate, PropertyUpdate
-from models import Property
+from models import Property, PropertyFeature
 
 class TestPropertyService:
     
@@ -27,6 +27,35 @@ class TestPropertyService:
         assert created_property.area == 75.0
         assert created_property.price == 38000000
 
+    def test_features_are_stored_as_rows(self, db_session):
+        """Тестирование хранения характеристик в таблице property_features"""
+        property_data = PropertyCreate(
+            address="Features Street, 1",
+            property_type="apartment",
+            area=60.0,
+            floor_level=2,
+            total_floors=9,
+            condition="good",
+            renovation_status="original",
+            location={"lat": 43.2220, "lng": 76.8512},
+            price=30000000,
+            features=[{"name": "parking", "value": 1, "unit": "space"}]
+        )
+        created_property = PropertyService.create_property(db_session, property_data)
+
+        PropertyService.update_property(
+            db_session,
+            created_property.id,
+            PropertyUpdate(features=[{"name": "balcony", "value": 2, "unit": "count"}])
+        )
+
+        rows = db_session.query(PropertyFeature).all()
+        assert [(row.property_id, row.name, row.value) for row in rows] == [(created_property.id, "balcony", 2.0)]
+
+        db_session.delete(created_property)
+        db_session.commit()
+        assert db_session.query(PropertyFeature).count() == 0
+
     def test_get_property(self, db_session):
         """Тестирование получения объекта недвижимости"""
         # Создаем объект
@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+from services.quantile_sketch import KLLSketch, DEFAULT_RANK_ERROR
+from services.sketch_service import sketch_service
+from tests.utils import create_test_property
+
+class TestKLLSketch:
+
+    def test_quantiles_within_rank_error(self):
+        """Тестирование точности квантилей в пределах заявленной ошибки"""
+        rng = np.random.default_rng(42)
+        values = rng.lognormal(17, 0.5, 50000)
+        sketch = KLLSketch(seed=1)
+        sketch.update_many(values)
+
+        ordered = np.sort(values)
+        for q in (0.1, 0.25, 0.5, 0.75, 0.9):
+            estimate = sketch.quantile(q)
+            rank = np.searchsorted(ordered, estimate) / len(ordered)
+            assert abs(rank - q) <= DEFAULT_RANK_ERROR
+
+    def test_merge_and_serialization(self):
+        """Тестирование слияния и сериализации скетчей"""
+        rng = np.random.default_rng(7)
+        values = rng.normal(500000, 80000, 20000)
+        left = KLLSketch(seed=1)
+        right = KLLSketch(seed=2)
+        left.update_many(values[:12000])
+        for value in values[12000:]:
+            right.update(value)
+
+        merged = KLLSketch.from_dict(left.to_dict()).merge(right)
+
+        assert merged.n == len(values)
+        assert merged.min_value == values.min()
+        assert merged.max_value == values.max()
+        ordered = np.sort(values)
+        rank = np.searchsorted(ordered, merged.quantile(0.5)) / len(ordered)
+        assert abs(rank - 0.5) <= DEFAULT_RANK_ERROR
+
+    def test_empty_sketch(self):
+        """Тестирование пустого скетча"""
+        sketch = KLLSketch()
+        assert sketch.quantile(0.5) is None
+        with pytest.raises(ValueError):
+            sketch.merge(KLLSketch(k=100))
+
+
+class TestSketchService:
+
+    def test_rollups_recorded_on_create(self, db_session):
+        """Тестирование обновления роллапов при создании объекта"""
+        for i in range(5):
+            create_test_property(db_session, area=50.0, price=10000000 + i * 1000000)
+
+        summary = sketch_service.get_quantiles(db_session, "price", property_type="apartment")
+
+        assert summary["count"] == 5
+        assert summary["percentiles"]["p50"] == 12000000
+        per_sqm = sketch_service.get_quantiles(db_session, "price_per_sqm")
+        assert per_sqm["max"] == 14000000 / 50.0
+
+    def test_rebuild_rollups(self, db_session):
+        """Тестирование пересчета роллапов из таблицы объектов"""
+        properties = [create_test_property(db_session, price=20000000 + i) for i in range(3)]
+        properties[0].price = 1000
+        db_session.commit()
+
+        sketch_service.rebuild_rollups(db_session)
+        summary = sketch_service.get_quantiles(db_session, "price")
+
+        assert summary["count"] == 3
+        assert summary["min"] == 1000
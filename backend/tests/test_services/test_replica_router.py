@@ -0,0 +1,146 @@
+import importlib
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+import models
+from database import Base
+from services.replica_router import ReplicaRouter
+from tests.utils import create_test_property
+
+
+@pytest.fixture
+def replica_url(tmp_path):
+    """Второй SQLite-файл в роли реплики с собственными данными"""
+    url = f"sqlite:///{tmp_path / 'replica.db'}"
+    router = ReplicaRouter([url], poolclass=NullPool)
+    replica = router.replicas[0]
+    Base.metadata.create_all(bind=replica.engine)
+    db = replica.session_factory()
+    try:
+        create_test_property(db, address="Replica Only")
+    finally:
+        db.close()
+        router.dispose()
+    return url
+
+
+@pytest.fixture
+def routed_client(authenticated_client, replica_url, monkeypatch):
+    router = ReplicaRouter([replica_url], poolclass=NullPool)
+    # services.replica_router is the singleton; patch it in its module
+    monkeypatch.setattr(importlib.import_module("services.replica_router"), "replica_router", router)
+    client, user = authenticated_client
+    yield client, router
+    router.dispose()
+
+
+class TestReplicaRouter:
+
+    def test_reads_go_to_healthy_replica(self, routed_client):
+        """Тестирование чтения с реплики"""
+        client, router = routed_client
+
+        response = client.get("/api/properties/")
+
+        assert response.status_code == 200
+        assert [item["address"] for item in response.json()] == ["Replica Only"]
+        assert router.replicas[0].healthy
+        property_id = response.json()[0]["id"]
+        assert client.get(f"/api/properties/{property_id}").json()["address"] == "Replica Only"
+
+    def test_read_your_writes_after_write(self, routed_client):
+        """Тестирование чтения своих записей с основной базы после записи"""
+        client, router = routed_client
+
+        created = client.post("/api/properties/", json={
+            "address": "Primary Write",
+            "property_type": "apartment",
+            "area": 60.0,
+            "floor_level": 3,
+            "total_floors": 9,
+            "condition": "good",
+            "renovation_status": "original",
+            "location": {"lat": 43.2220, "lng": 76.8512},
+            "price": 30000000,
+            "features": []
+        })
+        assert created.status_code == 200
+
+        response = client.get("/api/properties/")
+
+        assert [item["address"] for item in response.json()] == ["Primary Write"]
+        assert client.get("/api/analytics/clusters").status_code == 200
+
+        router.recent_writers.clear()
+        assert [item["address"] for item in client.get("/api/properties/").json()] == ["Replica Only"]
+
+    def test_read_routes_do_not_write(self, routed_client):
+        """Тестирование маршрутов чтения на реплике, запрещающей запись"""
+        client, router = routed_client
+        replica = router.replicas[0]
+        db = replica.session_factory()
+        try:
+            property_id = db.query(models.Property.id).scalar()
+            db.query(models.PriceTile).update({"sketch_stale": True})
+            db.commit()
+        finally:
+            db.close()
+
+        def read_only(connection, record):
+            connection.execute("PRAGMA query_only = ON")
+
+        for engine in (replica.engine, replica.async_engine.sync_engine):
+            event.listen(engine, "connect", read_only)
+
+        for url in (
+            "/api/properties/",
+            f"/api/properties/{property_id}",
+            "/api/analytics/heatmap?min_lat=43&min_lng=76.5&max_lat=43.5&max_lng=77.2&zoom=10",
+            "/api/analytics/clusters",
+            "/api/analytics/market-trends",
+            f"/api/analytics/properties/{property_id}/comparison",
+            f"/api/analytics/properties/{property_id}/adjustments",
+            "/api/adjustments/coefficients",
+            "/api/changes/",
+            "/api/valuation/history"
+        ):
+            assert client.get(url).status_code < 500, url
+
+    def test_unreachable_replica_falls_back_to_primary(self, tmp_path):
+        """Тестирование переключения на основную базу при недоступной реплике"""
+        router = ReplicaRouter([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"], poolclass=NullPool)
+
+        router.refresh()
+
+        assert router.pick() is None
+        status = router.status()[0]
+        assert status["healthy"] is False and status["error"]
+        router.dispose()
+
+    def test_lagging_replica_falls_back_to_primary(self, replica_url):
+        """Тестирование исключения отстающей реплики"""
+        router = ReplicaRouter([replica_url], max_lag_seconds=-1, poolclass=NullPool)
+
+        router.refresh()
+
+        assert router.pick() is None
+        assert "lag" in router.replicas[0].error
+
+        router.max_lag_seconds = 5
+        router.refresh(force=True)
+        assert router.pick() is router.replicas[0]
+        router.dispose()
+
+    def test_round_robin_and_sticky_writers(self, replica_url, tmp_path):
+        """Тестирование распределения чтений и закрепления пишущих пользователей"""
+        second_url = f"sqlite:///{tmp_path / 'replica2.db'}"
+        router = ReplicaRouter([replica_url, second_url], poolclass=NullPool)
+        router.refresh()
+
+        picked = {router.pick("reader@example.com").url for _ in range(4)}
+        router.record_write("writer@example.com")
+
+        assert picked == {replica_url, second_url}
+        assert router.pick("writer@example.com") is None
+        assert router.pick("reader@example.com") is not None
+        router.dispose()
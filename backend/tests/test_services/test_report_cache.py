@@ -0,0 +1,31 @@
+from services.report_cache import ReportCache, content_key, etag_matches
+
+
+class TestReportCache:
+
+    def test_lru_eviction_on_disk_budget(self, tmp_path):
+        """Тестирование вытеснения давно использованных отчетов по лимиту диска"""
+        cache = ReportCache(directory=str(tmp_path), max_bytes=250)
+        cache.put("a", b"a" * 100)
+        cache.put("b", b"b" * 100)
+        cache.get("a")
+        cache.put("c", b"c" * 100)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == b"a" * 100
+        assert cache.get("c") == b"c" * 100
+        assert cache.stats()["bytes"] == 200
+
+    def test_index_rebuilt_from_disk(self, tmp_path):
+        """Тестирование восстановления индекса кэша после перезапуска"""
+        ReportCache(directory=str(tmp_path)).put("report", b"pdf")
+
+        assert ReportCache(directory=str(tmp_path)).get("report") == b"pdf"
+
+    def test_content_key_and_etag(self):
+        """Тестирование ключа по содержимому и сравнения ETag"""
+        assert content_key({"a": 1, "b": 2}) == content_key({"b": 2, "a": 1})
+        assert content_key("1", {"a": 1}) != content_key("2", {"a": 1})
+        assert etag_matches('"x", "y"', '"y"')
+        assert etag_matches("*", '"y"')
+        assert not etag_matches(None, '"y"')
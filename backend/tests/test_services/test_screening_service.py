@@ -0,0 +1,88 @@
+import pytest
+from models import Property
+from services.screening_service import screening_service
+from services.analytics_service import analytics_service
+from services.sketch_service import sketch_service
+from services.property_service import PropertyService
+from schemas import PropertyUpdate
+from tests.utils import create_test_property
+
+
+def create_segment(db, count=15):
+    for i in range(count):
+        create_test_property(db, address=f"Адрес {i}", area=60.0 + i, price=(60.0 + i) * 500000 * (1 + 0.02 * (i % 5)))
+
+
+class TestScreeningService:
+
+    def test_small_segment_is_not_judged(self, db_session):
+        """Тестирование отсутствия оценки при малом числе наблюдений"""
+        listing = create_test_property(db_session, area=50.0, price=25000000)
+
+        assert listing.anomaly_score is None
+        assert listing.is_anomaly is False
+
+    def test_flags_price_typo(self, db_session):
+        """Тестирование обнаружения цены, ошибочной в 1000 раз"""
+        create_segment(db_session)
+
+        normal = create_test_property(db_session, area=70.0, price=36000000)
+        typo = create_test_property(db_session, area=70.0, price=36000)
+
+        assert normal.is_anomaly is False
+        assert typo.is_anomaly is True
+        assert typo.anomaly_score < -3.5
+        assert typo.is_quarantined is False
+
+    def test_flags_square_feet_area(self, db_session):
+        """Тестирование обнаружения площади в квадратных футах"""
+        create_segment(db_session)
+
+        listing = create_test_property(db_session, area=70.0 * 10.764, price=36000000)
+
+        assert listing.is_anomaly is True
+
+    def test_update_rescreens_listing(self, db_session):
+        """Тестирование повторной проверки при исправлении цены"""
+        create_segment(db_session)
+        typo = create_test_property(db_session, area=70.0, price=36000)
+
+        fixed = PropertyService.update_property(db_session, typo.id, PropertyUpdate(price=36000000))
+
+        assert fixed.is_anomaly is False
+
+    def test_quarantine_excludes_from_analytics(self, db_session, monkeypatch):
+        """Тестирование исключения объектов на карантине из аналитики"""
+        monkeypatch.setattr(screening_service, "action", "quarantine")
+        create_segment(db_session)
+        typo = create_test_property(db_session, area=70.0, price=36000)
+
+        trends = analytics_service.get_market_trends(db_session)
+
+        assert typo.is_quarantined is True
+        assert trends["total_properties"] == 15
+
+    def test_released_listing_rejoins_rollups(self, db_session, monkeypatch):
+        """Тестирование возврата объекта в скетчи после снятия карантина"""
+        monkeypatch.setattr(screening_service, "action", "quarantine")
+        create_segment(db_session)
+        typo = create_test_property(db_session, area=70.0, price=36000)
+        assert typo.is_quarantined is True
+
+        PropertyService.update_property(db_session, typo.id, PropertyUpdate(price=36000000))
+
+        summary = sketch_service.get_quantiles(db_session, "price", property_type="apartment")
+        assert summary["count"] == 16
+
+    def test_rescreen_existing_data(self, db_session):
+        """Тестирование массовой повторной проверки существующих данных"""
+        create_segment(db_session)
+        typo = create_test_property(db_session, area=70.0, price=36000)
+        db_session.query(Property).update({"is_anomaly": False, "anomaly_score": None})
+        db_session.commit()
+
+        result = screening_service.rescreen(db_session)
+        db_session.refresh(typo)
+
+        assert result == {"screened": 16, "anomalies": 1}
+        assert typo.is_anomaly is True
@@ -1,3 +1,4 @@
+from concurrent.futures import Future
 from typing import Dict, Any, List
 from models import Property, User, ValuationHistory
 from schemas import PropertyCreate, UserCreate
@@ -80,4 +81,15 @@ def generate_test_coordinates(
     return {
         "lat": base_lat + lat_offset,
         "lng": base_lng + lng_offset
-    }
\ No newline at end of file
+    }
+
+class InlineExecutor:
+    """Runs jobs in the submitting thread: the in-memory test database is a single shared connection"""
+
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future